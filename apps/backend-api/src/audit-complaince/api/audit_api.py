@@ -4,9 +4,10 @@ from fastapi import FastAPI, HTTPException, Depends, Query, Path
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 import structlog
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
 
-from core.audit_service import AuditService
+from core.audit_service import AuditService, start_audit_batch_writer, close_audit_batch_writer
 from core.compliance_service import ComplianceService
 from core.reporting_service import ReportingService
 from core.whistleblower_service import WhistleblowerService
@@ -58,6 +59,22 @@ class ViolationResolutionRequest(BaseModel):
     resolved_by: str = Field(..., description="Resolved by user")
     status: str = Field("RESOLVED", description="New status")
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the process-wide audit batch writer on a session of its own"""
+    app.state.db_engine = create_async_engine(
+        config.database_url,
+        pool_size=config.database_pool_size,
+        max_overflow=config.database_max_overflow
+    )
+    start_audit_batch_writer(sessionmaker(app.state.db_engine, class_=AsyncSession, expire_on_commit=False))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write any queued audit entries before the process exits"""
+    await close_audit_batch_writer()
+    await app.state.db_engine.dispose()
+
 # Dependency to get database session
 async def get_db_session():
     # This would be implemented with your database connection logic
@@ -150,11 +167,17 @@ async def get_audit_trail(
 @app.get("/api/v1/audit/integrity", response_model=Dict[str, Any])
 async def verify_audit_integrity(
     start_date: Optional[datetime] = Query(None),
+    mode: str = Query("full", regex="^(full|fast)$"),
+    spot_checks: int = Query(3, ge=0, le=100),
     audit_service: AuditService = Depends(get_audit_service)
 ):
     """Verify audit chain integrity"""
     try:
-        integrity_status = await audit_service.verify_integrity(start_date=start_date)
+        integrity_status = await audit_service.verify_integrity(
+            start_date=start_date,
+            mode=mode,
+            spot_checks=spot_checks
+        )
         return integrity_status
         
     except Exception as e:
@@ -1,6 +1,6 @@
 import os
 from typing import List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 @dataclass
 class AuditComplianceConfig:
@@ -22,7 +22,11 @@ class AuditComplianceConfig:
     # Audit Configuration
     audit_retention_days: int = int(os.getenv('AUDIT_RETENTION_DAYS', '2555'))  # 7 years
     max_audit_batch_size: int = int(os.getenv('AUDIT_MAX_BATCH_SIZE', '1000'))
+    audit_batch_flush_interval_ms: int = int(os.getenv('AUDIT_BATCH_FLUSH_MS', '50'))
+    audit_batch_max_write_attempts: int = int(os.getenv('AUDIT_BATCH_MAX_ATTEMPTS', '5'))
+    audit_flush_timeout_seconds: float = float(os.getenv('AUDIT_FLUSH_TIMEOUT_SECONDS', '5'))
     audit_hash_algorithm: str = 'sha256'
+    audit_checkpoint_interval: int = int(os.getenv('AUDIT_CHECKPOINT_INTERVAL', '1024'))
     enable_audit_encryption: bool = os.getenv('AUDIT_ENABLE_ENCRYPTION', 'true').lower() == 'true'
     
     # Compliance Configuration
@@ -55,7 +59,7 @@ class AuditComplianceConfig:
     anonymous_reporting: bool = os.getenv('ANONYMOUS_REPORTING', 'true').lower() == 'true'
     
     # Regulatory Configuration
-    regulatory_jurisdictions: List[str] = os.getenv('REGULATORY_JURISDICTIONS', 'US,EU,UK').split(',')
+    regulatory_jurisdictions: List[str] = field(default_factory=lambda: os.getenv('REGULATORY_JURISDICTIONS', 'US,EU,UK').split(','))
     ofac_sanctions_list_url: str = os.getenv('OFAC_SANCTIONS_URL', 'https://www.treasury.gov/ofac/downloads/sdn.xml')
     
     # Performance Configuration
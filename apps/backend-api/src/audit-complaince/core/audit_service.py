@@ -1,40 +1,138 @@
+import base64
 import hashlib
 import json
+import os
+import struct
 import asyncio
+import random
+import uuid
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, Optional, List
-from cryptography.fernet import Fernet
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from functools import lru_cache
+import orjson
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc
+from sqlalchemy import select, and_, desc, bindparam, lambda_stmt, JSON
+from sqlalchemy.exc import IntegrityError
 from prometheus_client import Counter, Histogram, Gauge
 
-from database.models import AuditLog
+from database.models import AuditLog, AuditCheckpoint, AuditDeadLetter
 from config import config
 
 logger = structlog.get_logger(__name__)
 
+# Metrics are registered once per process; service instances are created per request
+AUDIT_LOGS_CREATED = Counter(
+    'audit_logs_created_total',
+    'Total audit logs created',
+    ['action', 'resource_type']
+)
+AUDIT_QUERY_DURATION = Histogram(
+    'audit_query_duration_seconds',
+    'Audit query duration',
+    ['query_type']
+)
+AUDIT_CHAIN_INTEGRITY = Gauge(
+    'audit_chain_integrity_status',
+    'Audit chain integrity status (1=valid, 0=invalid)'
+)
+
+# Column order used for COPY-based bulk inserts
+_AUDIT_LOG_COLUMNS = list(AuditLog.__table__.columns)
+
+# Queue sentinels asking the flush loop to write its current batch immediately, or to write it and exit
+_FLUSH_NOW = object()
+_STOP = object()
+
+# Hot statements are built once at import; per-call values are passed as bind parameters
+# The chain is ordered by sequence, its write order; batched entries can carry earlier timestamps than logs before them
+_CHAIN_HEAD_STMT = select(AuditLog.hash_value, AuditLog.sequence).order_by(desc(AuditLog.sequence)).limit(1)
+_LOGS_IN_ORDER_STMT = select(AuditLog).order_by(AuditLog.sequence)
+_LOGS_FROM_STMT = _LOGS_IN_ORDER_STMT.where(AuditLog.timestamp >= bindparam('start_date'))
+_LOGS_AFTER_STMT = _LOGS_IN_ORDER_STMT.where(AuditLog.sequence > bindparam('after'))
+_LOGS_BETWEEN_STMT = _LOGS_IN_ORDER_STMT.where(
+    and_(
+        AuditLog.sequence >= bindparam('first_sequence'),
+        AuditLog.sequence <= bindparam('last_sequence')
+    )
+)
+_CHECKPOINTS_IN_ORDER_STMT = select(AuditCheckpoint).order_by(AuditCheckpoint.sequence_end)
+_LAST_CHECKPOINT_STMT = select(AuditCheckpoint).order_by(desc(AuditCheckpoint.sequence_end)).limit(1)
+
+# Attempts at claiming the next chain sequence when concurrent writers race for it
+_CHAIN_CONFLICT_ATTEMPTS = 3
+
+# Hash formats, stamped on each log so rows keep verifying under the format they were written with:
+# 1 is the original sorted-key JSON document, 2 the struct-packed canonical form below
+_LEGACY_JSON_HASH_VERSION = 1
+_PACKED_HASH_VERSION = 2
+_CURRENT_HASH_VERSION = _PACKED_HASH_VERSION
+
+# Canonical hash encoding: big-endian int64 microseconds and uint32 length prefixes
+_TIMESTAMP_STRUCT = struct.Struct('>q')
+_LENGTH_STRUCT = struct.Struct('>I')
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_HASH_JSON_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+def _len_prefixed(data: bytes) -> bytes:
+    return _LENGTH_STRUCT.pack(len(data)) + data
+
+def _text_field(value: Any) -> bytes:
+    return _len_prefixed(str(value or '').encode())
+
+def _timestamp_micros(timestamp: Optional[datetime]) -> int:
+    """Microseconds since the epoch, treating naive timestamps as UTC"""
+    if timestamp is None:
+        return 0
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+def _merkle_root(leaves: List[str]) -> str:
+    """Compute the SHA-256 Merkle root over a segment of audit log hashes"""
+    level = [hashlib.sha256(leaf.encode()).digest() for leaf in leaves]
+    if not level:
+        return hashlib.sha256(b'').hexdigest()
+    
+    while len(level) > 1:
+        if len(level) % 2:
+            level.append(level[-1])
+        level = [hashlib.sha256(level[i] + level[i + 1]).digest() for i in range(0, len(level), 2)]
+    
+    return level[0].hex()
+
+class _AESGCMCipher:
+    """AES-GCM cipher exposing encrypt/decrypt over base64(nonce + ciphertext) tokens"""
+    NONCE_SIZE = 12
+
+    def __init__(self, key: bytes):
+        self._aead = AESGCM(key)
+
+    def encrypt(self, data: bytes) -> bytes:
+        nonce = os.urandom(self.NONCE_SIZE)
+        return base64.urlsafe_b64encode(nonce + self._aead.encrypt(nonce, data, None))
+
+    def decrypt(self, token: bytes) -> bytes:
+        raw = base64.urlsafe_b64decode(token)
+        return self._aead.decrypt(raw[:self.NONCE_SIZE], raw[self.NONCE_SIZE:], None)
+
+@lru_cache(maxsize=4)
+def _get_cipher_suite(key: bytes) -> _AESGCMCipher:
+    """Return the process-wide cipher for a key"""
+    return _AESGCMCipher(key)
+
 class AuditService:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
-        self.encryption_key = config.encryption_key.encode()[:32]  # Ensure 32 bytes
-        self.cipher_suite = Fernet(Fernet.generate_key()) if config.enable_audit_encryption else None
+        # AES-256 needs exactly 32 bytes; hashing accepts a configured secret of any length
+        self.encryption_key = hashlib.sha256(config.encryption_key.encode()).digest()
+        self.cipher_suite = _get_cipher_suite(self.encryption_key) if config.enable_audit_encryption else None
         
         # Metrics
-        self.audit_logs_created = Counter(
-            'audit_logs_created_total',
-            'Total audit logs created',
-            ['action', 'resource_type']
-        )
-        self.audit_query_duration = Histogram(
-            'audit_query_duration_seconds',
-            'Audit query duration',
-            ['query_type']
-        )
-        self.audit_chain_integrity = Gauge(
-            'audit_chain_integrity_status',
-            'Audit chain integrity status (1=valid, 0=invalid)'
-        )
+        self.audit_logs_created = AUDIT_LOGS_CREATED
+        self.audit_query_duration = AUDIT_QUERY_DURATION
+        self.audit_chain_integrity = AUDIT_CHAIN_INTEGRITY
     
     async def log_activity(
         self,
@@ -52,56 +150,24 @@ class AuditService:
     ) -> str:
         """Log an activity with full audit trail"""
         try:
-            # Get the last audit log for hash chaining
-            previous_hash = await self._get_last_hash()
+            # Batched entries were queued earlier, so they must land first to keep the chain ordered
+            await self.flush_pending()
             
-            # Create audit log entry
-            audit_log = AuditLog(
+            audit_log = await self._insert_audit_log(
                 timestamp=datetime.now(timezone.utc),
-                user_id=user_id,
-                session_id=session_id,
                 action=action,
                 resource_type=resource_type,
+                user_id=user_id,
                 resource_id=resource_id,
-                ip_address=ip_address,
-                user_agent=user_agent,
                 before_data=before_data,
                 after_data=after_data,
-                metadata=metadata,
-                previous_hash=previous_hash,
-                compliance_relevant=compliance_relevant,
-                retention_until=datetime.now(timezone.utc) + timedelta(days=config.audit_retention_days)
+                log_metadata=metadata,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                session_id=session_id,
+                compliance_relevant=compliance_relevant
             )
             
-            # Calculate hash for integrity
-            audit_log.hash_value = self._calculate_hash(audit_log)
-            
-            # Encrypt sensitive data if enabled
-            if config.enable_audit_encryption and self.cipher_suite:
-                sensitive_data = {
-                    'before_data': before_data,
-                    'after_data': after_data,
-                    'metadata': metadata
-                }
-                audit_log.encrypted_data = self.cipher_suite.encrypt(
-                    json.dumps(sensitive_data).encode()
-                ).decode()
-                
-                # Clear original data
-                audit_log.before_data = None
-                audit_log.after_data = None
-                audit_log.metadata = {'encrypted': True}
-            
-            # Save to database
-            self.db_session.add(audit_log)
-            await self.db_session.commit()
-            
-            # Update metrics
-            self.audit_logs_created.labels(
-                action=action,
-                resource_type=resource_type
-            ).inc()
-            
             logger.info(
                 "Audit log created",
                 audit_id=str(audit_log.id),
@@ -114,8 +180,130 @@ class AuditService:
             
         except Exception as e:
             logger.error(f"Failed to create audit log: {e}")
+            raise
+    
+    async def _insert_audit_log(self, **fields: Any) -> AuditLog:
+        """Chain one audit log onto the latest hash and commit it"""
+        for attempt in range(1, _CHAIN_CONFLICT_ATTEMPTS + 1):
+            try:
+                # Get the last audit log for hash chaining
+                previous_hash, last_sequence = await self._get_chain_head()
+                audit_log = self._build_audit_log(previous_hash=previous_hash, sequence=last_sequence + 1, **fields)
+                
+                # Save to database
+                self.db_session.add(audit_log)
+                await self.db_session.commit()
+                # Detached, so a failed seal below cannot expire the committed log it returns
+                self.db_session.expunge(audit_log)
+                break
+                
+            except IntegrityError:
+                # Another writer took this sequence; chain onto its log instead of forking the chain
+                await self.db_session.rollback()
+                if attempt == _CHAIN_CONFLICT_ATTEMPTS:
+                    raise
+            except Exception:
+                await self.db_session.rollback()
+                raise
+        
+        # Update metrics
+        self.audit_logs_created.labels(
+            action=audit_log.action,
+            resource_type=audit_log.resource_type
+        ).inc()
+        
+        await self._seal_completed_segments(last_sequence, audit_log.sequence)
+        return audit_log
+    
+    async def log_activity_batched(
+        self,
+        action: str,
+        resource_type: str,
+        user_id: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        before_data: Optional[Dict[str, Any]] = None,
+        after_data: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        session_id: Optional[str] = None,
+        compliance_relevant: bool = False
+    ) -> str:
+        """Queue an activity for bulk insertion via COPY"""
+        # Compliance-relevant events keep the strictly ordered, synchronous path, as does a process
+        # without a running batch writer
+        if compliance_relevant or _batch_writer is None:
+            return await self.log_activity(
+                action=action,
+                resource_type=resource_type,
+                user_id=user_id,
+                resource_id=resource_id,
+                before_data=before_data,
+                after_data=after_data,
+                metadata=metadata,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                session_id=session_id,
+                compliance_relevant=compliance_relevant
+            )
+        
+        audit_id = uuid.uuid4()
+        await _batch_writer.put({
+            'id': audit_id,
+            'timestamp': datetime.now(timezone.utc),
+            'action': action,
+            'resource_type': resource_type,
+            'user_id': user_id,
+            'resource_id': resource_id,
+            'before_data': before_data,
+            'after_data': after_data,
+            'log_metadata': metadata,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'session_id': session_id,
+            'compliance_relevant': False
+        })
+        return str(audit_id)
+    
+    async def flush_pending(self):
+        """Wait until every queued batched entry has been written"""
+        if _batch_writer is not None:
+            await _batch_writer.flush()
+    
+    async def _flush_batch(self, batch: List[Dict[str, Any]]):
+        """Chain, hash and COPY a batch of queued entries in a single round-trip"""
+        try:
+            previous_hash, last_sequence = await self._get_chain_head()
+            
+            records = []
+            for sequence, entry in enumerate(batch, start=last_sequence + 1):
+                audit_log = self._build_audit_log(previous_hash=previous_hash, sequence=sequence, **entry)
+                previous_hash = audit_log.hash_value
+                records.append(self._to_copy_record(audit_log))
+            
+            connection = await self.db_session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                AuditLog.__tablename__,
+                records=records,
+                columns=[column.name for column in _AUDIT_LOG_COLUMNS]
+            )
+            await self.db_session.commit()
+            
+            for entry in batch:
+                self.audit_logs_created.labels(
+                    action=entry['action'],
+                    resource_type=entry['resource_type']
+                ).inc()
+            
+            logger.info("Audit batch flushed", batch_size=len(batch))
+            
+        except Exception as e:
+            logger.error(f"Failed to write audit batch: {e}")
             await self.db_session.rollback()
             raise
+        
+        await self._seal_completed_segments(last_sequence, last_sequence + len(batch))
     
     async def get_audit_trail(
         self,
@@ -132,29 +320,25 @@ class AuditService:
         start_time = asyncio.get_event_loop().time()
         
         try:
-            query = select(AuditLog)
+            # Lambda statements are cached per combination of filters; closure values become bind parameters
+            query = lambda_stmt(lambda: select(AuditLog))
             
             # Apply filters
-            conditions = []
             if resource_type:
-                conditions.append(AuditLog.resource_type == resource_type)
+                query += lambda q: q.where(AuditLog.resource_type == resource_type)
             if resource_id:
-                conditions.append(AuditLog.resource_id == resource_id)
+                query += lambda q: q.where(AuditLog.resource_id == resource_id)
             if user_id:
-                conditions.append(AuditLog.user_id == user_id)
+                query += lambda q: q.where(AuditLog.user_id == user_id)
             if action:
-                conditions.append(AuditLog.action == action)
+                query += lambda q: q.where(AuditLog.action == action)
             if start_date:
-                conditions.append(AuditLog.timestamp >= start_date)
+                query += lambda q: q.where(AuditLog.timestamp >= start_date)
             if end_date:
-                conditions.append(AuditLog.timestamp <= end_date)
-            
-            if conditions:
-                query = query.where(and_(*conditions))
+                query += lambda q: q.where(AuditLog.timestamp <= end_date)
             
             # Order by timestamp descending
-            query = query.order_by(desc(AuditLog.timestamp))
-            query = query.limit(limit).offset(offset)
+            query += lambda q: q.order_by(desc(AuditLog.timestamp)).limit(limit).offset(offset)
             
             result = await self.db_session.execute(query)
             audit_logs = result.scalars().all()
@@ -190,7 +374,7 @@ class AuditService:
                     log_dict.update({
                         'before_data': log.before_data,
                         'after_data': log.after_data,
-                        'metadata': log.metadata
+                        'metadata': log.log_metadata
                     })
                 
                 trail.append(log_dict)
@@ -205,14 +389,21 @@ class AuditService:
             logger.error(f"Failed to retrieve audit trail: {e}")
             raise
     
-    async def verify_integrity(self, start_date: Optional[datetime] = None) -> Dict[str, Any]:
+    async def verify_integrity(
+        self,
+        start_date: Optional[datetime] = None,
+        mode: str = 'full',
+        spot_checks: int = 3
+    ) -> Dict[str, Any]:
         """Verify the integrity of the audit chain"""
+        if mode == 'fast':
+            return await self._verify_checkpoints(spot_checks)
+        
         try:
-            query = select(AuditLog).order_by(AuditLog.timestamp)
             if start_date:
-                query = query.where(AuditLog.timestamp >= start_date)
-            
-            result = await self.db_session.execute(query)
+                result = await self.db_session.execute(_LOGS_FROM_STMT, {'start_date': start_date})
+            else:
+                result = await self.db_session.execute(_LOGS_IN_ORDER_STMT)
             audit_logs = result.scalars().all()
             
             integrity_status = {
@@ -222,48 +413,209 @@ class AuditService:
                 'broken_chains': [],
                 'hash_mismatches': []
             }
+            self._verify_chain(audit_logs, integrity_status)
             
-            previous_hash = None
-            for log in audit_logs:
-                # Verify hash chain
-                if previous_hash and log.previous_hash != previous_hash:
+            # Update metrics
+            self.audit_chain_integrity.set(1 if integrity_status['is_valid'] else 0)
+            
+            logger.info(
+                "Audit integrity verification completed",
+                is_valid=integrity_status['is_valid'],
+                total_logs=integrity_status['total_logs'],
+                verified_logs=integrity_status['verified_logs']
+            )
+            
+            return integrity_status
+            
+        except Exception as e:
+            logger.error(f"Failed to verify audit integrity: {e}")
+            raise
+    
+    async def checkpoint_pending(self) -> int:
+        """
+        Seal a Merkle checkpoint over every complete segment not yet covered, in sequence order.
+        Each segment's chain is verified first, linked to the log before it, and sealing stops at
+        the first segment that fails, so a root is never written over tampered logs.
+        """
+        try:
+            result = await self.db_session.execute(_LAST_CHECKPOINT_STMT)
+            last_checkpoint = result.scalar_one_or_none()
+            
+            interval = config.audit_checkpoint_interval
+            prev_root = last_checkpoint.merkle_root if last_checkpoint else None
+            sequence_end = last_checkpoint.sequence_end if last_checkpoint else 0
+            created = 0
+            
+            while True:
+                # The log before the segment anchors its first previous_hash
+                result = await self.db_session.execute(
+                    _LOGS_BETWEEN_STMT, {'first_sequence': sequence_end, 'last_sequence': sequence_end + interval}
+                )
+                logs = result.scalars().all()
+                segment = [log for log in logs if log.sequence > sequence_end]
+                if len(segment) < interval:
+                    break
+                
+                integrity_status = {'is_valid': True, 'verified_logs': 0, 'broken_chains': [], 'hash_mismatches': []}
+                self._verify_chain(logs, integrity_status)
+                if not integrity_status['is_valid']:
+                    self.audit_chain_integrity.set(0)
+                    logger.error(
+                        "Audit segment failed verification, not sealing it",
+                        sequence_start=sequence_end + 1,
+                        broken_chains=integrity_status['broken_chains'],
+                        hash_mismatches=integrity_status['hash_mismatches']
+                    )
+                    break
+                
+                merkle_root = _merkle_root([log.hash_value for log in segment])
+                sequence_end = segment[-1].sequence
+                self.db_session.add(AuditCheckpoint(
+                    sequence_end=sequence_end,
+                    leaf_count=len(segment),
+                    first_log_id=segment[0].id,
+                    last_log_id=segment[-1].id,
+                    start_timestamp=segment[0].timestamp,
+                    end_timestamp=segment[-1].timestamp,
+                    merkle_root=merkle_root,
+                    prev_root=prev_root
+                ))
+                prev_root = merkle_root
+                created += 1
+            
+            if created:
+                await self.db_session.commit()
+                logger.info("Audit checkpoints created", checkpoints=created, sequence_end=sequence_end)
+            
+            return created
+            
+        except Exception as e:
+            logger.error(f"Failed to create audit checkpoints: {e}")
+            await self.db_session.rollback()
+            raise
+    
+    async def _seal_completed_segments(self, previous_sequence: int, last_sequence: int):
+        """Seal checkpoints at ingest once a write completes a segment; a failure leaves them for the next write"""
+        interval = config.audit_checkpoint_interval
+        if last_sequence // interval == previous_sequence // interval:
+            return
+        try:
+            await self.checkpoint_pending()
+        except Exception:
+            pass # Already logged by checkpoint_pending
+    
+    async def _verify_checkpoints(self, spot_checks: int) -> Dict[str, Any]:
+        """Verify the checkpoint chain, spot-check random segments and walk the uncovered tail; never writes"""
+        try:
+            result = await self.db_session.execute(_CHECKPOINTS_IN_ORDER_STMT)
+            checkpoints = result.scalars().all()
+            
+            integrity_status = {
+                'is_valid': True,
+                'mode': 'fast',
+                'total_checkpoints': len(checkpoints),
+                'broken_checkpoints': [],
+                'segment_mismatches': [],
+                'spot_checked_segments': 0,
+                'pruned_segments': 0,
+                'total_logs': 0,
+                'verified_logs': 0,
+                'broken_chains': [],
+                'hash_mismatches': []
+            }
+            
+            # Each checkpoint must link to the root before it
+            prev_root = None
+            for checkpoint in checkpoints:
+                if checkpoint.prev_root != prev_root:
                     integrity_status['is_valid'] = False
-                    integrity_status['broken_chains'].append({
-                        'log_id': str(log.id),
-                        'expected_previous_hash': previous_hash,
-                        'actual_previous_hash': log.previous_hash
+                    integrity_status['broken_checkpoints'].append({
+                        'sequence_end': checkpoint.sequence_end,
+                        'expected_prev_root': prev_root,
+                        'actual_prev_root': checkpoint.prev_root
                     })
+                prev_root = checkpoint.merkle_root
+            
+            # Recompute a few random segments against their stored roots
+            for checkpoint in random.sample(checkpoints, min(spot_checks, len(checkpoints))):
+                result = await self.db_session.execute(
+                    _LOGS_BETWEEN_STMT,
+                    {'first_sequence': checkpoint.sequence_end - checkpoint.leaf_count + 1, 'last_sequence': checkpoint.sequence_end}
+                )
+                segment_logs = result.scalars().all()
+                
+                # Segments removed by the retention policy can no longer be recomputed
+                if not segment_logs:
+                    integrity_status['pruned_segments'] += 1
+                    continue
+                
+                integrity_status['spot_checked_segments'] += 1
+                integrity_status['total_logs'] += len(segment_logs)
+                self._verify_chain(segment_logs, integrity_status)
                 
-                # Verify log hash
-                calculated_hash = self._calculate_hash(log)
-                if calculated_hash != log.hash_value:
+                merkle_root = _merkle_root([log.hash_value for log in segment_logs])
+                if len(segment_logs) != checkpoint.leaf_count or merkle_root != checkpoint.merkle_root:
                     integrity_status['is_valid'] = False
-                    integrity_status['hash_mismatches'].append({
-                        'log_id': str(log.id),
-                        'expected_hash': calculated_hash,
-                        'actual_hash': log.hash_value
+                    integrity_status['segment_mismatches'].append({
+                        'sequence_end': checkpoint.sequence_end,
+                        'expected_root': checkpoint.merkle_root,
+                        'actual_root': merkle_root,
+                        'expected_leaves': checkpoint.leaf_count,
+                        'actual_leaves': len(segment_logs)
                     })
-                else:
-                    integrity_status['verified_logs'] += 1
-                
-                previous_hash = log.hash_value
+            
+            # Logs after the last checkpoint are not covered by any root yet
+            result = await self.db_session.execute(
+                _LOGS_AFTER_STMT, {'after': checkpoints[-1].sequence_end if checkpoints else 0}
+            )
+            tail_logs = result.scalars().all()
+            integrity_status['total_logs'] += len(tail_logs)
+            self._verify_chain(tail_logs, integrity_status)
             
             # Update metrics
             self.audit_chain_integrity.set(1 if integrity_status['is_valid'] else 0)
             
             logger.info(
-                "Audit integrity verification completed",
+                "Audit fast integrity verification completed",
                 is_valid=integrity_status['is_valid'],
-                total_logs=integrity_status['total_logs'],
+                total_checkpoints=integrity_status['total_checkpoints'],
+                spot_checked_segments=integrity_status['spot_checked_segments'],
                 verified_logs=integrity_status['verified_logs']
             )
             
             return integrity_status
             
         except Exception as e:
-            logger.error(f"Failed to verify audit integrity: {e}")
+            logger.error(f"Failed to verify audit checkpoints: {e}")
             raise
     
+    def _verify_chain(self, audit_logs: List[AuditLog], integrity_status: Dict[str, Any]):
+        """Check hash linkage and recompute hashes for an ordered run of logs"""
+        previous_hash = None
+        for log in audit_logs:
+            # Verify hash chain
+            if previous_hash and log.previous_hash != previous_hash:
+                integrity_status['is_valid'] = False
+                integrity_status['broken_chains'].append({
+                    'log_id': str(log.id),
+                    'expected_previous_hash': previous_hash,
+                    'actual_previous_hash': log.previous_hash
+                })
+            
+            # Verify log hash
+            calculated_hash = self._calculate_hash(log)
+            if calculated_hash != log.hash_value:
+                integrity_status['is_valid'] = False
+                integrity_status['hash_mismatches'].append({
+                    'log_id': str(log.id),
+                    'expected_hash': calculated_hash,
+                    'actual_hash': log.hash_value
+                })
+            else:
+                integrity_status['verified_logs'] += 1
+            
+            previous_hash = log.hash_value
+    
     async def export_audit_data(
         self,
         format_type: str = 'json',
@@ -348,8 +700,79 @@ class AuditService:
             await self.db_session.rollback()
             raise
     
+    def _build_audit_log(
+        self,
+        previous_hash: Optional[str],
+        timestamp: datetime,
+        action: str,
+        resource_type: str,
+        compliance_relevant: bool = False,
+        id: Optional[uuid.UUID] = None,
+        **fields: Any
+    ) -> AuditLog:
+        """Create a hashed, optionally encrypted audit log entry"""
+        audit_log = AuditLog(
+            id=id or uuid.uuid4(),
+            timestamp=timestamp,
+            action=action,
+            resource_type=resource_type,
+            previous_hash=previous_hash,
+            compliance_relevant=compliance_relevant,
+            retention_until=timestamp + timedelta(days=config.audit_retention_days),
+            hash_version=_CURRENT_HASH_VERSION,
+            **fields
+        )
+        
+        # Calculate hash for integrity
+        audit_log.hash_value = self._calculate_hash(audit_log)
+        
+        # Encrypt sensitive data if enabled
+        if config.enable_audit_encryption and self.cipher_suite:
+            sensitive_data = {
+                'before_data': audit_log.before_data,
+                'after_data': audit_log.after_data,
+                'metadata': audit_log.log_metadata
+            }
+            audit_log.encrypted_data = self.cipher_suite.encrypt(
+                json.dumps(sensitive_data).encode()
+            ).decode()
+            
+            # Clear original data
+            audit_log.before_data = None
+            audit_log.after_data = None
+            audit_log.log_metadata = {'encrypted': True}
+        
+        return audit_log
+    
+    def _to_copy_record(self, audit_log: AuditLog) -> tuple:
+        """Flatten an audit log into a COPY row; JSON columns are sent as text"""
+        record = []
+        for column in _AUDIT_LOG_COLUMNS:
+            value = getattr(audit_log, column.key)
+            if value is not None and isinstance(column.type, JSON):
+                value = json.dumps(value, default=str)
+            record.append(value)
+        return tuple(record)
+    
     def _calculate_hash(self, audit_log: AuditLog) -> str:
-        """Calculate hash for audit log integrity"""
+        """Calculate hash for audit log integrity, in the format the log was written with"""
+        if audit_log.hash_version == _LEGACY_JSON_HASH_VERSION:
+            return self._calculate_legacy_json_hash(audit_log)
+        canonical = b''.join((
+            _TIMESTAMP_STRUCT.pack(_timestamp_micros(audit_log.timestamp)),
+            _text_field(audit_log.user_id),
+            _text_field(audit_log.action),
+            _text_field(audit_log.resource_type),
+            _text_field(audit_log.resource_id),
+            _len_prefixed(orjson.dumps(audit_log.before_data, default=str, option=_HASH_JSON_OPTIONS)),
+            _len_prefixed(orjson.dumps(audit_log.after_data, default=str, option=_HASH_JSON_OPTIONS)),
+            _len_prefixed(orjson.dumps(audit_log.log_metadata, default=str, option=_HASH_JSON_OPTIONS)),
+            _text_field(audit_log.previous_hash)
+        ))
+        return hashlib.sha256(canonical).hexdigest()
+
+    def _calculate_legacy_json_hash(self, audit_log: AuditLog) -> str:
+        """Hash format of logs written before hash_version 2; only used to verify them"""
         hash_data = {
             'timestamp': audit_log.timestamp.isoformat() if audit_log.timestamp else '',
             'user_id': audit_log.user_id or '',
@@ -358,19 +781,172 @@ class AuditService:
             'resource_id': audit_log.resource_id or '',
             'before_data': audit_log.before_data,
             'after_data': audit_log.after_data,
-            'metadata': audit_log.metadata,
+            'metadata': audit_log.log_metadata,
             'previous_hash': audit_log.previous_hash or ''
         }
         
         hash_string = json.dumps(hash_data, sort_keys=True, default=str)
         return hashlib.sha256(hash_string.encode()).hexdigest()
     
-    async def _get_last_hash(self) -> Optional[str]:
-        """Get the hash of the last audit log for chaining"""
+    async def _get_chain_head(self) -> Tuple[Optional[str], int]:
+        """Get the hash and sequence of the last audit log for chaining; (None, 0) for an empty chain"""
+        result = await self.db_session.execute(_CHAIN_HEAD_STMT)
+        head = result.one_or_none()
+        if head is None:
+            return None, 0
+        last_hash, last_sequence = head
+        return last_hash, last_sequence
+
+class AuditBatchWriter:
+    """Process-wide batched ingest: one queue, one flush task and one dedicated session"""
+    
+    def __init__(self, session_factory: Callable[[], AsyncSession]):
+        self._session_factory = session_factory
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._audit_service: Optional[AuditService] = None
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Open the writer's own session and start the flush loop"""
+        self._audit_service = AuditService(self._session_factory())
+        self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def put(self, entry: Dict[str, Any]):
+        await self._queue.put(entry)
+    
+    async def flush(self):
+        """Wait until every queued entry has been written or dead-lettered, for at most the flush timeout"""
+        # The sentinel cuts the current batching window short
+        await self._queue.put(_FLUSH_NOW)
         try:
-            query = select(AuditLog.hash_value).order_by(desc(AuditLog.timestamp)).limit(1)
-            result = await self.db_session.execute(query)
-            last_hash = result.scalar_one_or_none()
-            return last_hash
-        except Exception:
-            return None
+            await asyncio.wait_for(self._queue.join(), config.audit_flush_timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out waiting for queued audit entries", pending=self._queue.qsize())
+    
+    async def close(self):
+        """Write everything still queued, then stop the flush loop and close the session"""
+        await self._queue.put(_STOP)
+        await self._flush_task
+        await self._audit_service.db_session.close()
+    
+    async def _flush_loop(self):
+        """Drain the queue every flush interval or once a full batch is waiting"""
+        loop = asyncio.get_running_loop()
+        flush_interval = config.audit_batch_flush_interval_ms / 1000
+        
+        # Entries taken off the queue but not yet written; a failed write keeps them for the next attempt
+        batch: List[Dict[str, Any]] = []
+        stopping = False
+        # Failed attempts at writing the entry at the head of the batch
+        head_attempts = 0
+        
+        while True:
+            deadline = loop.time() + flush_interval if batch else None
+            
+            while not stopping and len(batch) < config.max_audit_batch_size:
+                if deadline is None:
+                    entry = await self._queue.get()
+                    deadline = loop.time() + flush_interval
+                else:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                
+                if entry is _FLUSH_NOW or entry is _STOP:
+                    self._queue.task_done()
+                    stopping = entry is _STOP
+                    break
+                batch.append(entry)
+            
+            # Entries count as done only once written, so flush() keeps waiting through a retry
+            written, error = await self._write(batch)
+            del batch[:written]
+            for _ in range(written):
+                self._queue.task_done()
+            
+            if not batch:
+                head_attempts = 0
+                if stopping:
+                    return
+                continue
+            
+            head_attempts = 1 if written else head_attempts + 1
+            if head_attempts < config.audit_batch_max_write_attempts:
+                await asyncio.sleep(flush_interval * 2 ** (head_attempts - 1))
+                continue
+            
+            # The head entry keeps failing, so it stops holding back the entries queued behind it;
+            # at shutdown nothing is left to wait for, so everything still unwritten goes with it
+            failed = batch[:] if stopping else batch[:1]
+            del batch[:len(failed)]
+            await self._dead_letter(failed, error, head_attempts)
+            for _ in failed:
+                self._queue.task_done()
+            head_attempts = 0
+            if stopping and not batch:
+                return
+    
+    async def _dead_letter(self, entries: List[Dict[str, Any]], error: Optional[Exception], attempts: int):
+        """Park entries that could not be written in audit_dead_letters, or log them if even that fails"""
+        session = self._audit_service.db_session
+        try:
+            session.add_all([
+                AuditDeadLetter(
+                    audit_id=entry['id'],
+                    entry=json.loads(json.dumps(entry, default=str)),
+                    error=str(error) if error else None,
+                    attempts=attempts
+                )
+                for entry in entries
+            ])
+            await session.commit()
+            logger.error("Audit entries moved to dead letters", count=len(entries), error=str(error))
+        except Exception as e:
+            await session.rollback()
+            for entry in entries:
+                logger.error(f"Audit entry not persisted: {e}", entry=entry, error=str(error))
+    
+    async def _write(self, batch: List[Dict[str, Any]]) -> Tuple[int, Optional[Exception]]:
+        """
+        Write a batch with one COPY, falling back to row-by-row inserts.
+        Returns how many leading entries landed, and the error that stopped the rest.
+        """
+        if not batch:
+            return 0, None
+        
+        try:
+            await self._audit_service._flush_batch(batch)
+            return len(batch), None
+        except Exception as e:
+            logger.error(f"Failed to copy audit batch, writing entries one by one: {e}", batch_size=len(batch))
+        
+        # Row by row and in order, so a failing entry holds back the ones chained after it
+        for written, entry in enumerate(batch):
+            try:
+                await self._audit_service._insert_audit_log(**entry)
+            except Exception as e:
+                logger.error(f"Failed to write audit entry, keeping it queued: {e}", audit_id=str(entry['id']))
+                return written, e
+        return len(batch), None
+
+# The running process's batch writer, if any
+_batch_writer: Optional[AuditBatchWriter] = None
+
+def start_audit_batch_writer(session_factory: Callable[[], AsyncSession]) -> AuditBatchWriter:
+    """Start the process-wide batch writer on a session of its own"""
+    global _batch_writer
+    _batch_writer = AuditBatchWriter(session_factory)
+    _batch_writer.start()
+    return _batch_writer
+
+async def close_audit_batch_writer() -> None:
+    """Write whatever is still queued and stop the batch writer"""
+    global _batch_writer
+    if _batch_writer is None:
+        return
+    writer, _batch_writer = _batch_writer, None
+    await writer.close()
@@ -14,6 +14,51 @@ from config import config
 
 logger = structlog.get_logger(__name__)
 
+# Metrics are registered once per process; service instances are created per request
+COMPLIANCE_CHECKS_TOTAL = Counter(
+    'compliance_checks_total',
+    'Total compliance checks performed',
+    ['check_type', 'result']
+)
+VIOLATIONS_DETECTED = Counter(
+    'compliance_violations_detected_total',
+    'Total compliance violations detected',
+    ['rule_type', 'severity']
+)
+RISK_ASSESSMENTS_PERFORMED = Counter(
+    'risk_assessments_performed_total',
+    'Total risk assessments performed',
+    ['entity_type']
+)
+SANCTIONS_CHECKS = Counter(
+    'sanctions_checks_total',
+    'Total sanctions checks performed',
+    ['result']
+)
+ACTIVE_VIOLATIONS = Gauge(
+    'compliance_active_violations',
+    'Number of active compliance violations',
+    ['rule_type']
+)
+
+# Street designators collapsed to their USPS abbreviation before address comparison
+_SUFFIX_MAP = {
+    'street': 'st', 'avenue': 'ave', 'road': 'rd', 'boulevard': 'blvd',
+    'drive': 'dr', 'lane': 'ln', 'court': 'ct', 'place': 'pl',
+    'square': 'sq', 'terrace': 'ter', 'parkway': 'pkwy', 'highway': 'hwy',
+    'circle': 'cir', 'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'apartment': 'apt', 'suite': 'ste', 'floor': 'fl'
+}
+_SPLIT = re.compile(r'[\s,.#]+')
+
+def _normalize_street(street: str) -> str:
+    """Tokenize a street line, abbreviate suffixes and sort tokens so word order is ignored"""
+    tokens = {_SUFFIX_MAP.get(token, token) for token in _SPLIT.split(street.lower()) if token}
+    return ' '.join(sorted(tokens))
+
+# Character-set similarity ComplianceService._fuzzy_match requires by default; the sanctions prefilter uses the same bound
+_FUZZY_MATCH_THRESHOLD = 0.8
+
 @dataclass
 class RiskAssessment:
     entity_id: str
@@ -22,37 +67,96 @@ class RiskAssessment:
     risk_factors: List[str]
     recommendations: List[str]
 
+@dataclass
+class _SanctionsIndex:
+    """Pre-normalized, column-oriented snapshot of the active sanctions entries"""
+    version: Tuple[Any, ...]
+    ids: List[str]
+    list_names: List[str]
+    sources: List[str]
+    names: List[str]
+    normalized_names: List[str]
+    aliases: List[List[str]]
+    addresses: List[List[Dict[str, Any]]]
+    identifiers: List[Dict[str, str]]
+    name_char_sets: Dict[int, List[frozenset]]
+    identifier_pairs: frozenset
+
+    @classmethod
+    def build(cls, version: Tuple[Any, ...], entries: List[SanctionsList]) -> '_SanctionsIndex':
+        normalized_names = [entry.name.lower() for entry in entries]
+        aliases = [[alias.lower() for alias in (entry.aliases or [])] for entry in entries]
+        identifiers = [
+            {id_type: str(id_value).lower() for id_type, id_value in (entry.identifiers or {}).items()}
+            for entry in entries
+        ]
+        
+        # Distinct character sets of every entry name and alias, bucketed by size
+        char_sets = {frozenset(name) for name in normalized_names}
+        char_sets.update(frozenset(alias) for entry_aliases in aliases for alias in entry_aliases)
+        name_char_sets: Dict[int, List[frozenset]] = {}
+        for chars in char_sets:
+            if chars:
+                name_char_sets.setdefault(len(chars), []).append(chars)
+        
+        return cls(
+            version=version,
+            ids=[str(entry.id) for entry in entries],
+            list_names=[entry.list_name for entry in entries],
+            sources=[entry.source for entry in entries],
+            names=[entry.name for entry in entries],
+            normalized_names=normalized_names,
+            aliases=aliases,
+            addresses=[entry.addresses or [] for entry in entries],
+            identifiers=identifiers,
+            name_char_sets=name_char_sets,
+            identifier_pairs=frozenset(
+                pair for entry_identifiers in identifiers for pair in entry_identifiers.items()
+            )
+        )
+
+    def may_match(self, names: List[str], identifiers: Dict[str, Any]) -> bool:
+        """Cheap pre-check; False means no entry can reach the match threshold on names or identifiers"""
+        for id_type, id_value in identifiers.items():
+            if (id_type, str(id_value).lower()) in self.identifier_pairs:
+                return True
+        
+        # _fuzzy_match needs |A & B| / |A | B| >= threshold against a single entry name or alias, which is
+        # only reachable when threshold * |A| <= |B| <= |A| / threshold; word order does not matter to it
+        for name in names:
+            query_chars = set(name)
+            if not query_chars:
+                continue
+            size = len(query_chars)
+            for candidate_size in range(int(size * _FUZZY_MATCH_THRESHOLD), int(size / _FUZZY_MATCH_THRESHOLD) + 1):
+                for chars in self.name_char_sets.get(candidate_size, ()):
+                    if len(query_chars & chars) / len(query_chars | chars) >= _FUZZY_MATCH_THRESHOLD:
+                        return True
+        
+        return False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+# Shared across service instances; rebuilt when the active sanctions rows change
+_sanctions_index: Optional[_SanctionsIndex] = None
+
+def invalidate_sanctions_index() -> None:
+    """Drop the cached sanctions index so the next check reloads it"""
+    global _sanctions_index
+    _sanctions_index = None
+
 class ComplianceService:
     def __init__(self, db_session: AsyncSession, audit_service: AuditService):
         self.db_session = db_session
         self.audit_service = audit_service
         
         # Metrics
-        self.compliance_checks_total = Counter(
-            'compliance_checks_total',
-            'Total compliance checks performed',
-            ['check_type', 'result']
-        )
-        self.violations_detected = Counter(
-            'compliance_violations_detected_total',
-            'Total compliance violations detected',
-            ['rule_type', 'severity']
-        )
-        self.risk_assessments_performed = Counter(
-            'risk_assessments_performed_total',
-            'Total risk assessments performed',
-            ['entity_type']
-        )
-        self.sanctions_checks = Counter(
-            'sanctions_checks_total',
-            'Total sanctions checks performed',
-            ['result']
-        )
-        self.active_violations = Gauge(
-            'compliance_active_violations',
-            'Number of active compliance violations',
-            ['rule_type']
-        )
+        self.compliance_checks_total = COMPLIANCE_CHECKS_TOTAL
+        self.violations_detected = VIOLATIONS_DETECTED
+        self.risk_assessments_performed = RISK_ASSESSMENTS_PERFORMED
+        self.sanctions_checks = SANCTIONS_CHECKS
+        self.active_violations = ACTIVE_VIOLATIONS
     
     async def create_compliance_rule(
         self,
@@ -220,23 +324,26 @@ class ComplianceService:
             addresses = entity_data.get('addresses', [])
             identifiers = entity_data.get('identifiers', {})
             
-            # Query sanctions lists
-            query = select(SanctionsList).where(SanctionsList.is_active == True)
-            result = await self.db_session.execute(query)
-            sanctions_entries = result.scalars().all()
+            sanctions_index = await self._get_sanctions_index()
             
-            for entry in sanctions_entries:
+            # Most checks are negative; skip the per-entry scan when nothing can match. Two address
+            # matches alone reach the threshold, so any address forces the full scan
+            if addresses or sanctions_index.may_match([name, *aliases], identifiers):
+                candidates = range(len(sanctions_index))
+            else:
+                candidates = range(0)
+            
+            for i in candidates:
                 match_score = 0.0
                 match_reasons = []
                 
                 # Name matching
-                entry_name = entry.name.lower()
-                if self._fuzzy_match(name, entry_name):
+                if self._fuzzy_match(name, sanctions_index.normalized_names[i]):
                     match_score += 0.8
                     match_reasons.append('NAME_MATCH')
                 
                 # Alias matching
-                entry_aliases = [alias.lower() for alias in (entry.aliases or [])]
+                entry_aliases = sanctions_index.aliases[i]
                 for alias in aliases:
                     for entry_alias in entry_aliases:
                         if self._fuzzy_match(alias, entry_alias):
@@ -245,7 +352,7 @@ class ComplianceService:
                             break
                 
                 # Address matching
-                entry_addresses = entry.addresses or []
+                entry_addresses = sanctions_index.addresses[i]
                 for address in addresses:
                     for entry_address in entry_addresses:
                         if self._address_match(address, entry_address):
@@ -253,22 +360,22 @@ class ComplianceService:
                             match_reasons.append('ADDRESS_MATCH')
                 
                 # Identifier matching
-                entry_identifiers = entry.identifiers or {}
+                entry_identifiers = sanctions_index.identifiers[i]
                 for id_type, id_value in identifiers.items():
                     if id_type in entry_identifiers:
-                        if str(id_value).lower() == str(entry_identifiers[id_type]).lower():
+                        if str(id_value).lower() == entry_identifiers[id_type]:
                             match_score += 0.9
                             match_reasons.append(f'{id_type}_MATCH')
                 
                 # If significant match found
                 if match_score >= 0.7:
                     matches.append({
-                        'sanctions_entry_id': str(entry.id),
-                        'list_name': entry.list_name,
-                        'source': entry.source,
+                        'sanctions_entry_id': sanctions_index.ids[i],
+                        'list_name': sanctions_index.list_names[i],
+                        'source': sanctions_index.sources[i],
                         'match_score': min(match_score, 1.0),
                         'match_reasons': match_reasons,
-                        'entry_name': entry.name
+                        'entry_name': sanctions_index.names[i]
                     })
             
             # Determine result
@@ -277,7 +384,7 @@ class ComplianceService:
                 'is_sanctioned': is_sanctioned,
                 'matches': matches,
                 'check_timestamp': datetime.now(timezone.utc).isoformat(),
-                'total_lists_checked': len(sanctions_entries)
+                'total_lists_checked': len(sanctions_index)
             }
             
             # Create violation if sanctioned
@@ -586,7 +693,26 @@ class ComplianceService:
             logger.error(f"Failed to create violation: {e}")
             await self.db_session.rollback()
     
-    def _fuzzy_match(self, str1: str, str2: str, threshold: float = 0.8) -> bool:
+    async def _get_sanctions_index(self) -> _SanctionsIndex:
+        """Return the cached sanctions index, reloading it if the active rows changed"""
+        global _sanctions_index
+        
+        version_query = select(
+            func.max(SanctionsList.last_updated),
+            func.count(SanctionsList.id)
+        ).where(SanctionsList.is_active == True)
+        result = await self.db_session.execute(version_query)
+        version = tuple(result.one())
+        
+        if _sanctions_index is None or _sanctions_index.version != version:
+            query = select(SanctionsList).where(SanctionsList.is_active == True)
+            result = await self.db_session.execute(query)
+            _sanctions_index = _SanctionsIndex.build(version, result.scalars().all())
+            logger.info("Sanctions index rebuilt", entries=len(_sanctions_index))
+        
+        return _sanctions_index
+    
+    def _fuzzy_match(self, str1: str, str2: str, threshold: float = _FUZZY_MATCH_THRESHOLD) -> bool:
         """Perform fuzzy string matching"""
         # Simple implementation - in production, use libraries like fuzzywuzzy
         if not str1 or not str2:
@@ -609,11 +735,10 @@ class ComplianceService:
     
     def _address_match(self, addr1: Dict[str, Any], addr2: Dict[str, Any]) -> bool:
         """Match addresses with some tolerance"""
-        # Simple address matching - in production, use address normalization
-        street1 = addr1.get('street', '').lower()
-        street2 = addr2.get('street', '').lower()
-        city1 = addr1.get('city', '').lower()
-        city2 = addr2.get('city', '').lower()
+        street1 = _normalize_street(addr1.get('street', ''))
+        street2 = _normalize_street(addr2.get('street', ''))
+        city1 = addr1.get('city', '').strip().lower()
+        city2 = addr2.get('city', '').strip().lower()
         
         return (self._fuzzy_match(street1, street2, 0.7) and 
                 self._fuzzy_match(city1, city2, 0.8))
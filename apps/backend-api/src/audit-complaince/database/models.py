@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, JSON, Index, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Boolean, Float, JSON, Index, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -12,6 +12,7 @@ class AuditLog(Base):
     __tablename__ = 'audit_logs'
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    sequence = Column(BigInteger, nullable=False, unique=True)  # Position in the hash chain, in write order
     timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     user_id = Column(String(255), nullable=True)
     session_id = Column(String(255), nullable=True)
@@ -24,11 +25,12 @@ class AuditLog(Base):
     # Audit data
     before_data = Column(JSON, nullable=True)
     after_data = Column(JSON, nullable=True)
-    metadata = Column(JSON, nullable=True)
+    log_metadata = Column('metadata', JSON, nullable=True)  # 'metadata' is reserved by the declarative API
     
     # Integrity and security
     hash_value = Column(String(64), nullable=False)
     previous_hash = Column(String(64), nullable=True)
+    hash_version = Column(Integer, nullable=False, server_default='1')  # Rows from before versioning hash as version 1
     encrypted_data = Column(Text, nullable=True)
     
     # Compliance flags
@@ -44,6 +46,38 @@ class AuditLog(Base):
         Index('idx_audit_hash_chain', 'hash_value', 'previous_hash'),
     )
 
+class AuditCheckpoint(Base):
+    __tablename__ = 'audit_checkpoints'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    sequence_end = Column(BigInteger, nullable=False, unique=True)  # Sequence of the last log in the segment
+    leaf_count = Column(Integer, nullable=False)
+    
+    # Covered segment of the hash chain
+    first_log_id = Column(UUID(as_uuid=True), nullable=False)
+    last_log_id = Column(UUID(as_uuid=True), nullable=False)
+    start_timestamp = Column(DateTime(timezone=True), nullable=False)
+    end_timestamp = Column(DateTime(timezone=True), nullable=False)
+    
+    # Merkle root over the segment's hashes, chained to the previous checkpoint
+    merkle_root = Column(String(64), nullable=False)
+    prev_root = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        Index('idx_checkpoint_end_timestamp', 'end_timestamp'),
+    )
+
+class AuditDeadLetter(Base):
+    __tablename__ = 'audit_dead_letters'
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    audit_id = Column(UUID(as_uuid=True), nullable=False)  # The id the entry was queued under
+    entry = Column(JSON, nullable=False)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False)
+    failed_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
 class ComplianceRule(Base):
     __tablename__ = 'compliance_rules'
     
@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+from database.models import Base
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    # A "UUID" column gets NUMERIC affinity in SQLite, which turns hex ids like "1234e5..." into floats
+    return "CHAR(32)"
+
+# A single shared connection keeps the in-memory database alive for the whole test
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+async def create_test_database():
+    """Create an in-memory database with all tables and return its engine and session factory"""
+    engine = create_async_engine(
+        TEST_DATABASE_URL,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+@pytest.fixture
+async def db_session():
+    """Real database session backed by in-memory SQLite"""
+    engine, session_factory = await create_test_database()
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+@pytest.fixture
+def benchmark_loop():
+    """Dedicated event loop for benchmarks, which drive coroutines from synchronous code"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.compliance_service import ComplianceService, RiskAssessment
+from core.compliance_service import ComplianceService, RiskAssessment, _SanctionsIndex, invalidate_sanctions_index
 from core.audit_service import AuditService
 from database.models import ComplianceRule, ComplianceViolation, SanctionsList
 
@@ -18,6 +18,13 @@ async def mock_db_session():
     session.execute = AsyncMock()
     return session
 
+@pytest.fixture(autouse=True)
+def reset_sanctions_index():
+    """Start every test without a cached sanctions index"""
+    invalidate_sanctions_index()
+    yield
+    invalidate_sanctions_index()
+
 @pytest.fixture
 def mock_audit_service():
     """Mock audit service"""
@@ -71,7 +78,7 @@ async def test_aml_compliance_check_low_risk(compliance_service, mock_db_session
     assert isinstance(assessment, RiskAssessment)
     assert assessment.entity_id == "user123"
     assert assessment.entity_type == "USER"
-    assert assessment.risk_score &lt; 0.7  # Below threshold
+    assert assessment.risk_score < 0.7  # Below threshold
     assert len(assessment.risk_factors) >= 0
 
 @pytest.mark.asyncio
@@ -164,7 +171,9 @@ async def test_sanctions_compliance_check_with_match(compliance_service, mock_db
     mock_rule.severity = "CRITICAL"
     mock_rule_result = MagicMock()
     mock_rule_result.scalar_one_or_none.return_value = mock_rule
-    mock_db_session.execute.side_effect = [mock_result, mock_rule_result]
+    mock_version_result = MagicMock()
+    mock_version_result.one.return_value = (datetime.now(timezone.utc), 1)
+    mock_db_session.execute.side_effect = [mock_version_result, mock_result, mock_rule_result]
     
     result = await compliance_service.check_sanctions_compliance(
         entity_type="INDIVIDUAL",
@@ -176,6 +185,59 @@ async def test_sanctions_compliance_check_with_match(compliance_service, mock_db
     assert len(result['matches']) > 0
     assert result['matches'][0]['list_name'] == "OFAC SDN"
 
+def _sanctions_entry(name, aliases=(), addresses=(), identifiers=None):
+    """Active sanctions entry as returned by the sanctions list query"""
+    entry = MagicMock()
+    entry.id = "sanction456"
+    entry.name = name
+    entry.list_name = "OFAC SDN"
+    entry.source = "OFAC"
+    entry.aliases = list(aliases)
+    entry.addresses = list(addresses)
+    entry.identifiers = identifiers or {}
+    entry.is_active = True
+    return entry
+
+def _mock_sanctions_query(mock_db_session, entries):
+    """Queue the version, sanctions list and violation rule results of one sanctions check"""
+    mock_version_result = MagicMock()
+    mock_version_result.one.return_value = (datetime.now(timezone.utc), len(entries))
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = entries
+    mock_rule = MagicMock()
+    mock_rule.id = "rule123"
+    mock_rule.severity = "CRITICAL"
+    mock_rule_result = MagicMock()
+    mock_rule_result.scalar_one_or_none.return_value = mock_rule
+    mock_db_session.execute.side_effect = [mock_version_result, mock_result, mock_rule_result]
+
+@pytest.mark.asyncio
+async def test_sanctions_compliance_check_reordered_name(compliance_service, mock_db_session):
+    """Test a name with the entry's characters in another order still matches"""
+    _mock_sanctions_query(mock_db_session, [_sanctions_entry("Viktor Bout")])
+    
+    result = await compliance_service.check_sanctions_compliance(
+        entity_type="INDIVIDUAL",
+        entity_data={"id": "entity456", "name": "Tuob Rotkiv", "aliases": [], "addresses": [], "identifiers": {}}
+    )
+    
+    assert result['is_sanctioned'] == True
+    assert result['matches'][0]['match_reasons'] == ['NAME_MATCH']
+
+@pytest.mark.asyncio
+async def test_sanctions_compliance_check_address_only_match(compliance_service, mock_db_session):
+    """Test two matching addresses reach the threshold without any name match"""
+    addresses = [{"street": "12 Harbour Road", "city": "Port City"}, {"street": "7 Quay Street", "city": "Dockside"}]
+    _mock_sanctions_query(mock_db_session, [_sanctions_entry("Viktor Bout", addresses=addresses)])
+    
+    result = await compliance_service.check_sanctions_compliance(
+        entity_type="ORGANIZATION",
+        entity_data={"id": "entity789", "name": "Maria Lopez", "aliases": [], "addresses": addresses, "identifiers": {}}
+    )
+    
+    assert result['is_sanctioned'] == True
+    assert result['matches'][0]['match_reasons'] == ['ADDRESS_MATCH', 'ADDRESS_MATCH']
+
 @pytest.mark.asyncio
 async def test_transaction_pattern_monitoring_structuring(compliance_service, mock_db_session):
     """Test transaction pattern monitoring for structuring"""
@@ -306,3 +368,58 @@ async def test_address_match(compliance_service):
     
     result = compliance_service._address_match(addr1, addr2)
     assert result == True
+
+@pytest.mark.asyncio
+async def test_address_match_ignores_token_order(compliance_service):
+    """Test address matching with reordered street tokens"""
+    addr1 = {"street": "123 Main Street", "city": "New York"}
+    addr2 = {"street": "Main St 123", "city": "New York"}
+    
+    result = compliance_service._address_match(addr1, addr2)
+    assert result == True
+
+@pytest.mark.asyncio
+async def test_address_match_different_street(compliance_service):
+    """Test address matching with a different street number"""
+    addr1 = {"street": "123 Main Street", "city": "New York"}
+    addr2 = {"street": "456 Oak Avenue", "city": "New York"}
+    
+    result = compliance_service._address_match(addr1, addr2)
+    assert result == False
+
+def test_sanctions_index_prefilter():
+    """Test the sanctions prefilter passes near matches and identifier hits only"""
+    entry = MagicMock()
+    entry.id = "sanction123"
+    entry.name = "John Sanctioned"
+    entry.list_name = "OFAC SDN"
+    entry.source = "OFAC"
+    entry.aliases = ["Johnny S"]
+    entry.addresses = []
+    entry.identifiers = {"passport": "XX123456"}
+    sanctions_index = _SanctionsIndex.build((None, 1), [entry])
+    
+    assert sanctions_index.may_match(["jon sanctioned"], {}) == True
+    assert sanctions_index.may_match(["denoitcnas nhoj"], {}) == True # Character order is ignored, as in _fuzzy_match
+    assert sanctions_index.may_match(["maria lopez"], {"passport": "XX123456"}) == True
+    assert sanctions_index.may_match(["maria lopez", "m. lopez"], {"passport": "P999"}) == False
+
+def test_sanctions_index_prefilter_names_only(compliance_service):
+    """Test a name is rejected when no single entry is similar, however many characters the list covers"""
+    entries = [
+        _sanctions_entry("Viktor Bout", aliases=["Jacques Fumezy"]),
+        _sanctions_entry("Hwang Plexdyq"),
+        _sanctions_entry("Maria Lopez"),
+    ]
+    sanctions_index = _SanctionsIndex.build((None, 3), entries)
+    
+    assert sanctions_index.may_match(["john sanctioned"], {}) == False
+    assert sanctions_index.may_match(["tuob rotkiv"], {}) == True
+    
+    # Never stricter than the matcher it guards
+    for name in ["marie lopez", "viktor bou", "jacques fumez", "hwang plex"]:
+        matches = any(
+            compliance_service._fuzzy_match(name, entry_name)
+            for entry_name in sanctions_index.normalized_names + [a for aliases in sanctions_index.aliases for a in aliases]
+        )
+        assert not matches or sanctions_index.may_match([name], {})
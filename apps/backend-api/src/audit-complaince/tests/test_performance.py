@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime, timedelta
+
+from core.audit_service import AuditService
+from core.compliance_service import ComplianceService, invalidate_sanctions_index
+from database.models import SanctionsList
+from tests.conftest import create_test_database
+
+pytestmark = pytest.mark.performance
+
+SEED_ROWS = 10_000
+
+# Generous ceilings: these guard against regressions such as N+1 queries, not machine speed
+VERIFY_INTEGRITY_MAX_SECONDS = 3.0
+SANCTIONS_CHECK_MAX_SECONDS = 0.5
+
+async def _seed_audit_chain(session_factory, rows):
+    """Insert a valid hash chain of audit logs"""
+    async with session_factory() as session:
+        audit_service = AuditService(session)
+        audit_service.cipher_suite = None
+
+        start = datetime(2024, 1, 1)
+        previous_hash = None
+        logs = []
+        for i in range(rows):
+            log = audit_service._build_audit_log(
+                previous_hash=previous_hash,
+                sequence=i + 1,
+                timestamp=start + timedelta(seconds=i),
+                action="VIEW_RECORD",
+                resource_type="RECORD",
+                user_id=f"user{i % 100}",
+                resource_id=str(i),
+                after_data={"sequence": i}
+            )
+            previous_hash = log.hash_value
+            logs.append(log)
+
+        session.add_all(logs)
+        await session.commit()
+
+async def _seed_sanctions(session_factory, rows):
+    """Insert active sanctions entries with aliases, addresses and identifiers"""
+    async with session_factory() as session:
+        session.add_all([
+            SanctionsList(
+                list_name="OFAC SDN",
+                source="OFAC",
+                entity_type="INDIVIDUAL",
+                name=f"Sanctioned Entity {i}",
+                aliases=[f"Entity Alias {i}"],
+                addresses=[{"street": f"{i} Harbour Road", "city": "Port City"}],
+                identifiers={"passport": f"X{i:07d}"}
+            )
+            for i in range(rows)
+        ])
+        await session.commit()
+
+@pytest.fixture
+def seeded_database(benchmark_loop):
+    """In-memory database seeded with an audit chain and a sanctions list"""
+    engine, session_factory = benchmark_loop.run_until_complete(create_test_database())
+    benchmark_loop.run_until_complete(_seed_audit_chain(session_factory, SEED_ROWS))
+    benchmark_loop.run_until_complete(_seed_sanctions(session_factory, SEED_ROWS))
+    invalidate_sanctions_index()
+    yield session_factory
+    invalidate_sanctions_index()
+    benchmark_loop.run_until_complete(engine.dispose())
+
+def test_verify_integrity_performance(benchmark, benchmark_loop, seeded_database):
+    """Full integrity verification over a seeded chain stays within budget"""
+    async def verify():
+        async with seeded_database() as session:
+            return await AuditService(session).verify_integrity()
+
+    integrity_status = benchmark.pedantic(
+        lambda: benchmark_loop.run_until_complete(verify()),
+        rounds=3
+    )
+
+    assert integrity_status['is_valid'] == True
+    assert integrity_status['total_logs'] == SEED_ROWS
+    assert benchmark.stats.stats.mean < VERIFY_INTEGRITY_MAX_SECONDS
+
+def test_sanctions_check_performance(benchmark, benchmark_loop, seeded_database):
+    """A negative sanctions check against a seeded list stays within budget"""
+    entity_data = {
+        "id": "entity123",
+        "name": "John Smith",
+        "aliases": ["Johnny Smith"],
+        "addresses": [{"street": "1 Main Street", "city": "New York"}],
+        "identifiers": {"passport": "P123456"}
+    }
+
+    async def check():
+        async with seeded_database() as session:
+            audit_service = AuditService(session)
+            audit_service.cipher_suite = None
+            compliance_service = ComplianceService(session, audit_service)
+            return await compliance_service.check_sanctions_compliance("INDIVIDUAL", entity_data)
+
+    result = benchmark.pedantic(
+        lambda: benchmark_loop.run_until_complete(check()),
+        rounds=10,
+        warmup_rounds=1
+    )
+
+    assert result['is_sanctioned'] == False
+    assert result['total_lists_checked'] == SEED_ROWS
+    assert benchmark.stats.stats.mean < SANCTIONS_CHECK_MAX_SECONDS
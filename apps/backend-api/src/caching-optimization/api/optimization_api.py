@@ -1,13 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import datetime
-import redis.asyncio as redis
 import structlog
 
-from database.database import get_db, get_redis_client
+from database.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.cache_service import CacheService
+from core.cache_service import CacheService, compute_etag
 from services.product_service import ProductService
 from config import config
 
@@ -38,12 +37,29 @@ class ProductResponse(ProductCreate):
     class Config:
         orm_mode = True
 
-# Dependency injection for services
-async def get_cache_service(redis_client: redis.Redis = Depends(get_redis_client)):
-    return CacheService(redis_client)
+def _weak_etag(digest: str) -> str:
+    """Formats a payload digest as a weak ETag header value."""
+    return f'W/"{digest}"'
 
-async def get_product_service(cache_service: CacheService = Depends(get_cache_service)):
-    return ProductService(cache_service)
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluates If-None-Match against an ETag using weak comparison (RFC 7232 section 3.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(","))
+
+def _not_modified(etag: str, cache_control: str) -> Response:
+    """Builds a bodiless 304 response carrying the validators a 200 would have sent."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": cache_control})
+
+# Dependency injection for services; the instances are built once at startup and shared by every request
+def get_cache_service(request: Request) -> CacheService:
+    return request.app.state.cache_service
+
+def get_product_service(request: Request) -> ProductService:
+    return request.app.state.product_service
 
 # --- Product Endpoints (with caching) ---
 @router.post("/v1/products", response_model=ProductResponse, status_code=status.HTTP_201_CREATED, summary="Create a new product")
@@ -64,36 +80,48 @@ async def create_product(
 
 @router.get("/v1/products", response_model=List[ProductResponse], summary="Get all products (cached)")
 async def get_all_products(
+    request: Request,
     limit: int = 100,
     offset: int = 0,
     db: AsyncSession = Depends(get_db),
     product_service: ProductService = Depends(get_product_service),
     response: Response = None # For setting Cache-Control headers
 ):
-    products = await product_service.get_all_products(db, limit, offset)
+    entries = await product_service.get_product_entries(db, limit, offset)
+    
+    # Implement browser caching for this endpoint; the page ETag is derived from the cached per-product ETags
+    etag = _weak_etag(compute_etag([entry["etag"] for entry in entries]))
+    cache_control = f"public, max-age={config.short_cache_ttl}"
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag, cache_control)
     
-    # Implement browser caching for this endpoint
-    response.headers["Cache-Control"] = f"public, max-age={config.short_cache_ttl}"
-    response.headers["ETag"] = f"W/{hash(str(products))}" # Simple ETag, consider more robust
+    response.headers["Cache-Control"] = cache_control
+    response.headers["ETag"] = etag
     
-    return products
+    return [entry["product"] for entry in entries]
 
 @router.get("/v1/products/{product_id}", response_model=ProductResponse, summary="Get product by ID (cached)")
 async def get_product_by_id(
     product_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     product_service: ProductService = Depends(get_product_service),
     response: Response = None # For setting Cache-Control headers
 ):
-    product = await product_service.get_product_by_id(db, product_id)
-    if not product:
+    entry = await product_service.get_product_entry(db, product_id)
+    if not entry:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    # Implement browser caching for this endpoint
-    response.headers["Cache-Control"] = f"public, max-age={config.default_cache_ttl}"
-    response.headers["ETag"] = f"W/{hash(str(product))}"
+    # Implement browser caching for this endpoint; the ETag was computed when the entry was cached
+    etag = _weak_etag(entry["etag"])
+    cache_control = f"public, max-age={config.default_cache_ttl}"
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag, cache_control)
     
-    return product
+    response.headers["Cache-Control"] = cache_control
+    response.headers["ETag"] = etag
+    
+    return entry["product"]
 
 @router.put("/v1/products/{product_id}", response_model=ProductResponse, summary="Update a product")
 async def update_product(
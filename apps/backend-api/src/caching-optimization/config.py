@@ -1,33 +1,79 @@
 import os
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CachingOptimizationConfig:
     # Redis Configuration
-    redis_host: str = os.getenv('CACHING_REDIS_HOST', 'localhost')
-    redis_port: int = int(os.getenv('CACHING_REDIS_PORT', '6379'))
-    redis_password: str = os.getenv('CACHING_REDIS_PASSWORD', '')
-    redis_db: int = int(os.getenv('CACHING_REDIS_DB', '2')) # Use a different DB for caching
-    
+    redis_host: str
+    redis_port: int
+    redis_password: str
+    redis_db: int
+    redis_pool_size: int
+
     # Cache TTLs (Time To Live in seconds)
-    default_cache_ttl: int = int(os.getenv('CACHING_DEFAULT_TTL', '300')) # 5 minutes
-    long_cache_ttl: int = int(os.getenv('CACHING_LONG_TTL', '3600')) # 1 hour
-    short_cache_ttl: int = int(os.getenv('CACHING_SHORT_TTL', '60')) # 1 minute
-    
+    default_cache_ttl: int
+    long_cache_ttl: int
+    short_cache_ttl: int
+
+    # In-process L1 cache in front of Redis
+    l1_cache_capacity: int
+    l1_cache_ttl: float
+
+    # Server-assisted client-side caching: keys under these prefixes stay in L1 until Redis invalidates them
+    enable_client_side_caching: bool
+    client_tracking_prefixes: tuple
+
+    # Values whose serialized size exceeds this are zstd-compressed before storage
+    min_compress_bytes: int
+
+    # Pattern Invalidation
+    scan_count: int
+    scan_steps_per_call: int
+    max_keys_per_invalidation: int
+
     # Cache Warming/Preloading
-    cache_warming_interval_seconds: int = int(os.getenv('CACHING_WARMING_INTERVAL', '300')) # Every 5 minutes
-    
+    cache_warming_interval_seconds: int
+
     # API Configuration
-    api_host: str = os.getenv('CACHING_API_HOST', '0.0.0.0')
-    api_port: int = int(os.getenv('CACHING_API_PORT', '8005'))
-    
+    api_host: str
+    api_port: int
+
     # Monitoring
-    prometheus_port: int = int(os.getenv('CACHING_PROMETHEUS_PORT', '8006'))
-    enable_metrics: bool = os.getenv('CACHING_ENABLE_METRICS', 'true').lower() == 'true'
-    
+    prometheus_port: int
+    enable_metrics: bool
+
     # Logging
-    log_level: str = os.getenv('CACHING_LOG_LEVEL', 'INFO')
-    log_file: str = os.getenv('CACHING_LOG_FILE', 'logs/caching_optimization.log')
+    log_level: str
+    log_file: str
+
+    @classmethod
+    def from_env(cls) -> 'CachingOptimizationConfig':
+        """Reads the environment once and builds an immutable config."""
+        return cls(
+            redis_host=os.getenv('CACHING_REDIS_HOST', 'localhost'),
+            redis_port=int(os.getenv('CACHING_REDIS_PORT', '6379')),
+            redis_password=os.getenv('CACHING_REDIS_PASSWORD', ''),
+            redis_db=int(os.getenv('CACHING_REDIS_DB', '2')), # Use a different DB for caching
+            redis_pool_size=int(os.getenv('CACHING_REDIS_POOL_SIZE', '50')),
+            default_cache_ttl=int(os.getenv('CACHING_DEFAULT_TTL', '300')), # 5 minutes
+            long_cache_ttl=int(os.getenv('CACHING_LONG_TTL', '3600')), # 1 hour
+            short_cache_ttl=int(os.getenv('CACHING_SHORT_TTL', '60')), # 1 minute
+            l1_cache_capacity=int(os.getenv('CACHING_L1_CAPACITY', '10000')),
+            l1_cache_ttl=float(os.getenv('CACHING_L1_TTL', '1.0')), # Seconds; 0 disables the L1 cache
+            enable_client_side_caching=os.getenv('CACHING_ENABLE_CLIENT_SIDE_CACHING', 'false').lower() == 'true',
+            client_tracking_prefixes=tuple(os.getenv('CACHING_CLIENT_TRACKING_PREFIXES', 'product:detail:').split(',')),
+            min_compress_bytes=int(os.getenv('CACHING_MIN_COMPRESS_BYTES', '1024')),
+            scan_count=int(os.getenv('CACHING_SCAN_COUNT', '1000')), # SCAN COUNT hint per cursor step
+            scan_steps_per_call=int(os.getenv('CACHING_SCAN_STEPS_PER_CALL', '10')), # Cursor steps per script call
+            max_keys_per_invalidation=int(os.getenv('CACHING_MAX_KEYS_PER_INVALIDATION', '100000')), # 0 disables the cap
+            cache_warming_interval_seconds=int(os.getenv('CACHING_WARMING_INTERVAL', '300')), # Every 5 minutes
+            api_host=os.getenv('CACHING_API_HOST', '0.0.0.0'),
+            api_port=int(os.getenv('CACHING_API_PORT', '8005')),
+            prometheus_port=int(os.getenv('CACHING_PROMETHEUS_PORT', '8006')),
+            enable_metrics=os.getenv('CACHING_ENABLE_METRICS', 'true').lower() == 'true',
+            log_level=os.getenv('CACHING_LOG_LEVEL', 'INFO'),
+            log_file=os.getenv('CACHING_LOG_FILE', 'logs/caching_optimization.log'),
+        )
 
 # Global config instance
-config = CachingOptimizationConfig()
+config = CachingOptimizationConfig.from_env()
@@ -1,9 +1,15 @@
 import asyncio
-import json
+import math
+import time
+from collections import OrderedDict, defaultdict
+import msgspec
+import orjson
+import xxhash
+import zstandard as zstd
 from typing import Any, Callable, Dict, List, Optional, TypeVar, Union
 import redis.asyncio as redis
 import structlog
-from functools import wraps
+from functools import lru_cache, wraps
 from prometheus_client import Counter, Gauge, Histogram
 
 from config import config
@@ -20,70 +26,367 @@ CACHE_OPERATION_DURATION = Histogram('cache_operation_duration_seconds', 'Durati
 
 T = TypeVar('T')
 
+def metric_total(metric: Counter) -> float:
+    """Sums a counter across all of its label combinations."""
+    return sum(sample.value for family in metric.collect() for sample in family.samples if sample.name.endswith('_total'))
+
+# Labelled metric children resolved once per label combination instead of on every cache operation
+@lru_cache(maxsize=1024)
+def _hits_child(cache_name: str, key_prefix: str) -> Counter:
+    return CACHE_HITS.labels(cache_name=cache_name, key_prefix=key_prefix)
+
+@lru_cache(maxsize=1024)
+def _misses_child(cache_name: str, key_prefix: str) -> Counter:
+    return CACHE_MISSES.labels(cache_name=cache_name, key_prefix=key_prefix)
+
+@lru_cache(maxsize=1024)
+def _sets_child(cache_name: str, key_prefix: str) -> Counter:
+    return CACHE_SET_OPERATIONS.labels(cache_name=cache_name, key_prefix=key_prefix)
+
+@lru_cache(maxsize=1024)
+def _deletes_child(cache_name: str, key_prefix: str) -> Counter:
+    return CACHE_DELETE_OPERATIONS.labels(cache_name=cache_name, key_prefix=key_prefix)
+
+@lru_cache(maxsize=256)
+def _duration_child(operation: str, cache_name: str) -> Histogram:
+    return CACHE_OPERATION_DURATION.labels(operation=operation, cache_name=cache_name)
+
+# Cache values are stored as MessagePack; types msgpack cannot represent fall back to str, like json's default=str
+_encoder = msgspec.msgpack.Encoder(enc_hook=str)
+_decoder = msgspec.msgpack.Decoder()
+
+# Stored values carry a one-byte marker: raw MessagePack, or MessagePack compressed with zstd level 1
+_RAW_MARKER = b'\x00'
+_ZSTD_MARKER = b'\x01'
+_compressor = zstd.ZstdCompressor(level=1)
+_decompressor = zstd.ZstdDecompressor()
+
+def _pack(value: Any) -> bytes:
+    """Serializes a value for Redis, compressing it when it is large enough to pay off."""
+    serialized = _encoder.encode(value)
+    if len(serialized) > config.min_compress_bytes:
+        return _ZSTD_MARKER + _compressor.compress(serialized)
+    return _RAW_MARKER + serialized
+
+def _unpack(data: bytes) -> Any:
+    """Inverse of _pack."""
+    if data[:1] == _ZSTD_MARKER:
+        return _decoder.decode(_decompressor.decompress(data[1:]))
+    return _decoder.decode(data[1:])
+
+# Scans and unlinks keys matching KEYS[1] from cursor ARGV[1]; UNLINK frees memory off the main thread.
+# ARGV[2] is the SCAN COUNT hint and ARGV[3] the cursor steps taken per call, which bounds the keys one
+# EVALSHA scans and so how long it blocks the server. Returns {unlinked, cursor}; cursor '0' means done.
+_INVALIDATE_PATTERN_LUA = """
+local cursor = ARGV[1]
+local unlinked = 0
+local steps = tonumber(ARGV[3])
+repeat
+    local reply = redis.call('SCAN', cursor, 'MATCH', KEYS[1], 'COUNT', ARGV[2])
+    cursor = reply[1]
+    if #reply[2] > 0 then
+        unlinked = unlinked + redis.call('UNLINK', unpack(reply[2]))
+    end
+    steps = steps - 1
+until cursor == '0' or steps <= 0
+return {unlinked, cursor}
+"""
+
+def _digest_key_text(text: str) -> str:
+    return xxhash.xxh3_128_hexdigest(text.encode()) # Keys need spread, not cryptographic strength
+
+# Argument types whose repr() is fully determined by equality plus type, so a memo hit yields the same digest.
+# float is left out because 0.0 == -0.0; sessions, services and other objects are never held by the memo
+_MEMOIZABLE_ARG_TYPES = frozenset({str, int, bool, bytes, type(None)})
+
+@lru_cache(maxsize=4096)
+def _memoized_key_suffix(args: tuple, kwargs: tuple, arg_types: tuple) -> str:
+    # arg_types is part of the memo key only: 1 == True, so the arguments alone would collide
+    return _digest_key_text(repr(args) + repr(kwargs))
+
+def _cache_key_suffix(args: tuple, kwargs: Dict[str, Any]) -> str:
+    """Digests call arguments into a key suffix, memoized when every argument is a primitive.
+
+    The digest is taken over repr() rather than hash() so keys stay stable across processes.
+    """
+    sorted_kwargs = tuple(sorted(kwargs.items()))
+    arg_types = tuple(map(type, args)) + tuple(type(value) for _, value in sorted_kwargs)
+    if _MEMOIZABLE_ARG_TYPES.issuperset(arg_types):
+        return _memoized_key_suffix(args, sorted_kwargs, arg_types)
+    return _digest_key_text(repr(args) + repr(sorted_kwargs))
+
+class L1Cache:
+    """Small in-process TTL-LRU of packed values that absorbs repeat reads of hot keys."""
+
+    def __init__(self, capacity: int, ttl: float):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.epoch = 0 # Bumped on every invalidation; fills that started under an older epoch are dropped
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict() # key -> (expires_at, packed value)
+
+    def _expires_at(self, key: str) -> Optional[float]:
+        if self.ttl <= 0:
+            return None
+        return time.monotonic() + self.ttl
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return data
+
+    def set(self, key: str, data: bytes, epoch: Optional[int] = None):
+        """Stores a packed value; pass the epoch read before the Redis round-trip that produced it."""
+        if epoch is not None and epoch != self.epoch:
+            return # The key may have been invalidated while the value was in flight
+        expires_at = self._expires_at(key)
+        if expires_at is None or self.capacity <= 0:
+            return
+        self._entries[key] = (expires_at, data)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self.epoch += 1
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self.epoch += 1
+        self._entries.clear()
+
+# RESP2 channel that receives CLIENT TRACKING invalidations redirected to a subscribed connection
+_INVALIDATE_CHANNEL = '__redis__:invalidate'
+
+class TrackingL1Cache(L1Cache):
+    """L1 cache whose entries under tracked prefixes are kept until Redis reports the key modified.
+
+    Redis broadcasts writes to the prefixes (CLIENT TRACKING BCAST) to a dedicated connection
+    run by listen(); while that connection is down, tracked keys fall back to the ordinary TTL.
+    """
+
+    def __init__(self, capacity: int, ttl: float, prefixes: tuple):
+        super().__init__(capacity, ttl)
+        self.prefixes = prefixes
+        self.tracking = False
+
+    def _expires_at(self, key: str) -> Optional[float]:
+        if self.tracking and key.startswith(self.prefixes):
+            return math.inf
+        return super()._expires_at(key)
+
+    def invalidate(self, keys: Optional[List[bytes]]):
+        """Applies an invalidation message; None means the server flushed its keyspace."""
+        if keys is None:
+            self.clear()
+            return
+        self.epoch += 1
+        for key in keys:
+            self._entries.pop(key.decode() if isinstance(key, bytes) else key, None)
+
+    async def listen(self, redis_client: redis.Redis, retry_delay: float = 1.0):
+        """Keeps a tracking connection open and applies its invalidations until cancelled."""
+        while True:
+            connection = redis_client.connection_pool.make_connection()
+            try:
+                await connection.connect()
+                await connection.send_command('CLIENT', 'ID')
+                client_id = await connection.read_response()
+                # redis-py 4.x speaks RESP2, so invalidations are redirected to this connection as pub/sub messages
+                prefix_args = [arg for prefix in self.prefixes for arg in ('PREFIX', prefix)]
+                await connection.send_command('CLIENT', 'TRACKING', 'ON', 'REDIRECT', client_id, 'BCAST', *prefix_args)
+                await connection.read_response()
+                await connection.send_command('SUBSCRIBE', _INVALIDATE_CHANNEL)
+                await connection.read_response()
+                self.tracking = True
+                logger.info("Client-side caching enabled.", prefixes=self.prefixes)
+                while True:
+                    message = await connection.read_response()
+                    if message and message[0] == b'message':
+                        self.invalidate(message[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Client tracking connection lost: {e}")
+            finally:
+                # Invalidations may have been missed; nothing tracked can be trusted any more
+                self.tracking = False
+                self.clear()
+                await connection.disconnect()
+            await asyncio.sleep(retry_delay)
+
+# Shared by every CacheService in the process; untracked entries may lag other processes' writes by up to l1_cache_ttl
+if config.enable_client_side_caching:
+    _l1_cache = TrackingL1Cache(
+        capacity=config.l1_cache_capacity,
+        ttl=config.l1_cache_ttl,
+        prefixes=config.client_tracking_prefixes
+    )
+else:
+    _l1_cache = L1Cache(capacity=config.l1_cache_capacity, ttl=config.l1_cache_ttl)
+
+async def run_client_tracking(redis_client: redis.Redis):
+    """Runs the invalidation listener for the shared L1 cache when client-side caching is enabled."""
+    if isinstance(_l1_cache, TrackingL1Cache):
+        await _l1_cache.listen(redis_client)
+
+def compute_etag(payload: Any) -> str:
+    """Returns a digest of the payload that is stable across processes and restarts."""
+    return xxhash.xxh3_128_hexdigest(orjson.dumps(payload, default=str))
+
 class CacheService:
     def __init__(self, redis_client: redis.Redis):
         self.redis_client = redis_client
         self.default_ttl = config.default_cache_ttl
+        self._invalidate_script = redis_client.register_script(_INVALIDATE_PATTERN_LUA)
+        self._single_flight: Dict[str, asyncio.Future] = {} # In-flight computations of decorated functions, by cache key
+        self._l1 = _l1_cache
         logger.info("CacheService initialized.")
 
     async def get(self, key: str, cache_name: str = "default") -> Optional[Any]:
         """Retrieves data from cache."""
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.perf_counter()
         try:
-            data = await self.redis_client.get(key)
+            data = self._l1.get(key)
+            if data is None:
+                epoch = self._l1.epoch
+                data = await self.redis_client.get(key)
+                if data:
+                    self._l1.set(key, data, epoch)
             if data:
-                CACHE_HITS.labels(cache_name=cache_name, key_prefix=key.split(':')[0]).inc()
+                _hits_child(cache_name, key.partition(':')[0]).inc()
                 logger.debug(f"Cache hit for key: {key}", cache_name=cache_name)
-                return json.loads(data)
-            CACHE_MISSES.labels(cache_name=cache_name, key_prefix=key.split(':')[0]).inc()
+                return _unpack(data)
+            _misses_child(cache_name, key.partition(':')[0]).inc()
             logger.debug(f"Cache miss for key: {key}", cache_name=cache_name)
             return None
         except Exception as e:
             logger.error(f"Error getting from cache: {e}", key=key, cache_name=cache_name)
             return None
         finally:
-            CACHE_OPERATION_DURATION.labels(operation='get', cache_name=cache_name).observe(asyncio.get_event_loop().time() - start_time)
+            _duration_child('get', cache_name).observe(time.perf_counter() - start_time)
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None, cache_name: str = "default"):
         """Stores data in cache."""
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.perf_counter()
         try:
-            serialized_value = json.dumps(value, default=str) # Ensure datetime objects are serialized
-            await self.redis_client.set(key, serialized_value, ex=ttl or self.default_ttl)
-            CACHE_SET_OPERATIONS.labels(cache_name=cache_name, key_prefix=key.split(':')[0]).inc()
+            data = _pack(value)
+            epoch = self._l1.epoch
+            await self.redis_client.set(key, data, ex=ttl or self.default_ttl)
+            self._l1.set(key, data, epoch)
+            _sets_child(cache_name, key.partition(':')[0]).inc()
             logger.debug(f"Cache set for key: {key}", cache_name=cache_name, ttl=ttl or self.default_ttl)
         except Exception as e:
             logger.error(f"Error setting cache: {e}", key=key, cache_name=cache_name)
         finally:
-            CACHE_OPERATION_DURATION.labels(operation='set', cache_name=cache_name).observe(asyncio.get_event_loop().time() - start_time)
+            _duration_child('set', cache_name).observe(time.perf_counter() - start_time)
+
+    async def get_many(self, keys: List[str], cache_name: str = "default") -> List[Optional[Any]]:
+        """Retrieves several keys in one MGET round-trip; misses come back as None."""
+        if not keys:
+            return []
+        start_time = time.perf_counter()
+        try:
+            raw_values = [self._l1.get(key) for key in keys]
+            missing = [i for i, data in enumerate(raw_values) if data is None]
+            if missing:
+                epoch = self._l1.epoch
+                fetched = await self.redis_client.mget([keys[i] for i in missing])
+                for i, data in zip(missing, fetched):
+                    raw_values[i] = data
+                    if data:
+                        self._l1.set(keys[i], data, epoch)
+            values = [_unpack(data) if data else None for data in raw_values]
+
+            # One counter update per key prefix rather than per key
+            hits_by_prefix = defaultdict(int)
+            misses_by_prefix = defaultdict(int)
+            for key, data in zip(keys, raw_values):
+                if data:
+                    hits_by_prefix[key.partition(':')[0]] += 1
+                else:
+                    misses_by_prefix[key.partition(':')[0]] += 1
+            for key_prefix, count in hits_by_prefix.items():
+                _hits_child(cache_name, key_prefix).inc(count)
+            for key_prefix, count in misses_by_prefix.items():
+                _misses_child(cache_name, key_prefix).inc(count)
+            logger.debug(f"Cache get_many for {len(keys)} keys", cache_name=cache_name)
+            return values
+        except Exception as e:
+            logger.error(f"Error getting many from cache: {e}", keys=len(keys), cache_name=cache_name)
+            return [None] * len(keys)
+        finally:
+            _duration_child('get_many', cache_name).observe(time.perf_counter() - start_time)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None, cache_name: str = "default"):
+        """Stores several values through a single pipelined round-trip."""
+        if not items:
+            return
+        start_time = time.perf_counter()
+        try:
+            packed = {key: _pack(value) for key, value in items.items()}
+            epoch = self._l1.epoch
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data in packed.items():
+                    pipe.set(key, data, ex=ttl or self.default_ttl)
+                await pipe.execute()
+            for key, data in packed.items():
+                self._l1.set(key, data, epoch)
+            for key in items:
+                _sets_child(cache_name, key.partition(':')[0]).inc()
+            logger.debug(f"Cache set_many for {len(items)} keys", cache_name=cache_name, ttl=ttl or self.default_ttl)
+        except Exception as e:
+            logger.error(f"Error setting many in cache: {e}", keys=len(items), cache_name=cache_name)
+        finally:
+            _duration_child('set_many', cache_name).observe(time.perf_counter() - start_time)
 
     async def delete(self, key: str, cache_name: str = "default"):
         """Deletes data from cache."""
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.perf_counter()
         try:
+            self._l1.delete(key)
             await self.redis_client.delete(key)
-            CACHE_DELETE_OPERATIONS.labels(cache_name=cache_name, key_prefix=key.split(':')[0]).inc()
+            _deletes_child(cache_name, key.partition(':')[0]).inc()
             logger.debug(f"Cache deleted for key: {key}", cache_name=cache_name)
         except Exception as e:
             logger.error(f"Error deleting from cache: {e}", key=key, cache_name=cache_name)
         finally:
-            CACHE_OPERATION_DURATION.labels(operation='delete', cache_name=cache_name).observe(asyncio.get_event_loop().time() - start_time)
+            _duration_child('delete', cache_name).observe(time.perf_counter() - start_time)
 
     async def invalidate_pattern(self, pattern: str, cache_name: str = "default"):
         """Invalidates all keys matching a pattern."""
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.perf_counter()
         try:
-            keys = []
-            async for key in self.redis_client.scan_iter(match=pattern):
-                keys.append(key)
-            if keys:
-                deleted_count = await self.redis_client.delete(*keys)
+            self._l1.clear() # Redis glob semantics are not replicated locally; drop every L1 entry
+            deleted_count, cursor = 0, '0'
+            cap = config.max_keys_per_invalidation
+            while True:
+                # Each call scans a bounded slice of the keyspace; other clients are served between calls
+                unlinked, cursor = await self._invalidate_script(
+                    keys=[pattern],
+                    args=[cursor, config.scan_count, config.scan_steps_per_call]
+                )
+                deleted_count += unlinked
+                if int(cursor) == 0 or (cap > 0 and deleted_count >= cap):
+                    break
+            if int(cursor) != 0:
+                logger.warning(
+                    f"Invalidation of pattern {pattern} stopped after {deleted_count} keys; remaining keys expire by TTL",
+                    cache_name=cache_name,
+                    max_keys=config.max_keys_per_invalidation
+                )
+            if deleted_count:
                 logger.info(f"Invalidated {deleted_count} keys matching pattern: {pattern}", cache_name=cache_name)
-                CACHE_DELETE_OPERATIONS.labels(cache_name=cache_name, key_prefix=pattern.split(':')[0]).inc(deleted_count)
+                _deletes_child(cache_name, pattern.partition(':')[0]).inc(deleted_count)
         except Exception as e:
             logger.error(f"Error invalidating cache pattern: {e}", pattern=pattern, cache_name=cache_name)
         finally:
-            CACHE_OPERATION_DURATION.labels(operation='invalidate_pattern', cache_name=cache_name).observe(asyncio.get_event_loop().time() - start_time)
+            _duration_child('invalidate_pattern', cache_name).observe(time.perf_counter() - start_time)
 
     def cached(self, key_prefix: str, ttl: Optional[int] = None, cache_name: str = "default"):
         """
@@ -93,20 +396,35 @@ class CacheService:
         def decorator(func: Callable[..., Any]):
             @wraps(func)
             async def wrapper(*args, **kwargs) -> Any:
-                # Generate a unique cache key based on function name, prefix, and arguments
-                # For simplicity, we'll use a basic hash of args/kwargs.
-                # In production, consider more robust key generation.
-                args_str = json.dumps(args, default=str) + json.dumps(kwargs, default=str)
-                key_suffix = hashlib.sha256(args_str.encode()).hexdigest()
-                cache_key = f"{key_prefix}:{func.__name__}:{key_suffix}"
+                cache_key = f"{key_prefix}:{func.__name__}:{_cache_key_suffix(args, kwargs)}"
 
                 cached_result = await self.get(cache_key, cache_name=cache_name)
                 if cached_result is not None:
                     return cached_result
-                
-                result = await func(*args, **kwargs)
-                await self.set(cache_key, result, ttl=ttl, cache_name=cache_name)
-                return result
+
+                # Concurrent misses on the same key share one computation instead of stampeding the backend
+                inflight = self._single_flight.get(cache_key)
+                if inflight is not None:
+                    return await asyncio.shield(inflight)
+
+                future = asyncio.get_running_loop().create_future()
+                self._single_flight[cache_key] = future
+                try:
+                    result = await func(*args, **kwargs)
+                    # Release waiters before the SET round-trip; they need the value, not the write
+                    future.set_result(result)
+                    await self.set(cache_key, result, ttl=ttl, cache_name=cache_name)
+                    return result
+                except asyncio.CancelledError:
+                    if not future.done():
+                        future.cancel()
+                    raise
+                except Exception as e:
+                    future.set_exception(e)
+                    future.exception() # Mark retrieved so an unawaited failure is not logged twice
+                    raise
+                finally:
+                    del self._single_flight[cache_key]
             return wrapper
         return decorator
 
@@ -114,15 +432,15 @@ class CacheService:
         """Retrieves overall cache statistics."""
         info = await self.redis_client.info('memory')
         db_size = await self.redis_client.dbsize()
+        hits = metric_total(CACHE_HITS)
+        misses = metric_total(CACHE_MISSES)
         
         return {
             "connected": self.redis_client.connection_pool.connected,
             "used_memory_human": info.get('used_memory_human'),
             "total_keys": db_size,
             "default_ttl": self.default_ttl,
-            "cache_hits_total": CACHE_HITS._value,
-            "cache_misses_total": CACHE_MISSES._value,
-            "cache_hit_ratio": CACHE_HITS._value / (CACHE_HITS._value + CACHE_MISSES._value) if (CACHE_HITS._value + CACHE_MISSES._value) > 0 else 0
+            "cache_hits_total": hits,
+            "cache_misses_total": misses,
+            "cache_hit_ratio": hits / (hits + misses) if (hits + misses) > 0 else 0
         }
-
-import hashlib # Import hashlib for the decorator
@@ -43,8 +43,9 @@ async def init_redis():
         port=config.redis_port,
         password=config.redis_password,
         db=config.redis_db,
-        decode_responses=True
-    )
+        max_connections=config.redis_pool_size,
+        health_check_interval=30 # Re-validate idle pooled connections before reuse
+    ) # Binary responses: cache values are MessagePack, parsed by hiredis when it is installed
     try:
         await redis_client.ping()
         logger.info("Redis connection established.")
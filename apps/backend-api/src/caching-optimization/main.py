@@ -1,25 +1,32 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from prometheus_client import make_asgi_app, Counter, Gauge, Histogram
 import uvicorn
 import structlog
 import asyncio
 import time
+from typing import Optional
+import uvloop
 
 from config import config
 from database.database import init_db, init_redis, close_redis, get_redis_client
 from api.optimization_api import router as optimization_router
 from services.product_service import ProductService
-from core.cache_service import CacheService
+from core.cache_service import CacheService, run_client_tracking
 from tasks.cache_warming import start_cache_warming_task
 
 logger = structlog.get_logger(__name__)
 
+# Run on uvloop's libuv-based event loop instead of the default asyncio loop
+uvloop.install()
+
 app = FastAPI(
     title="StarkPulse Caching & Optimization System",
     description="Comprehensive system for multi-layer caching, intelligent invalidation, and performance monitoring.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Prometheus metrics setup
@@ -54,8 +61,11 @@ if config.enable_metrics:
 # Include API router
 app.include_router(optimization_router, prefix="/api")
 
-# Background task for cache warming
+# Background task for cache warming, stopped cooperatively through warming_stop_event
 cache_warming_task: Optional[asyncio.Task] = None
+warming_stop_event = asyncio.Event()
+# Background task applying Redis client-tracking invalidations to the L1 cache
+client_tracking_task: Optional[asyncio.Task] = None
 
 @app.on_event("startup")
 async def startup_event():
@@ -75,14 +85,18 @@ async def startup_event():
     await init_db()
     await init_redis()
 
-    # Initialize services for background tasks
+    # Services are shared by the API and background tasks so single-flight state and metric children are process-wide
     redis_client = await get_redis_client()
-    cache_service = CacheService(redis_client)
-    product_service = ProductService(cache_service)
+    app.state.cache_service = CacheService(redis_client)
+    app.state.product_service = ProductService(app.state.cache_service)
 
     # Start cache warming background task
     global cache_warming_task
-    cache_warming_task = asyncio.create_task(start_cache_warming_task(product_service))
+    cache_warming_task = asyncio.create_task(start_cache_warming_task(app.state.product_service, warming_stop_event))
+
+    if config.enable_client_side_caching:
+        global client_tracking_task
+        client_tracking_task = asyncio.create_task(run_client_tracking(redis_client))
     
     logger.info("Application startup complete.")
 
@@ -90,12 +104,16 @@ async def startup_event():
 async def shutdown_event():
     """Actions to perform on application shutdown."""
     logger.info("Application shutdown initiated.")
+    warming_stop_event.set()
     if cache_warming_task:
-        cache_warming_task.cancel()
+        await cache_warming_task # Finishes any in-progress pass, then returns
+        logger.info("Cache warming task stopped.")
+    if client_tracking_task:
+        client_tracking_task.cancel()
         try:
-            await cache_warming_task
+            await client_tracking_task
         except asyncio.CancelledError:
-            logger.info("Cache warming task cancelled.")
+            logger.info("Client tracking task cancelled.")
     await close_redis()
     logger.info("Application shutdown complete.")
 
@@ -111,5 +129,6 @@ if __name__ == "__main__":
         app, 
         host=config.api_host, 
         port=config.api_port, 
+        loop="uvloop",
         log_level=config.log_level.lower()
     )
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 
 from database.models import Product
-from core.cache_service import CacheService
+from core.cache_service import CacheService, compute_etag
 from config import config
 
 logger = structlog.get_logger(__name__)
@@ -15,26 +15,62 @@ class ProductService:
     def __init__(self, cache_service: CacheService):
         self.cache_service = cache_service
         self.cache_name = "product_cache"
-        self.product_list_cache_key = "products:all"
         self.product_detail_prefix = "product:detail"
 
-    @self.cache_service.cached(key_prefix="products:list", ttl=config.short_cache_ttl, cache_name="product_cache")
-    async def get_all_products(self, db: AsyncSession, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Retrieves all products, cached for short periods."""
-        logger.info("Fetching all products from database (may be cached).")
-        stmt = select(Product).limit(limit).offset(offset)
+    async def get_product_entries(self, db: AsyncSession, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Retrieves a page of cached {"product", "etag"} entries, bulk-loading any misses."""
+        stmt = select(Product.id).order_by(Product.id).limit(limit).offset(offset)
         result = await db.execute(stmt)
-        products = result.scalars().all()
-        return [self._product_to_dict(p) for p in products]
+        product_ids = result.scalars().all()
+        if not product_ids:
+            return []
 
-    @self.cache_service.cached(key_prefix="product:detail", ttl=config.default_cache_ttl, cache_name="product_cache")
-    async def get_product_by_id(self, db: AsyncSession, product_id: int) -> Optional[Dict[str, Any]]:
-        """Retrieves a single product by ID, cached."""
-        logger.info(f"Fetching product {product_id} from database (may be cached).")
+        cache_keys = [f"{self.product_detail_prefix}:{product_id}" for product_id in product_ids]
+        cached_entries = await self.cache_service.get_many(cache_keys, cache_name=self.cache_name)
+        entries_by_id = {product_id: cached for product_id, cached in zip(product_ids, cached_entries) if cached is not None}
+
+        missing_ids = [product_id for product_id in product_ids if product_id not in entries_by_id]
+        if missing_ids:
+            logger.info(f"Fetching {len(missing_ids)} uncached products from database.")
+            stmt = select(Product).where(Product.id.in_(missing_ids))
+            result = await db.execute(stmt)
+            loaded = {product.id: self._to_cache_entry(self._product_to_dict(product)) for product in result.scalars().all()}
+            entries_by_id.update(loaded)
+            await self.cache_service.set_many(
+                {f"{self.product_detail_prefix}:{product_id}": entry for product_id, entry in loaded.items()},
+                ttl=config.default_cache_ttl,
+                cache_name=self.cache_name
+            )
+
+        return [entries_by_id[product_id] for product_id in product_ids if product_id in entries_by_id]
+
+    async def get_all_products(self, db: AsyncSession, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Retrieves a page of products, serving each row from its per-product cache entry."""
+        entries = await self.get_product_entries(db, limit, offset)
+        return [entry["product"] for entry in entries]
+
+    async def get_product_entry(self, db: AsyncSession, product_id: int) -> Optional[Dict[str, Any]]:
+        """Retrieves a cached {"product", "etag"} entry, loading and caching it on a miss."""
+        cache_key = f"{self.product_detail_prefix}:{product_id}"
+        entry = await self.cache_service.get(cache_key, cache_name=self.cache_name)
+        if entry is not None:
+            return entry
+
+        logger.info(f"Fetching product {product_id} from database.")
         stmt = select(Product).where(Product.id == product_id)
         result = await db.execute(stmt)
         product = result.scalar_one_or_none()
-        return self._product_to_dict(product) if product else None
+        if not product:
+            return None
+
+        entry = self._to_cache_entry(self._product_to_dict(product))
+        await self.cache_service.set(cache_key, entry, ttl=config.default_cache_ttl, cache_name=self.cache_name)
+        return entry
+
+    async def get_product_by_id(self, db: AsyncSession, product_id: int) -> Optional[Dict[str, Any]]:
+        """Retrieves a single product by ID, cached."""
+        entry = await self.get_product_entry(db, product_id)
+        return entry["product"] if entry else None
 
     async def create_product(self, db: AsyncSession, name: str, description: str, price: float, category: str, stock: int) -> Dict[str, Any]:
         """Creates a new product and invalidates relevant caches."""
@@ -91,20 +127,10 @@ class ProductService:
         logger.warning(f"Product {product_id} not found for deletion.")
         return False
 
-    async def _invalidate_product_caches(self, product_id: Optional[int] = None):
-        """Intelligently invalidates product-related caches."""
-        # Invalidate the list of all products
-        await self.cache_service.invalidate_pattern(f"{self.product_list_cache_key}*", cache_name=self.cache_name)
-        
-        # Invalidate specific product detail cache if ID is provided
-        if product_id:
-            await self.cache_service.delete(f"{self.product_detail_prefix}:{product_id}", cache_name=self.cache_name)
-            # Also invalidate the cached decorator key for get_product_by_id
-            # This requires knowing the exact key generated by the decorator.
-            # For simplicity, we'll rely on the pattern invalidation for lists
-            # and direct deletion for specific items. The decorator's key is more complex.
-            # A more robust solution would involve the decorator returning the key it used.
-            await self.cache_service.invalidate_pattern(f"{self.product_detail_prefix}:get_product_by_id:*", cache_name=self.cache_name)
+    async def _invalidate_product_caches(self, product_id: int):
+        """Invalidates the cached entry of a changed product."""
+        # Product pages are assembled from per-product entries on every read, so no list key needs clearing
+        await self.cache_service.delete(f"{self.product_detail_prefix}:{product_id}", cache_name=self.cache_name)
 
 
     async def warm_product_cache(self, db: AsyncSession):
@@ -115,21 +141,21 @@ class ProductService:
         result = await db.execute(stmt)
         products = result.scalars().all()
         
-        for product in products:
-            product_dict = self._product_to_dict(product)
-            # Manually set cache for individual product details
-            await self.cache_service.set(
-                f"{self.product_detail_prefix}:{product.id}", 
-                product_dict, 
-                ttl=config.long_cache_ttl, 
-                cache_name=self.cache_name
-            )
-            logger.debug(f"Warmed cache for product {product.id}")
+        # Write every product detail entry through one pipelined round-trip
+        await self.cache_service.set_many(
+            {f"{self.product_detail_prefix}:{product.id}": self._to_cache_entry(self._product_to_dict(product)) for product in products},
+            ttl=config.long_cache_ttl,
+            cache_name=self.cache_name
+        )
         
         # Also warm the main product list
-        all_products = await self.get_all_products(db) # This will use the cached decorator
+        all_products = await self.get_all_products(db) # Bulk-fills any detail entries still missing
         logger.info(f"Finished warming cache for {len(products)} products and product list.")
 
+    def _to_cache_entry(self, product_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Wraps a product dict with its ETag so cache hits never recompute it."""
+        return {"product": product_dict, "etag": compute_etag(product_dict)}
+
     def _product_to_dict(self, product: Product) -> Dict[str, Any]:
         """Converts a Product SQLAlchemy object to a dictionary."""
         return {
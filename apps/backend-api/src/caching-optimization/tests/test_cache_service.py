@@ -1,9 +1,11 @@
 import pytest
 import asyncio
-import json
+import dataclasses
+import weakref
+import msgspec
 from unittest.mock import AsyncMock, MagicMock
 
-from core.cache_service import CacheService, CACHE_HITS, CACHE_MISSES, CACHE_SET_OPERATIONS, CACHE_DELETE_OPERATIONS
+from core.cache_service import CacheService, TrackingL1Cache, _cache_key_suffix, _pack, _unpack, metric_total, CACHE_HITS, CACHE_MISSES, CACHE_SET_OPERATIONS, CACHE_DELETE_OPERATIONS
 from config import config
 
 @pytest.fixture
@@ -12,27 +14,58 @@ def mock_redis_client():
     mock.get.return_value = None # Default to cache miss
     mock.set.return_value = None
     mock.delete.return_value = None
-    mock.scan_iter.return_value = AsyncMock(return_value=[]) # Default empty scan
+    mock.register_script = MagicMock(return_value=AsyncMock(return_value=[0, b"0"])) # Invalidation script unlinks nothing and completes by default
     return mock
 
+def mock_pipeline(mock_redis_client, results=None):
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=results)
+    pipe_context = MagicMock()
+    pipe_context.__aenter__ = AsyncMock(return_value=pipe)
+    pipe_context.__aexit__ = AsyncMock(return_value=False)
+    mock_redis_client.pipeline = MagicMock(return_value=pipe_context)
+    return pipe
+
+# Counter totals when the current test started; counters are process-wide and cannot be reset
+_baseline = {}
+
+def metric_delta(counter):
+    return metric_total(counter) - _baseline[counter]
+
 @pytest.fixture
 def cache_service(mock_redis_client):
-    # Reset Prometheus counters before each test
     for counter in [CACHE_HITS, CACHE_MISSES, CACHE_SET_OPERATIONS, CACHE_DELETE_OPERATIONS]:
-        counter._value = 0
-    return CacheService(mock_redis_client)
+        _baseline[counter] = metric_total(counter)
+    service = CacheService(mock_redis_client)
+    service._l1.clear() # The L1 cache is process-wide
+    return service
 
 @pytest.mark.asyncio
 async def test_get_cache_hit(cache_service: CacheService, mock_redis_client):
     test_key = "test:key"
     test_value = {"data": "value"}
-    mock_redis_client.get.return_value = json.dumps(test_value).encode('utf-8')
+    mock_redis_client.get.return_value = b"\x00" + msgspec.msgpack.encode(test_value)
 
     result = await cache_service.get(test_key)
     assert result == test_value
     mock_redis_client.get.assert_called_once_with(test_key)
-    assert CACHE_HITS._value == 1
-    assert CACHE_MISSES._value == 0
+    assert metric_delta(CACHE_HITS) == 1
+    assert metric_delta(CACHE_MISSES) == 0
+
+@pytest.mark.asyncio
+async def test_get_served_from_l1(cache_service: CacheService, mock_redis_client):
+    test_key = "test:key"
+    mock_redis_client.get.return_value = b"\x00" + msgspec.msgpack.encode({"data": "value"})
+
+    assert await cache_service.get(test_key) == {"data": "value"}
+    assert await cache_service.get(test_key) == {"data": "value"}
+    mock_redis_client.get.assert_called_once_with(test_key)
+    assert metric_delta(CACHE_HITS) == 2
+
+    # Deleting evicts the L1 entry as well
+    await cache_service.delete(test_key)
+    mock_redis_client.get.return_value = None
+    assert await cache_service.get(test_key) is None
 
 @pytest.mark.asyncio
 async def test_get_cache_miss(cache_service: CacheService, mock_redis_client):
@@ -42,8 +75,8 @@ async def test_get_cache_miss(cache_service: CacheService, mock_redis_client):
     result = await cache_service.get(test_key)
     assert result is None
     mock_redis_client.get.assert_called_once_with(test_key)
-    assert CACHE_HITS._value == 0
-    assert CACHE_MISSES._value == 1
+    assert metric_delta(CACHE_HITS) == 0
+    assert metric_delta(CACHE_MISSES) == 1
 
 @pytest.mark.asyncio
 async def test_set_cache(cache_service: CacheService, mock_redis_client):
@@ -52,8 +85,8 @@ async def test_set_cache(cache_service: CacheService, mock_redis_client):
     test_ttl = 60
 
     await cache_service.set(test_key, test_value, ttl=test_ttl)
-    mock_redis_client.set.assert_called_once_with(test_key, json.dumps(test_value), ex=test_ttl)
-    assert CACHE_SET_OPERATIONS._value == 1
+    mock_redis_client.set.assert_called_once_with(test_key, b"\x00" + msgspec.msgpack.encode(test_value), ex=test_ttl)
+    assert metric_delta(CACHE_SET_OPERATIONS) == 1
 
 @pytest.mark.asyncio
 async def test_set_cache_default_ttl(cache_service: CacheService, mock_redis_client):
@@ -61,8 +94,56 @@ async def test_set_cache_default_ttl(cache_service: CacheService, mock_redis_cli
     test_value = {"data": "value"}
 
     await cache_service.set(test_key, test_value)
-    mock_redis_client.set.assert_called_once_with(test_key, json.dumps(test_value), ex=config.default_cache_ttl)
-    assert CACHE_SET_OPERATIONS._value == 1
+    mock_redis_client.set.assert_called_once_with(test_key, b"\x00" + msgspec.msgpack.encode(test_value), ex=config.default_cache_ttl)
+    assert metric_delta(CACHE_SET_OPERATIONS) == 1
+
+def test_tracking_l1_cache_keeps_tracked_keys_until_invalidated():
+    l1 = TrackingL1Cache(capacity=10, ttl=0, prefixes=("product:detail:",))
+    l1.tracking = True
+
+    l1.set("product:detail:1", b"one", l1.epoch)
+    l1.set("other:1", b"untracked", l1.epoch) # Untracked keys follow the TTL, which disables them here
+    assert l1.get("product:detail:1") == b"one"
+    assert l1.get("other:1") is None
+
+    # A fill that started before an invalidation is dropped
+    epoch = l1.epoch
+    l1.invalidate([b"product:detail:1"])
+    assert l1.get("product:detail:1") is None
+    l1.set("product:detail:1", b"stale", epoch)
+    assert l1.get("product:detail:1") is None
+
+def test_pack_compresses_large_values():
+    small_value = {"data": "value"}
+    large_value = {"data": "x" * (config.min_compress_bytes * 2)}
+
+    assert _pack(small_value) == b"\x00" + msgspec.msgpack.encode(small_value)
+    packed = _pack(large_value)
+    assert packed[:1] == b"\x01"
+    assert len(packed) < len(msgspec.msgpack.encode(large_value))
+    assert _unpack(packed) == large_value
+
+@pytest.mark.asyncio
+async def test_get_many(cache_service: CacheService, mock_redis_client):
+    keys = ["test:key1", "test:key2"]
+    mock_redis_client.mget.return_value = [b"\x00" + msgspec.msgpack.encode({"data": 1}), None]
+
+    result = await cache_service.get_many(keys)
+    assert result == [{"data": 1}, None]
+    mock_redis_client.mget.assert_called_once_with(keys)
+    assert metric_delta(CACHE_HITS) == 1
+    assert metric_delta(CACHE_MISSES) == 1
+
+@pytest.mark.asyncio
+async def test_set_many_uses_pipeline(cache_service: CacheService, mock_redis_client):
+    pipe = mock_pipeline(mock_redis_client)
+
+    await cache_service.set_many({"test:key1": {"data": 1}, "test:key2": {"data": 2}}, ttl=30)
+    mock_redis_client.pipeline.assert_called_once_with(transaction=False)
+    assert pipe.set.call_count == 2
+    pipe.set.assert_any_call("test:key1", b"\x00" + msgspec.msgpack.encode({"data": 1}), ex=30)
+    pipe.execute.assert_awaited_once()
+    assert metric_delta(CACHE_SET_OPERATIONS) == 2
 
 @pytest.mark.asyncio
 async def test_delete_cache(cache_service: CacheService, mock_redis_client):
@@ -70,19 +151,36 @@ async def test_delete_cache(cache_service: CacheService, mock_redis_client):
 
     await cache_service.delete(test_key)
     mock_redis_client.delete.assert_called_once_with(test_key)
-    assert CACHE_DELETE_OPERATIONS._value == 1
+    assert metric_delta(CACHE_DELETE_OPERATIONS) == 1
 
 @pytest.mark.asyncio
 async def test_invalidate_pattern(cache_service: CacheService, mock_redis_client):
     pattern = "prefix:*"
-    keys_to_delete = ["prefix:key1", "prefix:key2"]
-    mock_redis_client.scan_iter.return_value = AsyncMock(return_value=keys_to_delete).__aiter__()
-    mock_redis_client.delete.return_value = len(keys_to_delete)
+    invalidate_script = mock_redis_client.register_script.return_value
+    invalidate_script.return_value = [2, b"0"]
+
+    await cache_service.invalidate_pattern(pattern)
+    invalidate_script.assert_awaited_once_with(keys=[pattern], args=["0", config.scan_count, config.scan_steps_per_call])
+    mock_redis_client.scan_iter.assert_not_called()
+    assert metric_delta(CACHE_DELETE_OPERATIONS) == 2
+
+@pytest.mark.asyncio
+async def test_invalidate_pattern_resumes_from_cursor(cache_service: CacheService, mock_redis_client, monkeypatch):
+    pattern = "prefix:*"
+    invalidate_script = mock_redis_client.register_script.return_value
+    invalidate_script.side_effect = [[3, b"17"], [0, b"42"], [4, b"0"]]
 
     await cache_service.invalidate_pattern(pattern)
-    mock_redis_client.scan_iter.assert_called_once_with(match=pattern)
-    mock_redis_client.delete.assert_called_once_with(*keys_to_delete)
-    assert CACHE_DELETE_OPERATIONS._value == len(keys_to_delete)
+    # Each script call scans a bounded slice and hands back the cursor the next call resumes from
+    assert [call.kwargs["args"][0] for call in invalidate_script.await_args_list] == ["0", b"17", b"42"]
+    assert metric_delta(CACHE_DELETE_OPERATIONS) == 7
+
+    # The key cap stops the walk between calls
+    monkeypatch.setattr("core.cache_service.config", dataclasses.replace(config, max_keys_per_invalidation=3))
+    invalidate_script.reset_mock()
+    invalidate_script.side_effect = [[3, b"17"], [4, b"0"]]
+    await cache_service.invalidate_pattern(pattern)
+    invalidate_script.assert_awaited_once()
 
 @pytest.mark.asyncio
 async def test_cached_decorator_hit(cache_service: CacheService, mock_redis_client):
@@ -91,13 +189,13 @@ async def test_cached_decorator_hit(cache_service: CacheService, mock_redis_clie
         return arg1 + arg2
 
     # Simulate cache hit
-    mock_redis_client.get.return_value = json.dumps("cached_result").encode('utf-8')
+    mock_redis_client.get.return_value = b"\x00" + msgspec.msgpack.encode("cached_result")
 
     result = await test_func(1, 2)
     assert result == "cached_result"
     mock_redis_client.get.assert_called_once()
     mock_redis_client.set.assert_not_called()
-    assert CACHE_HITS._value == 1
+    assert metric_delta(CACHE_HITS) == 1
 
 @pytest.mark.asyncio
 async def test_cached_decorator_miss(cache_service: CacheService, mock_redis_client):
@@ -112,5 +210,66 @@ async def test_cached_decorator_miss(cache_service: CacheService, mock_redis_cli
     assert result == 3
     mock_redis_client.get.assert_called_once()
     mock_redis_client.set.assert_called_once() # Should set the result
-    assert CACHE_MISSES._value == 1
-    assert CACHE_SET_OPERATIONS._value == 1
+    assert metric_delta(CACHE_MISSES) == 1
+    assert metric_delta(CACHE_SET_OPERATIONS) == 1
+
+@pytest.mark.asyncio
+async def test_cached_decorator_single_flight(cache_service: CacheService, mock_redis_client):
+    calls = 0
+    release = asyncio.Event()
+
+    @cache_service.cached(key_prefix="test_func", ttl=10)
+    async def test_func(arg):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return arg * 2
+
+    # Simulate concurrent misses on the same key
+    mock_redis_client.get.return_value = None
+    tasks = [asyncio.create_task(test_func(21)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [42, 42, 42]
+    assert calls == 1
+    mock_redis_client.set.assert_called_once()
+
+def test_cache_key_suffix_handles_unhashable_args():
+    assert _cache_key_suffix((1, "a"), {"b": 2, "c": 3}) == _cache_key_suffix((1, "a"), {"c": 3, "b": 2})
+    assert _cache_key_suffix(({"filters": [1, 2]},), {}) == _cache_key_suffix(({"filters": [1, 2]},), {})
+    assert _cache_key_suffix((1,), {}) != _cache_key_suffix((2,), {})
+
+def test_cache_key_suffix_distinguishes_equal_values_of_other_types():
+    suffixes = [_cache_key_suffix((value,), {}) for value in (1, True, 1.0)]
+    assert len(set(suffixes)) == 3
+    assert _cache_key_suffix((), {"flag": 1}) != _cache_key_suffix((), {"flag": True})
+    assert _cache_key_suffix((0.0,), {}) != _cache_key_suffix((-0.0,), {})
+
+def test_cache_key_suffix_does_not_retain_objects():
+    class Session:
+        pass
+
+    session = Session()
+    reference = weakref.ref(session)
+    _cache_key_suffix((session, 1), {})
+    del session
+    assert reference() is None
+
+@pytest.mark.asyncio
+async def test_cached_decorator_single_flight_propagates_errors(cache_service: CacheService, mock_redis_client):
+    release = asyncio.Event()
+
+    @cache_service.cached(key_prefix="test_func", ttl=10)
+    async def test_func(arg):
+        await release.wait()
+        raise ValueError("backend unavailable")
+
+    mock_redis_client.get.return_value = None
+    tasks = [asyncio.create_task(test_func(1)) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    mock_redis_client.set.assert_not_called()
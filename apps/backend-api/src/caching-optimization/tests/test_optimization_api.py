@@ -0,0 +1,81 @@
+import pytest
+import pytest_asyncio
+import httpx
+from unittest.mock import AsyncMock
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.optimization_api import router, _etag_matches
+from database.database import get_db
+from services.product_service import ProductService
+from core.cache_service import CacheService
+
+@pytest.fixture
+def mock_cache_service():
+    mock = AsyncMock(spec=CacheService)
+    mock.get.return_value = None # Default to cache miss
+    mock.get_many.side_effect = lambda keys, cache_name="default": [None] * len(keys)
+    return mock
+
+@pytest_asyncio.fixture
+async def client(db_session: AsyncSession, mock_cache_service):
+    """HTTP client for the optimization router, wired to the test database"""
+    app = FastAPI()
+    app.include_router(router)
+    app.state.cache_service = mock_cache_service
+    app.state.product_service = ProductService(mock_cache_service)
+    app.dependency_overrides[get_db] = lambda: db_session
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+@pytest_asyncio.fixture
+async def product_id(db_session: AsyncSession, mock_cache_service):
+    product = await ProductService(mock_cache_service).create_product(db_session, "API Product", "Desc", 10.0, "Cat1", 3)
+    return product["id"]
+
+def test_etag_matches():
+    etag = 'W/"abc"'
+    assert _etag_matches('W/"abc"', etag)
+    assert _etag_matches('"abc"', etag) # Weak comparison ignores the W/ prefix
+    assert _etag_matches('"xyz", W/"abc"', etag)
+    assert _etag_matches('*', etag)
+    assert not _etag_matches('"xyz"', etag)
+    assert not _etag_matches(None, etag)
+
+@pytest.mark.asyncio
+async def test_get_product_by_id_not_modified(client: httpx.AsyncClient, product_id: int):
+    response = await client.get(f"/v1/products/{product_id}")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    revalidated = await client.get(f"/v1/products/{product_id}", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.headers["Cache-Control"] == response.headers["Cache-Control"]
+
+@pytest.mark.asyncio
+async def test_get_product_by_id_stale_etag(client: httpx.AsyncClient, product_id: int):
+    response = await client.get(f"/v1/products/{product_id}", headers={"If-None-Match": 'W/"stale"'})
+    assert response.status_code == 200
+    assert response.json()["name"] == "API Product"
+
+@pytest.mark.asyncio
+async def test_get_all_products_not_modified(client: httpx.AsyncClient, product_id: int):
+    response = await client.get("/v1/products")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    revalidated = await client.get("/v1/products", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+@pytest.mark.asyncio
+async def test_get_all_products_etag_changes_with_products(client: httpx.AsyncClient, product_id: int):
+    etag = (await client.get("/v1/products")).headers["ETag"]
+
+    await client.put(f"/v1/products/{product_id}", json={"price": 12.5})
+    response = await client.get("/v1/products", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -6,7 +6,7 @@ from sqlalchemy.future import select
 
 from database.models import Product
 from services.product_service import ProductService
-from core.cache_service import CacheService
+from core.cache_service import CacheService, compute_etag
 from config import config
 
 # Fixture for mock CacheService
@@ -15,28 +15,10 @@ def mock_cache_service():
     mock = AsyncMock(spec=CacheService)
     mock.get.return_value = None # Default to cache miss
     mock.set.return_value = None
+    mock.get_many.side_effect = lambda keys, cache_name="default": [None] * len(keys)
+    mock.set_many.return_value = None
     mock.delete.return_value = None
     mock.invalidate_pattern.return_value = None
-    
-    # Mock the cached decorator to just call the original function
-    def mock_cached_decorator(key_prefix, ttl=None, cache_name="default"):
-        def decorator(func):
-            async def wrapper(*args, **kwargs):
-                # Simulate cache check
-                cache_key_suffix = hashlib.sha256(json.dumps(args, default=str).encode() + json.dumps(kwargs, default=str).encode()).hexdigest()
-                cache_key = f"{key_prefix}:{func.__name__}:{cache_key_suffix}"
-                
-                cached_result = await mock.get(cache_key, cache_name=cache_name)
-                if cached_result is not None:
-                    return cached_result
-                
-                result = await func(*args, **kwargs)
-                await mock.set(cache_key, result, ttl=ttl, cache_name=cache_name)
-                return result
-            return wrapper
-        return decorator
-    
-    mock.cached = MagicMock(side_effect=mock_cached_decorator)
     return mock
 
 # Fixture for ProductService
@@ -60,8 +42,8 @@ async def test_create_product(db_session: AsyncSession, product_service: Product
     assert product["id"] is not None
     
     # Verify cache invalidation calls
-    mock_cache_service.invalidate_pattern.assert_called_with(f"{product_service.product_list_cache_key}*", cache_name=product_service.cache_name)
-    mock_cache_service.invalidate_pattern.assert_called_with(f"{product_service.product_detail_prefix}:get_product_by_id:*", cache_name=product_service.cache_name)
+    mock_cache_service.invalidate_pattern.assert_not_called()
+    mock_cache_service.delete.assert_called_with(f"{product_service.product_detail_prefix}:{product['id']}", cache_name=product_service.cache_name)
 
     # Verify product is in DB
     stmt = select(Product).where(Product.id == product["id"])
@@ -79,9 +61,32 @@ async def test_get_all_products(db_session: AsyncSession, product_service: Produ
     assert len(products) >= 1
     assert "Product A" in [p["name"] for p in products]
     
-    # Verify cache calls (get and set from decorator)
-    mock_cache_service.get.assert_called_once()
-    mock_cache_service.set.assert_called_once()
+    # Verify one bulk lookup and one bulk fill for the misses
+    mock_cache_service.get_many.assert_called_once()
+    mock_cache_service.set_many.assert_called_once()
+    cached_items = mock_cache_service.set_many.call_args.args[0]
+    assert all(key.startswith(f"{product_service.product_detail_prefix}:") for key in cached_items)
+
+@pytest.mark.asyncio
+async def test_get_all_products_served_from_cache(db_session: AsyncSession, product_service: ProductService, mock_cache_service):
+    created_product = await product_service.create_product(db_session, "Product Cached", "Desc", 12.0, "Cat1", 3)
+    await db_session.commit()
+    
+    cached_entry = {"product": created_product, "etag": "cached-etag"}
+    mock_cache_service.get_many.side_effect = lambda keys, cache_name="default": [cached_entry] * len(keys)
+    
+    products = await product_service.get_all_products(db_session)
+    assert created_product in products
+    mock_cache_service.set_many.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_product_entries_carry_etags(db_session: AsyncSession, product_service: ProductService, mock_cache_service):
+    created_product = await product_service.create_product(db_session, "Product E", "Desc E", 15.0, "Cat1", 2)
+    await db_session.commit()
+
+    entries = await product_service.get_product_entries(db_session)
+    entry = next(entry for entry in entries if entry["product"]["id"] == created_product["id"])
+    assert entry["etag"] == compute_etag(entry["product"])
 
 @pytest.mark.asyncio
 async def test_get_product_by_id(db_session: AsyncSession, product_service: ProductService, mock_cache_service):
@@ -91,9 +96,33 @@ async def test_get_product_by_id(db_session: AsyncSession, product_service: Prod
     product = await product_service.get_product_by_id(db_session, created_product["id"])
     assert product["name"] == "Product B"
     
-    # Verify cache calls (get and set from decorator)
-    mock_cache_service.get.assert_called_once()
+    # Verify the product was cached together with its ETag
+    cache_key = f"{product_service.product_detail_prefix}:{created_product['id']}"
+    mock_cache_service.get.assert_called_once_with(cache_key, cache_name=product_service.cache_name)
     mock_cache_service.set.assert_called_once()
+    cached_entry = mock_cache_service.set.call_args.args[1]
+    assert cached_entry == {"product": product, "etag": compute_etag(product)}
+
+@pytest.mark.asyncio
+async def test_get_product_entry_cache_hit(db_session: AsyncSession, product_service: ProductService, mock_cache_service):
+    cached_entry = {"product": {"id": 1, "name": "Cached"}, "etag": "cached-etag"}
+    mock_cache_service.get.return_value = cached_entry
+
+    entry = await product_service.get_product_entry(db_session, 1)
+    assert entry == cached_entry
+    mock_cache_service.set.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_product_etag_changes_on_update(db_session: AsyncSession, product_service: ProductService, mock_cache_service):
+    created_product = await product_service.create_product(db_session, "Product F", "Desc F", 50.0, "Cat5", 5)
+    original_entry = await product_service.get_product_entry(db_session, created_product["id"])
+
+    await product_service.update_product(db_session, created_product["id"], {"price": 55.0})
+    updated_entry = await product_service.get_product_entry(db_session, created_product["id"])
+
+    # The update invalidated the cached entry, and the reloaded one carries an ETag for the new payload
+    assert updated_entry["etag"] == compute_etag(updated_entry["product"])
+    assert updated_entry["etag"] != original_entry["etag"]
 
 @pytest.mark.asyncio
 async def test_update_product(db_session: AsyncSession, product_service: ProductService, mock_cache_service):
@@ -105,9 +134,8 @@ async def test_update_product(db_session: AsyncSession, product_service: Product
     assert updated_product["stock"] == 25
     
     # Verify cache invalidation calls
-    mock_cache_service.invalidate_pattern.assert_called_with(f"{product_service.product_list_cache_key}*", cache_name=product_service.cache_name)
+    mock_cache_service.invalidate_pattern.assert_not_called()
     mock_cache_service.delete.assert_called_with(f"{product_service.product_detail_prefix}:{created_product['id']}", cache_name=product_service.cache_name)
-    mock_cache_service.invalidate_pattern.assert_called_with(f"{product_service.product_detail_prefix}:get_product_by_id:*", cache_name=product_service.cache_name)
 
 
 @pytest.mark.asyncio
@@ -119,9 +147,8 @@ async def test_delete_product(db_session: AsyncSession, product_service: Product
     assert deleted is True
     
     # Verify cache invalidation calls
-    mock_cache_service.invalidate_pattern.assert_called_with(f"{product_service.product_list_cache_key}*", cache_name=product_service.cache_name)
+    mock_cache_service.invalidate_pattern.assert_not_called()
     mock_cache_service.delete.assert_called_with(f"{product_service.product_detail_prefix}:{created_product['id']}", cache_name=product_service.cache_name)
-    mock_cache_service.invalidate_pattern.assert_called_with(f"{product_service.product_detail_prefix}:get_product_by_id:*", cache_name=product_service.cache_name)
 
     # Verify product is deleted from DB
     stmt = select(Product).where(Product.id == created_product["id"])
@@ -137,12 +164,12 @@ async def test_warm_product_cache(db_session: AsyncSession, product_service: Pro
 
     await product_service.warm_product_cache(db_session)
     
-    # Verify that get_all_products was called (which uses the cached decorator)
-    # and that individual products were set in cache
-    assert mock_cache_service.cached.called # The decorator itself was used
-    assert mock_cache_service.set.call_count >= 5 # At least 5 individual products + 1 for the list
+    # Verify the warmed details went through one bulk write rather than per-product sets
+    products = (await db_session.execute(select(Product))).scalars().all()
+    warm_writes = [call for call in mock_cache_service.set_many.call_args_list if call.kwargs["ttl"] == config.long_cache_ttl]
+    assert len(warm_writes) == 1
+    assert set(warm_writes[0].args[0]) == {f"product:detail:{p.id}" for p in products}
+    mock_cache_service.set.assert_not_called()
     
-    # Check if specific product detail keys were set
-    for i in range(5):
-        # The exact key for the decorator is complex, but direct set should be there
-        assert any(f"product:detail:{p.id}" in call.args[0] for call in mock_cache_service.set.call_args_list for p in (await db_session.execute(select(Product))).scalars().all())
+    # Verify that get_all_products bulk-checked the cache
+    assert mock_cache_service.get_many.called
@@ -1,13 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, TypeAdapter
 from typing import List, Dict, Any, Optional
 import datetime
 import structlog
 
 from database.database import get_db, get_redis_client
+from sqlalchemy import select, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.reputation_service import ReputationService
-from core.consensus_mechanism import ConsensusMechanism
 from core.validation_service import ValidationService
 from core.content_model import (
     ContentSubmission, ContentResponse, 
@@ -21,26 +21,33 @@ logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
-# Dependency injection for services
-async def get_reputation_service():
-    return ReputationService()
+# Built once at import; per-call values are passed as bind parameters
+_RECORDS_PAGE_BY_CONTENT_STMT = (
+    select(ValidationRecord).where(ValidationRecord.content_id == bindparam("content_id"))
+    .order_by(ValidationRecord.id).limit(bindparam("limit")).offset(bindparam("offset"))
+)
 
-async def get_consensus_mechanism(reputation_service: ReputationService = Depends(get_reputation_service)):
-    return ConsensusMechanism(reputation_service)
+# List responses are validated and encoded by adapters compiled once at import rather than by
+# FastAPI's response_model pass; the model is still declared under responses for the OpenAPI schema
+_CONTENT_LIST_ADAPTER = TypeAdapter(List[ContentResponse])
+_VALIDATOR_LIST_ADAPTER = TypeAdapter(List[ValidatorResponse])
+_RECORD_LIST_ADAPTER = TypeAdapter(List[ValidationRecordResponse])
+_DISPUTE_LIST_ADAPTER = TypeAdapter(List[ContentDisputeResponse])
 
-async def get_validation_service(
-    reputation_service: ReputationService = Depends(get_reputation_service),
-    consensus_mechanism: ConsensusMechanism = Depends(get_consensus_mechanism)
-):
-    return ValidationService(reputation_service, consensus_mechanism)
+def _list_response(adapter: TypeAdapter, items) -> Response:
+    """Validates ORM rows against the adapter's model and encodes them to JSON in one pass through pydantic-core"""
+    return Response(content=adapter.dump_json(adapter.validate_python(items)), media_type="application/json")
+
+# Services are built once at startup and read from app.state; see startup_event in main.py
 
 # --- Content Endpoints ---
 @router.post("/v1/content/submit", response_model=ContentResponse, status_code=status.HTTP_201_CREATED, summary="Submit new content for validation")
 async def submit_content(
+    request: Request,
     content_data: ContentSubmission,
-    db: AsyncSession = Depends(get_db),
-    validation_service: ValidationService = Depends(get_validation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    validation_service: ValidationService = request.app.state.validation_service
     content = await validation_service.submit_content_for_validation(
         db,
         title=content_data.title,
@@ -54,31 +61,34 @@ async def submit_content(
 
 @router.get("/v1/content/{content_uuid}", response_model=ContentResponse, summary="Get content details by UUID")
 async def get_content_details(
+    request: Request,
     content_uuid: str,
-    db: AsyncSession = Depends(get_db),
-    validation_service: ValidationService = Depends(get_validation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    validation_service: ValidationService = request.app.state.validation_service
     content = await validation_service.get_content_details(db, content_uuid)
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
     return content
 
-@router.get("/v1/content", response_model=List[ContentResponse], summary="Get content by validation status")
+@router.get("/v1/content", response_model=None, responses={200: {"model": List[ContentResponse]}}, summary="Get content by validation status")
 async def get_content_by_status(
+    request: Request,
     status: str = "PENDING",
-    db: AsyncSession = Depends(get_db),
-    validation_service: ValidationService = Depends(get_validation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    validation_service: ValidationService = request.app.state.validation_service
     content_list = await validation_service.get_content_by_status(db, status)
-    return content_list
+    return _list_response(_CONTENT_LIST_ADAPTER, content_list)
 
 # --- Validator Endpoints ---
 @router.post("/v1/validators/register", response_model=ValidatorResponse, status_code=status.HTTP_201_CREATED, summary="Register a new validator node")
 async def register_validator(
+    request: Request,
     validator_data: ValidatorRegistration,
-    db: AsyncSession = Depends(get_db),
-    reputation_service: ReputationService = Depends(get_reputation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    reputation_service: ReputationService = request.app.state.reputation_service
     try:
         validator = await reputation_service.register_validator(
             db,
@@ -93,30 +103,35 @@ async def register_validator(
 
 @router.get("/v1/validators/{validator_id}/reputation", summary="Get validator reputation score")
 async def get_validator_reputation(
+    request: Request,
     validator_id: str,
-    db: AsyncSession = Depends(get_db),
-    reputation_service: ReputationService = Depends(get_reputation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    reputation_service: ReputationService = request.app.state.reputation_service
     reputation = await reputation_service.get_validator_reputation(db, validator_id)
     if reputation is None:
         raise HTTPException(status_code=404, detail="Validator not found")
     return {"validator_id": validator_id, "reputation_score": reputation}
 
-@router.get("/v1/validators", response_model=List[ValidatorResponse], summary="Get all registered validators")
+@router.get("/v1/validators", response_model=None, responses={200: {"model": List[ValidatorResponse]}}, summary="Get all registered validators")
 async def get_all_validators(
+    limit: int = 100,
+    offset: int = 0,
     db: AsyncSession = Depends(get_db)
 ):
-    result = await db.execute(select(Validator))
+    # Paged so a response never materializes the whole table
+    result = await db.execute(select(Validator).order_by(Validator.id).limit(limit).offset(offset))
     validators = result.scalars().all()
-    return validators
+    return _list_response(_VALIDATOR_LIST_ADAPTER, validators)
 
 # --- Validation Vote Endpoints ---
 @router.post("/v1/validation/vote", response_model=ValidationRecordResponse, status_code=status.HTTP_201_CREATED, summary="Submit a validation vote for content")
 async def submit_validation_vote(
+    request: Request,
     vote_data: ValidationVote,
-    db: AsyncSession = Depends(get_db),
-    validation_service: ValidationService = Depends(get_validation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    validation_service: ValidationService = request.app.state.validation_service
     try:
         record = await validation_service.submit_validation_vote(
             db,
@@ -131,26 +146,29 @@ async def submit_validation_vote(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/v1/validation/records/{content_uuid}", response_model=List[ValidationRecordResponse], summary="Get all validation records for a content item")
+@router.get("/v1/validation/records/{content_uuid}", response_model=None, responses={200: {"model": List[ValidationRecordResponse]}}, summary="Get all validation records for a content item")
 async def get_validation_records_for_content(
     content_uuid: str,
+    limit: int = 100,
+    offset: int = 0,
     db: AsyncSession = Depends(get_db)
 ):
-    content = await db.execute(select(Content).where(Content.content_id == content_uuid)).scalar_one_or_none()
-    if not content:
+    content_db_id = await db.scalar(select(Content.id).where(Content.content_id == content_uuid))
+    if content_db_id is None:
         raise HTTPException(status_code=404, detail="Content not found")
     
-    result = await db.execute(select(ValidationRecord).where(ValidationRecord.content_id == content.id))
+    result = await db.execute(_RECORDS_PAGE_BY_CONTENT_STMT, {"content_id": content_db_id, "limit": limit, "offset": offset})
     records = result.scalars().all()
-    return records
+    return _list_response(_RECORD_LIST_ADAPTER, records)
 
 # --- Dispute Endpoints ---
 @router.post("/v1/disputes/submit", response_model=ContentDisputeResponse, status_code=status.HTTP_201_CREATED, summary="Submit a dispute for content validation")
 async def submit_dispute(
+    request: Request,
     dispute_data: ContentDisputeSubmission,
-    db: AsyncSession = Depends(get_db),
-    validation_service: ValidationService = Depends(get_validation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    validation_service: ValidationService = request.app.state.validation_service
     try:
         dispute = await validation_service.submit_content_dispute(
             db,
@@ -164,12 +182,13 @@ async def submit_dispute(
 
 @router.put("/v1/disputes/{dispute_id}/resolve", response_model=ContentDisputeResponse, summary="Resolve a content dispute")
 async def resolve_dispute(
+    request: Request,
     dispute_id: int,
     new_status: str,
     resolved_by: str,
-    db: AsyncSession = Depends(get_db),
-    validation_service: ValidationService = Depends(get_validation_service)
+    db: AsyncSession = Depends(get_db)
 ):
+    validation_service: ValidationService = request.app.state.validation_service
     try:
         dispute = await validation_service.resolve_content_dispute(
             db, dispute_id, new_status, resolved_by
@@ -180,14 +199,16 @@ async def resolve_dispute(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/v1/disputes", response_model=List[ContentDisputeResponse], summary="Get all content disputes")
+@router.get("/v1/disputes", response_model=None, responses={200: {"model": List[ContentDisputeResponse]}}, summary="Get all content disputes")
 async def get_all_disputes(
     status: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
     db: AsyncSession = Depends(get_db)
 ):
     query = select(ContentDispute)
     if status:
         query = query.where(ContentDispute.status == status)
-    result = await db.execute(query)
+    result = await db.execute(query.order_by(ContentDispute.id).limit(limit).offset(offset))
     disputes = result.scalars().all()
-    return disputes
+    return _list_response(_DISPUTE_LIST_ADAPTER, disputes)
@@ -1,8 +1,9 @@
 import datetime
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, case, bindparam
+from sqlalchemy.orm import selectinload
 
 from database.models import Content, ValidationRecord
 from core.reputation_service import ReputationService
@@ -10,36 +11,62 @@ from config import config
 
 logger = structlog.get_logger(__name__)
 
+# Hot statements are built once at import; per-call values are passed as bind parameters
+# The vote tally is aggregated by the database instead of counting loaded records
+_VOTE_TALLY_STMT = select(
+    func.count(ValidationRecord.id).label("total"),
+    func.sum(case((ValidationRecord.is_accurate == True, 1), else_=0)).label("accurate")
+).where(ValidationRecord.content_id == bindparam("content_id"))
+# Validators come in one extra query rather than N lazy loads
+_RECORDS_BY_CONTENT_STMT = select(ValidationRecord).where(ValidationRecord.content_id == bindparam("content_id")).options(
+    selectinload(ValidationRecord.validator)
+)
+
 class ConsensusMechanism:
+    _logged = False # The init line is an app-lifetime event, logged once per process
+
     def __init__(self, reputation_service: ReputationService):
         self.reputation_service = reputation_service
-        logger.info("ConsensusMechanism initialized.")
+        self._threshold_ratio = config.consensus_threshold_percent # Fraction of accurate votes needed for approval
+        self._min_validators = config.min_validators_per_content
+        if not ConsensusMechanism._logged:
+            ConsensusMechanism._logged = True
+            logger.info("ConsensusMechanism initialized.")
 
-    async def evaluate_content_consensus(self, db: AsyncSession, content_db_id: int) -> Tuple[bool, float]:
+    async def evaluate_content_consensus(self, db: AsyncSession, content_db_id: int) -> Optional[Tuple[bool, float]]:
         """
         Evaluates the consensus for a given content based on submitted validation records.
-        Returns (is_approved, consensus_score).
+        Returns (is_approved, consensus_score), or None when there are too few votes to decide yet.
         """
-        stmt = select(ValidationRecord).where(ValidationRecord.content_id == content_db_id)
-        result = await db.execute(stmt)
-        records = result.scalars().all()
+        tally = (await db.execute(_VOTE_TALLY_STMT, {"content_id": content_db_id})).one()
+        total_votes = tally.total
+        accurate_votes = tally.accurate or 0
 
-        if not records:
+        if not total_votes:
             logger.warning(f"No validation records found for content ID {content_db_id}.")
-            return False, 0.0
+            return None
+        if total_votes < self._min_validators:
+            # Not enough votes yet: skip loading the records and the reputation pass
+            logger.debug("Consensus deferred, not enough votes.", content_id=content_db_id, total_votes=total_votes)
+            return None
 
-        total_votes = len(records)
-        accurate_votes = sum(1 for r in records if r.is_accurate)
-        
-        consensus_score = (accurate_votes / total_votes) * 100 if total_votes > 0 else 0.0
-        is_approved = consensus_score >= config.consensus_threshold_percent * 100
+        ratio = accurate_votes / total_votes
+        is_approved = ratio >= self._threshold_ratio
+        consensus_score = ratio * 100 # Reported as a percentage
 
+        # Constant message with structured fields: nothing is formatted unless the line is emitted
         logger.info(
-            f"Consensus evaluation for content {content_db_id}: "
-            f"Total votes: {total_votes}, Accurate votes: {accurate_votes}, "
-            f"Consensus score: {consensus_score:.2f}%, Approved: {is_approved}"
+            "Consensus evaluated.",
+            content_id=content_db_id,
+            total_votes=total_votes,
+            accurate_votes=accurate_votes,
+            consensus_score=round(consensus_score, 2),
+            approved=is_approved
         )
 
+        # Records are only loaded for the reputation pass
+        records = (await db.execute(_RECORDS_BY_CONTENT_STMT, {"content_id": content_db_id})).scalars().all()
+
         # Update validator reputations based on this consensus
         await self._update_validator_reputations(db, records, is_approved)
 
@@ -48,27 +75,26 @@ class ConsensusMechanism:
     async def _update_validator_reputations(self, db: AsyncSession, records: List[ValidationRecord], final_approval: bool):
         """
         Updates the reputation of validators based on whether their vote aligned with the final consensus.
+        All validators are updated in bulk and the outcome is committed in a single transaction.
         """
-        for record in records:
-            voted_with_consensus = (record.is_accurate == final_approval)
-            
-            # For simplicity, we're not implementing complex malicious detection here.
-            # A malicious flag could be set if a validator consistently votes against consensus
-            # or submits obviously false data.
-            is_malicious = False 
+        # For simplicity, we're not implementing complex malicious detection here.
+        # A malicious flag could be set if a validator consistently votes against consensus
+        # or submits obviously false data.
+        outcomes = {record.validator.validator_id: record.is_accurate == final_approval for record in records}
+        reputation_changes = await self.reputation_service.apply_consensus_outcomes(db, outcomes)
 
-            new_reputation = await self.reputation_service.update_reputation(
-                db, record.validator.validator_id, voted_with_consensus, is_malicious
-            )
-            
-            # Store the outcome in the validation record
-            record.voted_with_consensus = voted_with_consensus
-            # Calculate actual reputation change for the record (current - old)
-            # This would require fetching old reputation or passing it. For simplicity,
-            # we'll just store the new reputation and assume the change is implied.
-            # A more robust solution would calculate and store the delta.
-            record.reputation_change = new_reputation # Storing new score for simplicity
-            
-            await db.merge(record) # Merge to update the record
+        # Store the outcome in the validation records; they are tracked by the session and flushed on commit.
+        # The summary count is taken in the same pass rather than by a second scan over the outcomes
+        with_consensus = 0
+        for record in records:
+            validator_id = record.validator.validator_id
+            record.voted_with_consensus = outcomes[validator_id]
+            record.reputation_change = reputation_changes.get(validator_id)
+            with_consensus += record.voted_with_consensus
         await db.commit()
-        logger.info("Validator reputations updated based on consensus outcome.")
+        await self.reputation_service.invalidate_cached_reputations(list(outcomes))
+        logger.info(
+            "Validator reputations updated based on consensus outcome.",
+            validators=len(outcomes),
+            with_consensus=with_consensus
+        )
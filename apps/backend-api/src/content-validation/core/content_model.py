@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Dict, Any, Optional
 import datetime
 
@@ -19,8 +19,7 @@ class ContentResponse(ContentSubmission):
     consensus_score: float
     validated_at: Optional[datetime.datetime]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ValidatorRegistration(BaseModel):
     validator_id: str
@@ -35,8 +34,7 @@ class ValidatorResponse(ValidatorRegistration):
     last_seen: datetime.datetime
     registered_at: datetime.datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ValidationVote(BaseModel):
     content_id: str # The UUID of the content
@@ -46,26 +44,33 @@ class ValidationVote(BaseModel):
     bias_score: float # 0.0 (neutral) to 1.0 (highly biased)
     comments: Optional[str] = None
 
-class ValidationRecordResponse(ValidationVote):
+class ValidationRecordResponse(BaseModel):
     id: int
+    content_id: int # The database ID of the content
+    validator_id: int # The database ID of the validator
+    is_accurate: bool
+    is_plagiarized: bool
+    bias_score: float
+    comments: Optional[str] = None
     submitted_at: datetime.datetime
     voted_with_consensus: Optional[bool]
     reputation_change: Optional[float]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class ContentDisputeSubmission(BaseModel):
     content_id: str # The UUID of the content
     disputer_id: str # User ID or Validator ID
     reason: str
 
-class ContentDisputeResponse(ContentDisputeSubmission):
+class ContentDisputeResponse(BaseModel):
     id: int
+    content_id: int # The database ID of the content
+    disputer_id: str
+    reason: str
     submitted_at: datetime.datetime
     status: str
     resolved_by: Optional[str]
     resolved_at: Optional[datetime.datetime]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
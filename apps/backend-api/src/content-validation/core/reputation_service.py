@@ -1,28 +1,75 @@
 import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, NamedTuple, Optional
+import orjson
+import redis.asyncio as redis
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, case
 
+from database.database import get_connected_redis_client
 from database.models import Validator, ValidationRecord
 from config import config
 
 logger = structlog.get_logger(__name__)
 
+def _clamped_score(reputation_change: float):
+    """SQL expression for a validator's score after a change, floored at zero"""
+    new_score = Validator.reputation_score + reputation_change
+    return case((new_score < 0.0, 0.0), else_=new_score)
+
+def _reputation_cache_key(validator_id: str) -> str:
+    return f"rep:{validator_id}"
+
+# Hash of eligible-validator lists, one field per requested count and specialty; deleted whenever a score or the validator set changes
+_ELIGIBLE_VALIDATORS_CACHE_KEY = "eligible_validators:v1"
+
+class EligibleValidator(NamedTuple):
+    id: int
+    validator_id: str
+    reputation_score: float
+
 class ReputationService:
+    _logged = False # The init line is an app-lifetime event, logged once per process
+
     def __init__(self):
-        logger.info("ReputationService initialized.")
+        # Scoring parameters are read once here rather than from config on every vote
+        self._initial = config.initial_reputation
+        self._gain = config.reputation_gain_on_correct_vote
+        self._loss = config.reputation_loss_on_incorrect_vote
+        self._malicious = config.reputation_loss_on_malicious_activity
+        self._cache_ttl = config.reputation_cache_ttl_seconds
+        self._eligible_cache_ttl = config.eligible_validators_cache_ttl_seconds
+        if not ReputationService._logged:
+            ReputationService._logged = True
+            logger.info("ReputationService initialized.")
 
     async def get_validator_reputation(self, db: AsyncSession, validator_id: str) -> float:
-        """Retrieves the current reputation score for a validator."""
-        stmt = select(Validator.reputation_score).where(Validator.validator_id == validator_id)
-        result = await db.execute(stmt)
-        reputation = result.scalar_one_or_none()
+        """Retrieves the current reputation score for a validator, served from Redis when cached."""
+        cache = get_connected_redis_client()
+        if cache:
+            try:
+                cached = await cache.get(_reputation_cache_key(validator_id))
+                if cached is not None:
+                    return float(cached)
+            except Exception as e:
+                logger.error(f"Error reading cached reputation: {e}", validator_id=validator_id)
+
+        reputation = await db.scalar(select(Validator.reputation_score).where(Validator.validator_id == validator_id))
         if reputation is None:
             logger.warning(f"Validator {validator_id} not found, returning initial reputation.")
-            return config.initial_reputation
+            return self._initial
+        await self._cache_reputation(cache, validator_id, reputation)
         return reputation
 
+    async def _cache_reputation(self, cache: Optional[redis.Redis], validator_id: str, reputation: float):
+        """Writes a committed reputation score to the cache; failures only cost a later cache miss."""
+        if not cache:
+            return
+        try:
+            await cache.set(_reputation_cache_key(validator_id), reputation, ex=self._cache_ttl)
+        except Exception as e:
+            logger.error(f"Error caching reputation: {e}", validator_id=validator_id)
+
     async def update_reputation(
         self, 
         db: AsyncSession, 
@@ -34,31 +81,97 @@ class ReputationService:
         Updates a validator's reputation based on their vote outcome.
         Applies slashing for malicious activity.
         """
-        stmt = select(Validator).where(Validator.validator_id == validator_id)
-        result = await db.execute(stmt)
-        validator = result.scalar_one_or_none()
+        reputation_change = 0.0
+        if is_malicious_flag:
+            reputation_change = -self._malicious
+        elif voted_with_consensus:
+            reputation_change = self._gain
+        else:
+            reputation_change = -self._loss
+
+        # One UPDATE ... RETURNING replaces the SELECT before and the refresh after the write
+        stmt = (
+            update(Validator)
+            .where(Validator.validator_id == validator_id)
+            .values(reputation_score=_clamped_score(reputation_change))
+            .returning(Validator.reputation_score)
+            .execution_options(synchronize_session="fetch")
+        )
+        new_score = await db.scalar(stmt)
 
-        if not validator:
+        if new_score is None:
             logger.error(f"Cannot update reputation: Validator {validator_id} not found.")
-            return config.initial_reputation # Or raise error
+            return self._initial # Or raise error
 
-        reputation_change = 0.0
         if is_malicious_flag:
-            reputation_change = -config.reputation_loss_on_malicious_activity
-            logger.warning(f"Validator {validator_id} flagged as malicious, slashing reputation by {reputation_change}.")
+            logger.warning("Validator flagged as malicious, slashing reputation.", validator_id=validator_id, reputation_change=reputation_change)
         elif voted_with_consensus:
-            reputation_change = config.reputation_gain_on_correct_vote
-            logger.info(f"Validator {validator_id} voted with consensus, gaining reputation by {reputation_change}.")
+            logger.info("Validator voted with consensus, gaining reputation.", validator_id=validator_id, reputation_change=reputation_change)
         else:
-            reputation_change = -config.reputation_loss_on_incorrect_vote
-            logger.info(f"Validator {validator_id} voted against consensus, losing reputation by {reputation_change}.")
-
-        validator.reputation_score = max(0.0, validator.reputation_score + reputation_change)
+            logger.info("Validator voted against consensus, losing reputation.", validator_id=validator_id, reputation_change=reputation_change)
         await db.commit()
-        await db.refresh(validator)
-        
-        logger.debug(f"Reputation for {validator_id} updated to {validator.reputation_score} (change: {reputation_change}).")
-        return validator.reputation_score
+        cache = get_connected_redis_client()
+        await self._cache_reputation(cache, validator_id, new_score) # Write-through
+        await self._invalidate_eligible_validators(cache)
+
+        logger.debug("Reputation updated.", validator_id=validator_id, reputation_score=new_score, reputation_change=reputation_change)
+        return new_score
+
+    async def apply_consensus_outcomes(self, db: AsyncSession, outcomes: Dict[str, bool]) -> Dict[str, float]:
+        """
+        Applies the reputation change for every validator of one consensus round in bulk.
+        outcomes maps validator_id to whether that validator voted with consensus.
+        Returns the reputation change applied to each validator; the caller commits and then calls
+        invalidate_cached_reputations, so no concurrent read re-caches a score from before the commit.
+        """
+        if not outcomes:
+            return {}
+
+        # Lock the rows until the caller commits so concurrent evaluations cannot interleave their updates;
+        # a fixed lock order keeps two evaluations sharing validators from deadlocking
+        stmt = (
+            select(Validator.validator_id, Validator.reputation_score)
+            .where(Validator.validator_id.in_(list(outcomes)))
+            .order_by(Validator.validator_id)
+            .with_for_update()
+        )
+        current_scores = dict((await db.execute(stmt)).all())
+
+        changes = {}
+        winners, losers = [], []
+        for validator_id, with_consensus in outcomes.items(): # Partitioned in one pass
+            (winners if with_consensus else losers).append(validator_id)
+        for validator_ids, reputation_change in (
+            (winners, self._gain),
+            (losers, -self._loss)
+        ):
+            if not validator_ids:
+                continue
+            await db.execute(
+                update(Validator)
+                .where(Validator.validator_id.in_(validator_ids))
+                .values(reputation_score=_clamped_score(reputation_change))
+                .execution_options(synchronize_session="fetch")
+            )
+            for validator_id in validator_ids:
+                if validator_id in current_scores:
+                    changes[validator_id] = max(0.0, current_scores[validator_id] + reputation_change) - current_scores[validator_id]
+
+        missing = set(outcomes) - set(current_scores)
+        if missing:
+            logger.error("Cannot update reputation: Validators not found.", validator_ids=sorted(missing))
+        logger.debug("Reputation updated in bulk.", validators=len(changes), with_consensus=len(winners), against_consensus=len(losers))
+        return changes
+
+    async def invalidate_cached_reputations(self, validator_ids: List[str] = ()):
+        """Drops the cached scores and eligible-validator lists in one DEL, once the new scores are committed."""
+        cache = get_connected_redis_client()
+        if not cache:
+            return
+        try:
+            await cache.delete(_ELIGIBLE_VALIDATORS_CACHE_KEY, *[_reputation_cache_key(validator_id) for validator_id in validator_ids])
+        except Exception as e:
+            logger.error(f"Error invalidating cached reputations: {e}", validators=len(validator_ids))
 
     async def register_validator(
         self, 
@@ -66,38 +179,103 @@ class ReputationService:
         validator_id: str, 
         name: str, 
         organization: str = None, 
-        specialties: List[str] = None
+        specialties: List[str] = None,
+        commit: bool = True
     ) -> Validator:
-        """Registers a new validator with an initial reputation score."""
-        existing_validator = await db.execute(select(Validator).where(Validator.validator_id == validator_id))
-        if existing_validator.scalar_one_or_none():
+        """
+        Registers a new validator with an initial reputation score.
+        With commit=False the validator is inserted but not committed, for callers that commit a larger transaction;
+        they call invalidate_cached_reputations after their commit.
+        """
+        if await db.scalar(select(Validator.id).where(Validator.validator_id == validator_id)):
             logger.warning(f"Validator {validator_id} already registered.")
             raise ValueError("Validator already registered.")
 
-        new_validator = Validator(
+        # RETURNING loads the id and server-side timestamps with the INSERT itself, so no refresh follows
+        stmt = insert(Validator).values(
             validator_id=validator_id,
             name=name,
-            reputation_score=config.initial_reputation,
+            reputation_score=self._initial,
             organization=organization,
             specialties=specialties if specialties is not None else []
-        )
-        db.add(new_validator)
-        await db.commit()
-        await db.refresh(new_validator)
-        logger.info(f"Validator {validator_id} registered with initial reputation {config.initial_reputation}.")
+        ).returning(Validator)
+        new_validator = await db.scalar(select(Validator).from_statement(stmt))
+        if commit:
+            await db.commit()
+            await self._invalidate_eligible_validators(get_connected_redis_client())
+        logger.info(f"Validator {validator_id} registered with initial reputation {self._initial}.")
         return new_validator
 
-    async def get_eligible_validators(self, db: AsyncSession, count: int) -> List[Validator]:
+    async def register_validators_bulk(self, db: AsyncSession, validators: List[Dict[str, Any]], commit: bool = True) -> int:
+        """
+        Registers many validators with one executemany INSERT instead of one round trip each.
+        Each dict needs validator_id and name, and may carry organization and specialties.
+        Duplicate validator_ids are rejected by the unique constraint, failing the whole batch.
+        With commit=False the caller commits and then calls invalidate_cached_reputations.
+        Returns the number of validators registered.
+        """
+        if not validators:
+            return 0
+
+        rows = [
+            {
+                "validator_id": validator["validator_id"],
+                "name": validator["name"],
+                "reputation_score": self._initial,
+                "organization": validator.get("organization"),
+                "specialties": validator.get("specialties") or []
+            }
+            for validator in validators
+        ]
+        await db.execute(insert(Validator), rows)
+        if commit:
+            await db.commit()
+            await self._invalidate_eligible_validators(get_connected_redis_client())
+        logger.info("Validators registered in bulk.", validators=len(rows), reputation_score=self._initial)
+        return len(rows)
+
+    async def get_eligible_validators(self, db: AsyncSession, count: int, specialty: Optional[str] = None) -> List[EligibleValidator]:
         """
-        Selects a specified number of eligible validators based on reputation.
+        Selects a specified number of eligible validators based on reputation, served from Redis when cached.
+        With a specialty, only validators listing it are selected.
+        Returns (id, validator_id, reputation_score) tuples rather than full Validator instances.
         In a real system, this would involve more complex staking/selection logic.
         """
-        stmt = select(Validator).where(
+        cache_field = f"{specialty}:{count}" if specialty else count
+        cache = get_connected_redis_client()
+        if cache:
+            try:
+                cached = await cache.hget(_ELIGIBLE_VALIDATORS_CACHE_KEY, cache_field)
+                if cached is not None:
+                    return [EligibleValidator(*row) for row in orjson.loads(cached)]
+            except Exception as e:
+                logger.error(f"Error reading cached eligible validators: {e}")
+
+        stmt = select(Validator.id, Validator.validator_id, Validator.reputation_score).where(
             Validator.is_active == True,
             Validator.reputation_score >= config.min_reputation_for_selection
         ).order_by(Validator.reputation_score.desc()).limit(count)
-        
+        if specialty:
+            # JSONB containment, answered from the GIN index on specialties
+            stmt = stmt.where(Validator.specialties.contains([specialty]))
+
         result = await db.execute(stmt)
-        validators = result.scalars().all()
-        logger.debug(f"Selected {len(validators)} eligible validators.")
+        validators = [EligibleValidator(*row) for row in result.all()]
+        logger.debug("Selected eligible validators.", count=len(validators), specialty=specialty)
+
+        if cache:
+            try:
+                await cache.hset(_ELIGIBLE_VALIDATORS_CACHE_KEY, cache_field, orjson.dumps([tuple(validator) for validator in validators]))
+                await cache.expire(_ELIGIBLE_VALIDATORS_CACHE_KEY, self._eligible_cache_ttl)
+            except Exception as e:
+                logger.error(f"Error caching eligible validators: {e}")
         return validators
+
+    async def _invalidate_eligible_validators(self, cache: Optional[redis.Redis]):
+        """Drops every cached eligible-validator list; failures leave them to expire."""
+        if not cache:
+            return
+        try:
+            await cache.delete(_ELIGIBLE_VALIDATORS_CACHE_KEY)
+        except Exception as e:
+            logger.error(f"Error invalidating cached eligible validators: {e}")
@@ -1,22 +1,74 @@
-import datetime
+import asyncio
 import uuid
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set
 import structlog
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, func, exists, bindparam
+from sqlalchemy.engine import Row
+from sqlalchemy.dialects.postgresql import insert
 
-from database.models import Content, Validator, ValidationRecord, ContentDispute
+from database.database import AsyncSessionLocal, get_connected_redis_client
+from database.models import Content, Validator, ValidationRecord, ContentDispute, OPEN_VALIDATION_STATUSES
 from core.reputation_service import ReputationService
 from core.consensus_mechanism import ConsensusMechanism
+from core.content_model import ValidationVote
 from config import config
 
 logger = structlog.get_logger(__name__)
 
+# Redis pub-sub channel carrying the UUID of each newly submitted content item
+CONTENT_PENDING_CHANNEL = "content:pending"
+
+def _vote_counter_key(content_db_id: int) -> str:
+    return f"content:{content_db_id}:votes"
+
+# Hot statements are built once at import; per-call values are passed as bind parameters
+# Read-only listings go through Core: plain rows, with no identity-map bookkeeping or ORM instances
+_contents = Content.__table__
+_CONTENT_BY_STATUS_STMT = select(_contents).where(_contents.c.validation_status == bindparam("status"))
+_CONTENT_BY_UUID_STMT = select(Content).where(Content.content_id == bindparam("content_uuid"))
+# Both UUIDs of a vote are resolved in one round trip
+_VOTE_IDS_STMT = select(
+    select(Content.id).where(Content.content_id == bindparam("content_uuid")).scalar_subquery().label("content_db_id"),
+    select(Validator.id).where(Validator.validator_id == bindparam("validator_uuid")).scalar_subquery().label("validator_db_id")
+)
+_CONTENT_IDS_BY_UUIDS_STMT = select(Content.content_id, Content.id).where(
+    Content.content_id.in_(bindparam("content_uuids", expanding=True))
+)
+_VALIDATOR_IDS_BY_UUIDS_STMT = select(Validator.validator_id, Validator.id).where(
+    Validator.validator_id.in_(bindparam("validator_uuids", expanding=True))
+)
+_VOTE_COUNTS_STMT = select(ValidationRecord.content_id, func.count()).where(
+    ValidationRecord.content_id.in_(bindparam("content_ids", expanding=True))
+).group_by(ValidationRecord.content_id)
+_CLAIM_PENDING_CONTENT_STMT = (
+    select(Content)
+    .where(
+        Content.validation_status.in_(OPEN_VALIDATION_STATUSES),
+        ~exists().where(
+            ValidationRecord.content_id == Content.id,
+            ValidationRecord.validator_id == select(Validator.id).where(
+                Validator.validator_id == bindparam("validator_uuid")
+            ).scalar_subquery()
+        )
+    )
+    .order_by(Content.id)
+    .limit(bindparam("limit"))
+    .with_for_update(skip_locked=True, of=Content)
+)
+
 class ValidationService:
+    _logged = False # The init line is an app-lifetime event, logged once per process
+
     def __init__(self, reputation_service: ReputationService, consensus_mechanism: ConsensusMechanism):
         self.reputation_service = reputation_service
         self.consensus_mechanism = consensus_mechanism
-        logger.info("ValidationService initialized.")
+        self._consensus_tasks: Set[asyncio.Task] = set() # Held so pending evaluations are not garbage collected
+        self._vote_counter_ttl = config.validation_timeout_seconds # A counter outlives its content's validation window
+        if not ValidationService._logged:
+            ValidationService._logged = True
+            logger.info("ValidationService initialized.")
 
     async def submit_content_for_validation(
         self, 
@@ -24,30 +76,47 @@ class ValidationService:
         title: str, 
         text: str, 
         source_url: Optional[str] = None, 
-        author_id: Optional[str] = None
+        author_id: Optional[str] = None,
+        commit: bool = True
     ) -> Content:
-        """Submits new content to the network for validation."""
+        """
+        Submits new content to the network for validation.
+        With commit=False the content is inserted but neither committed nor announced, for callers that
+        commit a larger transaction; validator nodes then pick it up on their next sweep.
+        """
         content_id = str(uuid.uuid4())
-        new_content = Content(
+        # RETURNING hands back the id and submitted_at, so no refresh follows the commit
+        stmt = insert(Content).values(
             content_id=content_id,
             title=title,
             text=text,
             source_url=source_url,
             author_id=author_id,
             validation_status='PENDING'
-        )
-        db.add(new_content)
-        await db.commit()
-        await db.refresh(new_content)
+        ).returning(Content)
+        new_content = await db.scalar(select(Content).from_statement(stmt))
         logger.info(f"Content {content_id} submitted for validation.")
+        if commit:
+            await db.commit()
+            await self._announce_pending_content(content_id)
         return new_content
 
+    async def _announce_pending_content(self, content_id: str):
+        """Wakes validator nodes for committed content; a lost message is picked up by their periodic sweep."""
+        cache = get_connected_redis_client()
+        if not cache:
+            return
+        try:
+            await cache.publish(CONTENT_PENDING_CHANNEL, content_id)
+        except Exception as e:
+            logger.error(f"Error announcing pending content: {e}", content_id=content_id)
+
     async def assign_content_to_validators(self, db: AsyncSession, content_db_id: int):
         """
         Assigns content to a set of eligible validators for review.
         In a real system, this would involve notifying validator nodes.
         """
-        content = await db.execute(select(Content).where(Content.id == content_db_id)).scalar_one_or_none()
+        content = await db.get(Content, content_db_id) # Served from the identity map when the caller just added it
         if not content:
             logger.error(f"Content with ID {content_db_id} not found for assignment.")
             return
@@ -89,73 +158,183 @@ class ValidationService:
         comments: Optional[str] = None
     ) -> ValidationRecord:
         """Records a validator's vote on content."""
-        content = await db.execute(select(Content).where(Content.content_id == content_uuid)).scalar_one_or_none()
-        validator = await db.execute(select(Validator).where(Validator.validator_id == validator_uuid)).scalar_one_or_none()
+        ids = (await db.execute(_VOTE_IDS_STMT, {"content_uuid": content_uuid, "validator_uuid": validator_uuid})).one()
 
-        if not content:
+        if ids.content_db_id is None:
             raise ValueError(f"Content with UUID {content_uuid} not found.")
-        if not validator:
+        if ids.validator_db_id is None:
             raise ValueError(f"Validator with UUID {validator_uuid} not found.")
 
-        # Check if validator already voted for this content
-        existing_vote = await db.execute(
-            select(ValidationRecord).where(
-                ValidationRecord.content_id == content.id,
-                ValidationRecord.validator_id == validator.id
-            )
-        ).scalar_one_or_none()
-
-        if existing_vote:
-            logger.warning(f"Validator {validator_uuid} already voted for content {content_uuid}.")
-            raise ValueError("Validator has already submitted a vote for this content.")
-
         # Simulate content verification algorithms (simplified)
         # In a real system, these would be complex ML models or external APIs
         if is_plagiarized and bias_score > config.bias_detection_threshold:
             logger.warning(f"Validator {validator_uuid} flagged content {content_uuid} as plagiarized and biased.")
         
-        new_record = ValidationRecord(
-            content_id=content.id,
-            validator_id=validator.id,
+        # The unique (content_id, validator_id) constraint replaces the "already voted" SELECT,
+        # and RETURNING hands back the stored row, server defaults included, without a refresh
+        stmt = insert(ValidationRecord).values(
+            content_id=ids.content_db_id,
+            validator_id=ids.validator_db_id,
             is_accurate=is_accurate,
             is_plagiarized=is_plagiarized,
             bias_score=bias_score,
             comments=comments
-        )
-        db.add(new_record)
+        ).on_conflict_do_nothing(index_elements=["content_id", "validator_id"]).returning(ValidationRecord)
+        new_record = await db.scalar(select(ValidationRecord).from_statement(stmt))
+
+        if new_record is None:
+            logger.warning(f"Validator {validator_uuid} already voted for content {content_uuid}.")
+            raise ValueError("Validator has already submitted a vote for this content.")
+
         await db.commit()
-        await db.refresh(new_record)
-        
+        current_votes_count = (await self._count_committed_votes(db, {ids.content_db_id: 1}))[ids.content_db_id]
+
         logger.info(f"Vote submitted for content {content_uuid} by validator {validator_uuid}.")
         
         # Check if enough votes are in to trigger consensus evaluation
-        num_votes = await db.execute(
-            select(func.count(ValidationRecord.id)).where(ValidationRecord.content_id == content.id)
-        )
-        current_votes_count = num_votes.scalar_one()
-
         if current_votes_count >= config.min_validators_per_content:
             logger.info(f"Enough votes for content {content_uuid}, triggering consensus evaluation.")
-            await self.evaluate_content_and_update_status(db, content.id)
+            self._schedule_consensus(ids.content_db_id)
         
         return new_record
 
+    async def submit_validation_votes_bulk(self, db: AsyncSession, votes: List[ValidationVote]) -> List[ValidationRecord]:
+        """
+        Records a batch of votes in one INSERT and one commit.
+        Votes for unknown content or validators, and repeat votes, are skipped rather than raised.
+        """
+        if not votes:
+            return []
+
+        content_ids = dict((await db.execute(
+            _CONTENT_IDS_BY_UUIDS_STMT, {"content_uuids": list({vote.content_id for vote in votes})}
+        )).all())
+        validator_ids = dict((await db.execute(
+            _VALIDATOR_IDS_BY_UUIDS_STMT, {"validator_uuids": list({vote.validator_id for vote in votes})}
+        )).all())
+
+        rows = []
+        for vote in votes:
+            if vote.content_id not in content_ids or vote.validator_id not in validator_ids:
+                logger.warning(f"Skipping vote by validator {vote.validator_id} for unknown content {vote.content_id} or validator.")
+                continue
+            if vote.is_plagiarized and vote.bias_score > config.bias_detection_threshold:
+                logger.warning(f"Validator {vote.validator_id} flagged content {vote.content_id} as plagiarized and biased.")
+            rows.append(dict(
+                content_id=content_ids[vote.content_id],
+                validator_id=validator_ids[vote.validator_id],
+                is_accurate=vote.is_accurate,
+                is_plagiarized=vote.is_plagiarized,
+                bias_score=vote.bias_score,
+                comments=vote.comments
+            ))
+        if not rows:
+            return []
+
+        stmt = insert(ValidationRecord).values(rows).on_conflict_do_nothing(
+            index_elements=["content_id", "validator_id"]
+        ).returning(ValidationRecord)
+        new_records = (await db.scalars(select(ValidationRecord).from_statement(stmt))).all()
+
+        await db.commit()
+        vote_counts = await self._count_committed_votes(db, Counter(record.content_id for record in new_records))
+
+        logger.info(f"{len(new_records)} of {len(votes)} votes submitted in bulk.")
+
+        # Check which content now has enough votes to trigger consensus evaluation
+        for content_db_id, current_votes_count in vote_counts.items():
+            if current_votes_count >= config.min_validators_per_content:
+                logger.info(f"Enough votes for content ID {content_db_id}, triggering consensus evaluation.")
+                self._schedule_consensus(content_db_id)
+
+        return new_records
+
+    async def _count_committed_votes(self, db: AsyncSession, new_votes: Dict[int, int]) -> Dict[int, int]:
+        """
+        Adds committed votes to the per-content Redis counters and returns each content item's vote total.
+        Totals for counters Redis did not already hold (expired, or Redis unavailable) are counted in the database.
+        """
+        if not new_votes:
+            return {}
+
+        vote_counts = {}
+        created = {} # Counters this call created, with the total they held right after the increment
+        cache = get_connected_redis_client()
+        if cache:
+            try:
+                async with cache.pipeline(transaction=True) as pipe:
+                    for content_db_id, count in new_votes.items():
+                        key = _vote_counter_key(content_db_id)
+                        pipe.exists(key)
+                        pipe.hincrby(key, "total", count)
+                        pipe.expire(key, self._vote_counter_ttl)
+                    results = await pipe.execute()
+                for content_db_id, existed, total in zip(new_votes, results[0::3], results[1::3]):
+                    if existed:
+                        vote_counts[content_db_id] = total
+                    else:
+                        created[content_db_id] = total
+            except Exception as e:
+                logger.error(f"Error updating vote counters: {e}")
+
+        missing = [content_db_id for content_db_id in new_votes if content_db_id not in vote_counts]
+        if missing:
+            counted = dict((await db.execute(_VOTE_COUNTS_STMT, {"content_ids": missing})).all())
+            vote_counts.update(counted)
+            if created:
+                # Bring the new counters up to the committed totals by increment, never by overwrite, so votes
+                # other requests added since the counter was created are kept; at worst a vote counts twice,
+                # which only schedules an evaluation early: consensus recounts the committed votes and defers
+                try:
+                    async with cache.pipeline(transaction=False) as pipe:
+                        for content_db_id, total in created.items():
+                            pipe.hincrby(_vote_counter_key(content_db_id), "total", counted.get(content_db_id, 0) - total)
+                            pipe.expire(_vote_counter_key(content_db_id), self._vote_counter_ttl)
+                        results = await pipe.execute()
+                    vote_counts.update(zip(created, results[0::2]))
+                except Exception as e:
+                    logger.error(f"Error seeding vote counters: {e}")
+        return vote_counts
+
+    def _schedule_consensus(self, content_db_id: int):
+        """Runs consensus evaluation in the background so the vote is returned without waiting for it."""
+        task = asyncio.create_task(self._evaluate_in_new_session(content_db_id))
+        self._consensus_tasks.add(task)
+        task.add_done_callback(self._consensus_tasks.discard)
+
+    async def _evaluate_in_new_session(self, content_db_id: int):
+        # The caller's session belongs to its request, so the evaluation opens its own
+        try:
+            async with AsyncSessionLocal() as session:
+                await self.evaluate_content_and_update_status(session, content_db_id)
+        except Exception as e:
+            logger.error(f"Error evaluating consensus for content ID {content_db_id}: {e}")
+
+    async def wait_for_consensus(self):
+        """Waits for every scheduled consensus evaluation to finish, e.g. on shutdown."""
+        if self._consensus_tasks:
+            await asyncio.gather(*self._consensus_tasks, return_exceptions=True)
+
     async def evaluate_content_and_update_status(self, db: AsyncSession, content_db_id: int):
         """Evaluates consensus and updates content status."""
-        content = await db.execute(select(Content).where(Content.id == content_db_id)).scalar_one_or_none()
+        content = await db.get(Content, content_db_id)
         if not content:
             logger.error(f"Content with ID {content_db_id} not found for evaluation.")
             return
 
-        is_approved, consensus_score = await self.consensus_mechanism.evaluate_content_consensus(db, content_db_id)
+        outcome = await self.consensus_mechanism.evaluate_content_consensus(db, content_db_id)
+        if outcome is None:
+            # The vote counter ran ahead of the committed votes; a later vote triggers the evaluation again
+            logger.info(f"Consensus deferred for content ID {content_db_id}; status left at {content.validation_status}.")
+            return
+        is_approved, consensus_score = outcome
 
         content.approved_by_consensus = is_approved
         content.consensus_score = consensus_score
         content.validation_status = 'APPROVED' if is_approved else 'REJECTED'
-        content.validated_at = datetime.datetime.now(datetime.timezone.utc)
+        content.validated_at = func.now() # Stamped by the database; nothing reads it back here, so there is no refresh
         
         await db.commit()
-        await db.refresh(content)
         logger.info(f"Content {content.content_id} final status: {content.validation_status} (Score: {consensus_score:.2f}%)")
 
     async def submit_content_dispute(
@@ -166,21 +345,19 @@ class ValidationService:
         reason: str
     ) -> ContentDispute:
         """Allows a user or validator to dispute content validation."""
-        content = await db.execute(select(Content).where(Content.content_id == content_uuid)).scalar_one_or_none()
+        content = await db.scalar(_CONTENT_BY_UUID_STMT, {"content_uuid": content_uuid})
         if not content:
             raise ValueError(f"Content with UUID {content_uuid} not found for dispute.")
 
-        new_dispute = ContentDispute(
+        stmt = insert(ContentDispute).values(
             content_id=content.id,
             disputer_id=disputer_id,
             reason=reason,
             status='OPEN'
-        )
-        db.add(new_dispute)
-        await db.commit()
-        await db.refresh(new_dispute)
+        ).returning(ContentDispute)
+        new_dispute = await db.scalar(select(ContentDispute).from_statement(stmt))
         
-        # Update content status to disputed
+        # Update content status to disputed, committed with the dispute
         content.validation_status = 'DISPUTED'
         await db.commit()
         
@@ -195,27 +372,35 @@ class ValidationService:
         resolved_by: str
     ) -> Optional[ContentDispute]:
         """Resolves a content dispute."""
-        dispute = await db.execute(select(ContentDispute).where(ContentDispute.id == dispute_id)).scalar_one_or_none()
+        # One UPDATE ... RETURNING replaces the lookup before and the refresh after the write
+        stmt = update(ContentDispute).where(ContentDispute.id == dispute_id).values(
+            status=new_status,
+            resolved_by=resolved_by,
+            resolved_at=func.now() # Stamped by the database
+        ).returning(ContentDispute)
+        dispute = await db.scalar(
+            select(ContentDispute).from_statement(stmt).execution_options(populate_existing=True)
+        )
         if not dispute:
             raise ValueError(f"Dispute with ID {dispute_id} not found.")
-
-        dispute.status = new_status
-        dispute.resolved_by = resolved_by
-        dispute.resolved_at = datetime.datetime.now(datetime.timezone.utc)
         await db.commit()
-        await db.refresh(dispute)
         
         logger.info(f"Dispute {dispute_id} resolved to {new_status} by {resolved_by}.")
         return dispute
 
-    async def get_content_by_status(self, db: AsyncSession, status: str) -> List[Content]:
-        """Retrieves content by its validation status."""
-        stmt = select(Content).where(Content.validation_status == status)
-        result = await db.execute(stmt)
-        return result.scalars().all()
+    async def get_content_by_status(self, db: AsyncSession, status: str) -> List[Row]:
+        """Retrieves content by its validation status as read-only rows with the Content columns."""
+        result = await db.execute(_CONTENT_BY_STATUS_STMT, {"status": status})
+        return result.all()
+
+    async def claim_pending_content(self, db: AsyncSession, validator_uuid: str, limit: int) -> List[Content]:
+        """
+        Claims up to limit pending content items the validator has not voted on yet.
+        The rows stay locked until the caller's transaction ends; rows locked by other
+        validators are skipped rather than waited on.
+        """
+        return (await db.scalars(_CLAIM_PENDING_CONTENT_STMT, {"validator_uuid": validator_uuid, "limit": limit})).all()
 
     async def get_content_details(self, db: AsyncSession, content_uuid: str) -> Optional[Content]:
         """Retrieves full details of a content item."""
-        stmt = select(Content).where(Content.content_id == content_uuid)
-        result = await db.execute(stmt)
-        return result.scalar_one_or_none()
+        return await db.scalar(_CONTENT_BY_UUID_STMT, {"content_uuid": content_uuid})
@@ -1,29 +1,68 @@
 import asyncio
 import httpx
 import structlog
-import datetime
 import random
+from typing import List, Optional
+import redis.asyncio as redis
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.database import get_db
+from database.database import AsyncSessionLocal, get_connected_redis_client, init_redis, close_redis
+from database.models import Content, OPEN_VALIDATION_STATUSES
 from core.reputation_service import ReputationService
-from core.validation_service import ValidationService
+from core.validation_service import ValidationService, CONTENT_PENDING_CHANNEL
 from core.consensus_mechanism import ConsensusMechanism
 from core.content_model import ValidationVote
 from config import config
+from logging_setup import configure_logging
 
 logger = structlog.get_logger(__name__)
 
+# Sweep delay bounds: back-to-back sweeps while content keeps turning up, backing off while idle
+_MIN_SWEEP_DELAY_SECONDS = 0.1
+_MAX_ERROR_DELAY_SECONDS = 30.0
+
+# One pooled HTTP/2 client per process, shared by every ValidatorNode in it; created on first use
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide client for calls to the validation API."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True, # Requests are multiplexed over one kept-alive connection
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=60),
+            timeout=httpx.Timeout(10.0, connect=2.0)
+        )
+    return _http_client
+
+async def close_http_client():
+    """Closes the shared HTTP client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+def _next_sweep_delay(delay: float, found_work: bool) -> float:
+    """Halves the delay after a productive pass; grows it with jitter, up to the sweep interval, after an idle one."""
+    if found_work:
+        return max(_MIN_SWEEP_DELAY_SECONDS, delay * 0.5)
+    return min(config.validator_sweep_interval_seconds, delay * 1.5 + random.random())
+
 class ValidatorNode:
     def __init__(self, validator_id: str, api_url: str):
         self.validator_id = validator_id
         self.api_url = api_url # URL of the main validation API
-        self.http_client = httpx.AsyncClient()
         self.is_running = False
         self.reputation_service: ReputationService = None
         self.validation_service: ValidationService = None
         self.consensus_mechanism: ConsensusMechanism = None
         logger.info(f"ValidatorNode {self.validator_id} initialized.")
 
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return get_http_client()
+
     async def initialize_services(self):
         """Initializes internal services for the validator node."""
         # These services would typically be injected or initialized once at startup
@@ -37,12 +76,12 @@ class ValidatorNode:
 
     async def register_self(self):
         """Registers this validator node with the main API."""
-        async for db_session in get_db():
+        async with AsyncSessionLocal() as db_session:
             try:
                 # Check if already registered
-                existing_validator = await db_session.execute(
+                existing_validator = await db_session.scalar(
                     select(Validator).where(Validator.validator_id == self.validator_id)
-                ).scalar_one_or_none()
+                )
 
                 if not existing_validator:
                     await self.reputation_service.register_validator(
@@ -55,7 +94,7 @@ class ValidatorNode:
                     logger.info(f"Validator {self.validator_id} registered successfully.")
                 else:
                     logger.info(f"Validator {self.validator_id} already registered. Updating last seen.")
-                    existing_validator.last_seen = datetime.datetime.now(datetime.timezone.utc)
+                    existing_validator.last_seen = func.now()
                     await db_session.commit()
 
             except Exception as e:
@@ -65,91 +104,142 @@ class ValidatorNode:
     async def start_monitoring_loop(self):
         """
         Starts the main loop for the validator node to fetch and validate content.
-        In a real system, this would be event-driven (e.g., message queue).
+        The node wakes on content:pending notifications and sweeps pending content in between;
+        sweeps come quickly while they keep finding work and back off to
+        validator_sweep_interval_seconds while idle.
         """
         self.is_running = True
         logger.info(f"ValidatorNode {self.validator_id} starting monitoring loop.")
-        while self.is_running:
-            try:
-                async for db_session in get_db():
-                    # Fetch content awaiting validation
-                    # In a distributed system, this would be a pull from a queue
-                    # or an API endpoint for content assigned to this validator.
-                    pending_content = await self.validation_service.get_content_by_status(db_session, 'PENDING')
-                    
-                    if not pending_content:
-                        pending_content = await self.validation_service.get_content_by_status(db_session, 'PENDING_VALIDATORS')
-
-                    if pending_content:
-                        # For simplicity, pick one content to process
-                        content_to_validate = random.choice(pending_content)
-                        logger.info(f"Validator {self.validator_id} picked content {content_to_validate.content_id} for validation.")
-                        
-                        # Simulate validation process
-                        await self._perform_validation(db_session, content_to_validate)
-                        
-                        # Assign more validators if needed (this would be done by a central orchestrator)
-                        # await self.validation_service.assign_content_to_validators(db_session, content_to_validate.id)
-                    else:
-                        logger.debug(f"Validator {self.validator_id} found no pending content. Waiting...")
-                
-                await asyncio.sleep(10) # Poll every 10 seconds
-            except asyncio.CancelledError:
-                logger.info(f"ValidatorNode {self.validator_id} monitoring loop cancelled.")
-                break
-            except Exception as e:
-                logger.error(f"Error in validator node loop for {self.validator_id}: {e}")
-                await asyncio.sleep(30) # Wait longer on error
-
-    async def _perform_validation(self, db: AsyncSession, content: Content):
-        """Simulates the validation process and submits a vote."""
-        logger.info(f"Performing validation for content {content.content_id}...")
-        
-        # Simulate fact-checking, plagiarism, bias detection
-        # These are highly simplified placeholders.
-        is_accurate = random.choice([True, True, False]) # More likely to be accurate
-        is_plagiarized = random.random() < 0.05 # 5% chance of plagiarism
-        bias_score = random.uniform(0.0, 0.9) # Random bias score
-
-        # Adjust accuracy based on simulated checks
-        if is_plagiarized or bias_score > config.bias_detection_threshold:
-            is_accurate = False # If plagiarized or highly biased, mark as inaccurate
-
-        comments = "Content reviewed by automated validator."
-        if not is_accurate:
-            comments += " Found potential issues."
-        
-        vote_data = ValidationVote(
-            content_id=content.content_id,
-            validator_id=self.validator_id,
-            is_accurate=is_accurate,
-            is_plagiarized=is_plagiarized,
-            bias_score=bias_score,
-            comments=comments
-        )
+        pubsub = await self._subscribe()
+        content_uuid = None # The first pass is a sweep
+        sweep_delay = _MIN_SWEEP_DELAY_SECONDS
+        error_delay = 1.0
+        try:
+            while self.is_running:
+                try:
+                    # The session is closed, and its connection back in the pool, before the node waits
+                    async with AsyncSessionLocal() as db_session:
+                        contents_to_validate = await self._next_contents(db_session, content_uuid)
+
+                        if contents_to_validate:
+                            logger.info(f"Validator {self.validator_id} picked {len(contents_to_validate)} content items for validation.")
+                            
+                            # Simulate validation process
+                            await self._perform_validation(db_session, contents_to_validate)
+                            
+                            # Assign more validators if needed (this would be done by a central orchestrator)
+                            # await self.validation_service.assign_content_to_validators(db_session, content_to_validate.id)
+                        else:
+                            logger.debug(f"Validator {self.validator_id} found no pending content. Waiting...")
+
+                    sweep_delay = _next_sweep_delay(sweep_delay, bool(contents_to_validate))
+                    error_delay = 1.0
+                    content_uuid = await self._wait_for_content(pubsub, sweep_delay)
+                except asyncio.CancelledError:
+                    logger.info(f"ValidatorNode {self.validator_id} monitoring loop cancelled.")
+                    break
+                except Exception as e:
+                    logger.error(f"Error in validator node loop for {self.validator_id}: {e}")
+                    content_uuid = None
+                    await asyncio.sleep(error_delay + random.random()) # Jittered exponential backoff on errors
+                    error_delay = min(_MAX_ERROR_DELAY_SECONDS, error_delay * 2)
+        finally:
+            if pubsub:
+                await pubsub.reset()
 
+    async def _subscribe(self) -> Optional[redis.client.PubSub]:
+        """Subscribes to pending-content notifications; without Redis the node relies on the sweep alone."""
+        cache = get_connected_redis_client()
+        if not cache:
+            return None
         try:
-            # Submit vote to the main API (or directly to ValidationService if co-located)
+            pubsub = cache.pubsub()
+            await pubsub.subscribe(CONTENT_PENDING_CHANNEL)
+            return pubsub
+        except Exception as e:
+            logger.error(f"Failed to subscribe to pending content for {self.validator_id}: {e}")
+            return None
+
+    async def _wait_for_content(self, pubsub: Optional[redis.client.PubSub], timeout: float) -> Optional[str]:
+        """Waits up to timeout for the next notified content UUID; returns None when it is time to sweep."""
+        if not pubsub:
+            await asyncio.sleep(timeout)
+            return None
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message["data"] if message else None
+
+    async def _next_contents(self, db: AsyncSession, content_uuid: Optional[str]) -> List[Content]:
+        """Loads the notified content by UUID, or claims a batch of pending content when there is no notification."""
+        if content_uuid:
+            content = await self.validation_service.get_content_details(db, content_uuid)
+            return [content] if content and content.validation_status in OPEN_VALIDATION_STATUSES else []
+
+        # Sweep: claim content awaiting this validator's vote; concurrent nodes skip each other's locked rows
+        return await self.validation_service.claim_pending_content(db, self.validator_id, config.validator_batch_size)
+
+    def _simulate_votes(self, contents: List[Content]) -> List[ValidationVote]:
+        """Simulates fact-checking, plagiarism and bias detection for a batch of content in one pass."""
+        # These are highly simplified placeholders; the draws for the whole batch are made up front
+        count = len(contents)
+        accuracy_draws = random.choices([True, True, False], k=count) # More likely to be accurate
+        plagiarism_draws = [random.random() < 0.05 for _ in range(count)] # 5% chance of plagiarism
+        bias_draws = [random.uniform(0.0, 0.9) for _ in range(count)] # Random bias score
+        bias_threshold = config.bias_detection_threshold
+
+        votes = []
+        for content, is_accurate, is_plagiarized, bias_score in zip(contents, accuracy_draws, plagiarism_draws, bias_draws):
+            # Adjust accuracy based on simulated checks
+            if is_plagiarized or bias_score > bias_threshold:
+                is_accurate = False # If plagiarized or highly biased, mark as inaccurate
+
+            comments = "Content reviewed by automated validator."
+            if not is_accurate:
+                comments += " Found potential issues."
+            votes.append(ValidationVote(
+                content_id=content.content_id,
+                validator_id=self.validator_id,
+                is_accurate=is_accurate,
+                is_plagiarized=is_plagiarized,
+                bias_score=bias_score,
+                comments=comments
+            ))
+        return votes
+
+    async def _perform_validation(self, db: AsyncSession, contents: List[Content]):
+        """Simulates the validation process and submits the batch's votes together."""
+        votes = self._simulate_votes(contents)
+        try:
+            # Submit votes to the main API (or directly to ValidationService if co-located)
             # If running as a separate process, this would be an HTTP POST to /api/v1/validation/vote
-            # For this integrated example, we call the service directly.
-            await self.validation_service.submit_validation_vote(
-                db,
-                content_uuid=vote_data.content_id,
-                validator_uuid=vote_data.validator_id,
-                is_accurate=vote_data.is_accurate,
-                is_plagiarized=vote_data.is_plagiarized,
-                bias_score=vote_data.bias_score,
-                comments=vote_data.comments
-            )
-            logger.info(f"Validator {self.validator_id} submitted vote for content {content.content_id}.")
+            # For this integrated example, we call the service directly, one INSERT for the whole batch.
+            records = await self.validation_service.submit_validation_votes_bulk(db, votes)
+            logger.info(f"Validator {self.validator_id} submitted {len(records)} votes.")
         except Exception as e:
-            logger.error(f"Validator {self.validator_id} failed to submit vote for content {content.content_id}: {e}")
+            logger.error(f"Validator {self.validator_id} failed to submit {len(votes)} votes: {e}")
 
     async def stop(self):
         """Stops the validator node's monitoring loop."""
         self.is_running = False
-        if self.http_client:
-            await self.http_client.aclose()
+        if self.validation_service:
+            await self.validation_service.wait_for_consensus()
         logger.info(f"ValidatorNode {self.validator_id} stopped.")
 
 from database.models import Validator # Import here to avoid circular dependency
+
+async def main():
+    """Runs this process's validator node until it is interrupted."""
+    configure_logging()
+
+    await init_redis()
+    node = ValidatorNode(validator_id=config.validator_node_id, api_url=config.validator_node_api_url)
+    try:
+        await node.initialize_services()
+        await node.register_self()
+        await node.start_monitoring_loop()
+    finally:
+        await node.stop()
+        await close_http_client()
+        await close_redis()
+
+if __name__ == "__main__":
+    asyncio.run(main())
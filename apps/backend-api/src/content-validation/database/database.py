@@ -1,5 +1,7 @@
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from typing import Optional
 import redis.asyncio as redis
 import structlog
 
@@ -8,13 +10,31 @@ from database.models import Base
 
 logger = structlog.get_logger(__name__)
 
+def _engine_options(database_url: str) -> dict:
+    """Pool settings for server databases; SQLite (used in tests) keeps SQLAlchemy's default pool."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    options = dict(
+        pool_size=config.database_pool_size,
+        max_overflow=config.database_max_overflow,
+        pool_timeout=30,
+        pool_recycle=config.database_pool_recycle_seconds,
+        pool_pre_ping=True
+    )
+    if url.get_driver_name() == "asyncpg":
+        # Reuse server-side prepared statements for the fixed set of hot queries
+        options["connect_args"] = {"statement_cache_size": 1024, "prepared_statement_cache_size": 512}
+    return options
+
 # Database setup
-engine = create_async_engine(config.database_url, echo=False)
+engine = create_async_engine(config.database_url, echo=False, **_engine_options(config.database_url))
 AsyncSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine,
-    class_=AsyncSession
+    class_=AsyncSession,
+    expire_on_commit=False # Committed instances keep their loaded values instead of reloading on next access
 )
 
 # Redis client
@@ -26,6 +46,8 @@ async def init_db():
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created/verified.")
 
+# FastAPI runs plain `def` dependencies in its threadpool; keep request dependencies, and anything
+# that receives an AsyncSession, `async def` so they run directly on the event loop
 async def get_db():
     """Dependency to get an async database session."""
     async with AsyncSessionLocal() as session:
@@ -59,6 +81,10 @@ async def get_redis_client() -> redis.Redis:
         raise ConnectionError("Redis client not initialized or connected.")
     return redis_client
 
+def get_connected_redis_client() -> Optional[redis.Redis]:
+    """Returns the Redis client if it connected at startup, without attempting to reconnect."""
+    return redis_client
+
 async def close_redis():
     """Closes the Redis client connection."""
     if redis_client:
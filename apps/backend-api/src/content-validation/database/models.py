@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, JSON, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.dialects.postgresql import JSONB
 import datetime
 
 Base = declarative_base()
 
+# Content statuses that still accept validator votes
+OPEN_VALIDATION_STATUSES = ('PENDING', 'PENDING_VALIDATORS', 'IN_REVIEW')
+
 class Content(Base):
     __tablename__ = 'contents'
     
@@ -25,6 +28,11 @@ class Content(Base):
 
     validation_records = relationship("ValidationRecord", back_populates="content")
 
+    __table_args__ = (
+        # Partial index over the open statuses polled by validator nodes; settled content stays out of it
+        Index('ix_content_status_open', validation_status, postgresql_where=validation_status.in_(OPEN_VALIDATION_STATUSES)),
+    )
+
 class Validator(Base):
     __tablename__ = 'validators'
     
@@ -38,12 +46,26 @@ class Validator(Base):
     
     # For conflict of interest (simplified)
     organization = Column(String)
-    specialties = Column(JSON) # e.g., ["finance", "politics"]
+    # JSONB for the GIN-indexed containment filter; plain JSON where PostgreSQL is not used (e.g. SQLite tests)
+    specialties = Column(JSONB().with_variant(JSON(), "sqlite")) # e.g., ["finance", "politics"]
 
     validation_records = relationship("ValidationRecord", back_populates="validator")
 
+    __table_args__ = (
+        # Serves validator selection (active, ordered by reputation) as an index scan
+        Index('ix_validator_active_rep', reputation_score.desc(), postgresql_where=(is_active == True)),
+        # Serves specialty filters (specialties @> '["finance"]') without scanning every validator
+        Index('ix_validator_specialties', specialties, postgresql_using='gin', postgresql_ops={'specialties': 'jsonb_path_ops'}),
+    )
+
 class ValidationRecord(Base):
     __tablename__ = 'validation_records'
+    __table_args__ = (
+        # Covers the per-content vote lookup and tally in consensus evaluation
+        Index('ix_valrec_content_accurate', 'content_id', 'is_accurate'),
+        # One vote per validator per content, enforced by the database on insert
+        UniqueConstraint('content_id', 'validator_id', name='uq_valrec_content_validator'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     content_id = Column(Integer, ForeignKey('contents.id'), nullable=False)
@@ -0,0 +1,16 @@
+import orjson
+import structlog
+
+def configure_logging():
+    """Configures structlog for JSON lines; called once per process by each entry point."""
+    structlog.configure(
+        processors=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.JSONRenderer(serializer=lambda event_dict, **kw: orjson.dumps(event_dict, **kw).decode()) # orjson serializes each line
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
@@ -1,14 +1,21 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from prometheus_client import make_asgi_app, Counter, Gauge, Histogram
 import uvicorn
 import structlog
 import asyncio
 import time
+from functools import lru_cache
+from typing import Optional
 
 from config import config
+from logging_setup import configure_logging
 from database.database import init_db, init_redis, close_redis
 from api.validation_api import router as validation_router
-from core.validator_node import ValidatorNode
+from core.validator_node import ValidatorNode, close_http_client
+from core.reputation_service import ReputationService
+from core.consensus_mechanism import ConsensusMechanism
+from core.validation_service import ValidationService
 
 logger = structlog.get_logger(__name__)
 
@@ -17,7 +24,8 @@ app = FastAPI(
     description="A distributed network for content validation using consensus and reputation scoring.",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Prometheus metrics setup
@@ -34,56 +42,65 @@ if config.enable_metrics:
         'api_response_time_seconds', 'API response time in seconds', ['method', 'endpoint']
     )
 
+    # Label children are resolved once per label combination instead of on every request
+    @lru_cache(maxsize=1024)
+    def _requests_child(method: str, endpoint: str, status_code: int) -> Counter:
+        return API_REQUESTS_TOTAL.labels(method=method, endpoint=endpoint, status_code=status_code)
+
+    @lru_cache(maxsize=1024)
+    def _response_time_child(method: str, endpoint: str) -> Histogram:
+        return API_RESPONSE_TIME_SECONDS.labels(method=method, endpoint=endpoint)
+
+    # Probes and scrapes are not API traffic
+    _UNMETERED_PATHS = ("/metrics", "/health")
+
     @app.middleware("http")
     async def add_process_time_header(request, call_next):
-        start_time = time.time()
+        path = request.url.path
+        if path.startswith(_UNMETERED_PATHS):
+            return await call_next(request)
+
+        start_time = time.perf_counter()
         response = await call_next(request)
-        process_time = time.time() - start_time
+        process_time = time.perf_counter() - start_time
         
-        API_REQUESTS_TOTAL.labels(
-            method=request.method, endpoint=request.url.path, status_code=response.status_code
-        ).inc()
-        API_RESPONSE_TIME_SECONDS.labels(
-            method=request.method, endpoint=request.url.path
-        ).observe(process_time)
+        _requests_child(request.method, path, response.status_code).inc()
+        _response_time_child(request.method, path).observe(process_time)
         
         return response
 
 # Include API router
 app.include_router(validation_router, prefix="/api")
 
-# Validator Node instance (running within this same process for demonstration)
+# Validator Node instance, only when embedded in this process; it normally runs as `python -m core.validator_node`
+# so that it is not duplicated in every API worker
 validator_node: Optional[ValidatorNode] = None
 validator_node_task: Optional[asyncio.Task] = None
 
 @app.on_event("startup")
 async def startup_event():
     """Actions to perform on application startup."""
-    structlog.configure(
-        processors=[
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer()
-        ],
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
+    configure_logging()
     logger.info("Application startup initiated.")
     
     await init_db()
     await init_redis()
 
-    # Initialize and start the validator node
-    global validator_node, validator_node_task
-    validator_node = ValidatorNode(
-        validator_id=config.validator_node_id,
-        api_url=config.validator_node_api_url
-    )
-    await validator_node.initialize_services()
-    await validator_node.register_self() # Register this node
-    validator_node_task = asyncio.create_task(validator_node.start_monitoring_loop())
+    # Services are stateless, so one instance of each serves every request
+    app.state.reputation_service = ReputationService()
+    app.state.consensus_mechanism = ConsensusMechanism(app.state.reputation_service)
+    app.state.validation_service = ValidationService(app.state.reputation_service, app.state.consensus_mechanism)
+
+    if config.embedded_validator_node:
+        # Initialize and start the validator node
+        global validator_node, validator_node_task
+        validator_node = ValidatorNode(
+            validator_id=config.validator_node_id,
+            api_url=config.validator_node_api_url
+        )
+        await validator_node.initialize_services()
+        await validator_node.register_self() # Register this node
+        validator_node_task = asyncio.create_task(validator_node.start_monitoring_loop())
     
     logger.info("Application startup complete.")
 
@@ -99,6 +116,8 @@ async def shutdown_event():
             logger.info("Validator node task cancelled.")
     if validator_node:
         await validator_node.stop()
+        await close_http_client()
+    await app.state.validation_service.wait_for_consensus() # Let in-flight evaluations commit
     await close_redis()
     logger.info("Application shutdown complete.")
 
@@ -110,9 +129,13 @@ async def health_check():
     return {"status": "healthy", "message": "Content Validation System is running."}
 
 if __name__ == "__main__":
+    # Workers need the app as an import string; each one runs its own uvloop event loop
     uvicorn.run(
-        app, 
-        host=config.api_host, 
-        port=config.api_port, 
+        "main:app",
+        host=config.api_host,
+        port=config.api_port,
+        loop="uvloop",
+        http="httptools",
+        workers=config.api_workers,
         log_level=config.log_level.lower()
     )
@@ -5,31 +5,51 @@ import datetime
 import random
 import uuid
 import structlog
+from sqlalchemy import select
 
 # Add the parent directory to the sys.path to allow imports from config and database
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database.database import get_db, init_db, init_redis, close_redis, get_redis_client
+from database.database import AsyncSessionLocal, get_db, init_db, init_redis, close_redis, get_redis_client
+from database.models import Validator
 from core.reputation_service import ReputationService
 from core.consensus_mechanism import ConsensusMechanism
 from core.validation_service import ValidationService
+from core.content_model import ValidationVote
 from config import config
+from logging_setup import configure_logging
 
 logger = structlog.get_logger(__name__)
 
+# Content items generated concurrently, each in its own session
+CONTENT_CONCURRENCY = 16
+
+# Vote comments, indexed by inaccurate | plagiarized << 1 | high bias << 2
+_VOTE_COMMENTS = tuple(
+    ("Automated vote: Detected potential inaccuracies." if key & 1 else "Automated vote.")
+    + (" Possible plagiarism detected." if key & 2 else "")
+    + (" High bias score." if key & 4 else "")
+    for key in range(8)
+)
+
 async def generate_validators(reputation_service: ReputationService, db_session, num_validators: int = 5):
     logger.info(f"Generating {num_validators} sample validators...")
     organizations = ["Independent Analysts", "Blockchain Research", "Media Watchdog", "AI Insights Inc."]
     specialties = [["finance"], ["politics"], ["tech"], ["health"], ["finance", "tech"]]
 
-    for i in range(num_validators):
-        validator_id = f"validator_{uuid.uuid4().hex[:8]}"
-        name = f"Validator Node {i+1}"
-        org = random.choice(organizations)
-        spec = random.choice(specialties)
-        
-        await reputation_service.register_validator(db_session, validator_id, name, org, spec)
+    validators = [
+        {
+            "validator_id": f"validator_{uuid.uuid4().hex[:8]}",
+            "name": f"Validator Node {i+1}",
+            "organization": random.choice(organizations),
+            "specialties": random.choice(specialties)
+        }
+        for i in range(num_validators)
+    ]
+    # One INSERT for the whole batch, committed in one transaction
+    await reputation_service.register_validators_bulk(db_session, validators, commit=False)
     await db_session.commit()
+    await reputation_service.invalidate_cached_reputations()
     logger.info(f"Finished generating {num_validators} sample validators.")
 
 async def generate_content_and_votes(validation_service: ValidationService, db_session, num_content: int = 10):
@@ -50,71 +70,63 @@ async def generate_content_and_votes(validation_service: ValidationService, db_s
         "Recent discoveries in gene editing and personalized medicine promise a new era of healthcare..."
     ]
     
-    # Get all registered validators
-    validators = await db_session.execute(select(Validator)).scalars().all()
-    if not validators:
+    # Get all registered validators; their UUIDs are all the votes need
+    validator_ids = (await db_session.scalars(select(Validator.validator_id))).all()
+    if not validator_ids:
         logger.warning("No validators found. Please run generate_validators first.")
         return
 
-    for i in range(num_content):
-        title = random.choice(sample_titles)
-        text = random.choice(sample_texts)
-        source_url = f"http://example.com/article/{uuid.uuid4().hex[:10]}"
-        author_id = random.choice(authors)
-
-        content = await validation_service.submit_content_for_validation(
-            db_session, title, text, source_url, author_id
-        )
-        
-        # Assign to validators (this is done by submit_content_for_validation now)
-        # await validation_service.assign_content_to_validators(db_session, content.id)
-        
-        # Simulate votes from a subset of validators
-        num_votes_to_simulate = random.randint(config.min_validators_per_content, len(validators))
-        selected_validators = random.sample(validators, num_votes_to_simulate)
-
-        for validator in selected_validators:
-            is_accurate = random.choice([True, True, True, False]) # 75% chance of accurate vote
-            is_plagiarized = random.random() < 0.02 # Low chance
-            bias_score = random.uniform(0.0, 0.5) # Mostly low bias
-            comments = "Automated vote."
-
-            if not is_accurate:
-                comments = "Automated vote: Detected potential inaccuracies."
-            if is_plagiarized:
-                comments += " Possible plagiarism detected."
-            if bias_score > 0.7:
-                comments += " High bias score."
-
-            try:
-                await validation_service.submit_validation_vote(
-                    db_session,
-                    content_uuid=content.content_id,
-                    validator_uuid=validator.validator_id,
+    # The inserts are I/O-bound, so content items overlap their round trips; sessions are not
+    # safe for concurrent use, so each item gets its own and commits it when done
+    semaphore = asyncio.Semaphore(CONTENT_CONCURRENCY)
+    min_votes, validator_count = config.min_validators_per_content, len(validator_ids) # Read once, not per item
+
+    async def generate_one():
+        async with semaphore, AsyncSessionLocal() as session:
+            title = random.choice(sample_titles)
+            text = random.choice(sample_texts)
+            source_url = f"http://example.com/article/{uuid.uuid4().hex[:10]}"
+            author_id = random.choice(authors)
+
+            # Committed together with the item's votes below
+            content = await validation_service.submit_content_for_validation(
+                session, title, text, source_url, author_id, commit=False
+            )
+            
+            # Assign to validators (this is done by submit_content_for_validation now)
+            # await validation_service.assign_content_to_validators(session, content.id)
+            
+            # Simulate votes from a subset of validators
+            num_votes_to_simulate = random.randint(min_votes, validator_count)
+            selected_validator_ids = random.sample(validator_ids, num_votes_to_simulate)
+
+            # The draws for all of the item's votes are made up front
+            accuracy_draws = random.choices([True, True, True, False], k=num_votes_to_simulate) # 75% chance of accurate vote
+            plagiarism_draws = [random.random() < 0.02 for _ in range(num_votes_to_simulate)] # Low chance
+            bias_draws = [random.uniform(0.0, 0.5) for _ in range(num_votes_to_simulate)] # Mostly low bias
+
+            votes = []
+            for validator_id, is_accurate, is_plagiarized, bias_score in zip(selected_validator_ids, accuracy_draws, plagiarism_draws, bias_draws):
+                comments = _VOTE_COMMENTS[(not is_accurate) | is_plagiarized << 1 | (bias_score > 0.7) << 2]
+                votes.append(ValidationVote(
+                    content_id=content.content_id,
+                    validator_id=validator_id,
                     is_accurate=is_accurate,
                     is_plagiarized=is_plagiarized,
                     bias_score=bias_score,
                     comments=comments
-                )
-            except ValueError as e:
-                logger.warning(f"Skipping vote for {content.content_id} by {validator.validator_id}: {e}")
-        
-        logger.debug(f"Generated content {content.content_id} and {num_votes_to_simulate} votes.")
-    await db_session.commit()
+                ))
+
+            # One INSERT for the item's votes and one commit for the item; consensus is scheduled once, after all of them
+            await validation_service.submit_validation_votes_bulk(session, votes)
+            logger.debug(f"Generated content {content.content_id} and {num_votes_to_simulate} votes.")
+
+    await asyncio.gather(*[generate_one() for _ in range(num_content)])
+    await validation_service.wait_for_consensus() # Consensus evaluations triggered by the votes
     logger.info(f"Finished generating {num_content} sample content items and votes.")
 
 async def main():
-    structlog.configure(
-        processors=[
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer()
-        ],
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        wrapper_class=structlog.stdlib.BoundLogger,
-        cache_logger_on_first_use=True,
-    )
+    configure_logging()
     
     logger.info("Starting sample data generation for Content Validation Network...")
     
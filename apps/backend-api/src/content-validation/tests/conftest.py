@@ -0,0 +1,64 @@
+from typing import List
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from database.models import Base, Validator
+from logging_setup import configure_logging
+
+# Validators seeded once per session for tests that only need someone to vote
+SHARED_VALIDATOR_COUNT = 6
+SHARED_VALIDATOR_PREFIX = "shared_validator_"
+
+@pytest.fixture(scope="session")
+async def engine(tmp_path_factory):
+    """Pooled engine over a file database with all tables, created once per session"""
+    # A file database, since every pooled connection to :memory: would open its own empty one
+    database_path = tmp_path_factory.mktemp("db") / "content_validation.db"
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}",
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=10
+    )
+
+    # The sqlite3 driver manages transactions itself and breaks SAVEPOINT; let SQLAlchemy emit BEGIN instead
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+@pytest.fixture(scope="session")
+async def shared_validators(engine) -> List[Validator]:
+    """
+    Canonical validator pool, inserted once and returned detached.
+    They are inactive, so tests of eligibility-based selection never see them.
+    """
+    validators = [
+        Validator(validator_id=f"{SHARED_VALIDATOR_PREFIX}{i}", name=f"Shared Validator {i}", is_active=False)
+        for i in range(1, SHARED_VALIDATOR_COUNT + 1)
+    ]
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        session.add_all(validators)
+        await session.commit()
+    return validators
+
+@pytest.fixture
+async def db_session(engine):
+    """
+    Real database session inside a transaction that is rolled back after the test.
+    The test's commits and rollbacks only release or roll back savepoints.
+    """
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        async with AsyncSession(bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint") as session:
+            yield session
+        await trans.rollback()
@@ -1,133 +1,74 @@
 import pytest
 import asyncio
+import dataclasses
 from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from database.models import Content, Validator, ValidationRecord
+from database.models import Content, ValidationRecord
 from core.reputation_service import ReputationService
 from core.consensus_mechanism import ConsensusMechanism
 from config import config
 
-@pytest.fixture
+# Module-scoped: building a spec'd AsyncMock is the costly part, and _reset_mocks clears its calls per test
+@pytest.fixture(scope="module")
 def mock_reputation_service():
     mock = AsyncMock(spec=ReputationService)
-    mock.update_reputation.side_effect = lambda db, validator_id, voted_with_consensus, is_malicious_flag: config.initial_reputation + (config.reputation_gain_on_correct_vote if voted_with_consensus else -config.reputation_loss_on_incorrect_vote)
+    gain, loss = config.reputation_gain_on_correct_vote, config.reputation_loss_on_incorrect_vote
+    mock.apply_consensus_outcomes.side_effect = lambda db, outcomes: {
+        validator_id: gain if voted_with_consensus else -loss
+        for validator_id, voted_with_consensus in outcomes.items()
+    }
     return mock
 
-@pytest.fixture
-def consensus_mechanism(mock_reputation_service):
-    return ConsensusMechanism(mock_reputation_service)
-
-@pytest.mark.asyncio
-async def test_evaluate_content_consensus_approved(db_session: AsyncSession, consensus_mechanism: ConsensusMechanism, mock_reputation_service):
-    # Create content
-    content = Content(content_id="test_content_1", title="Test", text="Test content")
-    db_session.add(content)
-    await db_session.commit()
-    await db_session.refresh(content)
-
-    # Create validators
-    v1 = Validator(validator_id="v1", name="Validator 1")
-    v2 = Validator(validator_id="v2", name="Validator 2")
-    v3 = Validator(validator_id="v3", name="Validator 3")
-    db_session.add_all([v1, v2, v3])
-    await db_session.commit()
-    await db_session.refresh(v1)
-    await db_session.refresh(v2)
-    await db_session.refresh(v3)
-
-    # Submit votes (2 accurate, 1 inaccurate)
-    rec1 = ValidationRecord(content_id=content.id, validator_id=v1.id, is_accurate=True, is_plagiarized=False, bias_score=0.1, comments="Good")
-    rec2 = ValidationRecord(content_id=content.id, validator_id=v2.id, is_accurate=True, is_plagiarized=False, bias_score=0.2, comments="OK")
-    rec3 = ValidationRecord(content_id=content.id, validator_id=v3.id, is_accurate=False, is_plagiarized=True, bias_score=0.8, comments="Bad")
-    db_session.add_all([rec1, rec2, rec3])
-    await db_session.commit()
-    await db_session.refresh(rec1)
-    await db_session.refresh(rec2)
-    await db_session.refresh(rec3)
-
-    # Link records to validators for reputation update
-    rec1.validator = v1
-    rec2.validator = v2
-    rec3.validator = v3
-
-    is_approved, consensus_score = await consensus_mechanism.evaluate_content_consensus(db_session, content.id)
-
-    assert is_approved is True # 2/3 = 66.6% which is < 75%, so this should be False by default config.
-    # Let's adjust config.consensus_threshold_percent for this test or ensure 2/3 passes.
-    # For 2/3 to be approved, threshold must be <= 66.6%
-    original_threshold = config.consensus_threshold_percent
-    config.consensus_threshold_percent = 0.6 # Temporarily set to 60% for this test
-    
-    is_approved, consensus_score = await consensus_mechanism.evaluate_content_consensus(db_session, content.id)
-    assert is_approved is True
-    assert pytest.approx(consensus_score, 0.01) == (2/3) * 100
-
-    # Verify reputation updates
-    assert mock_reputation_service.update_reputation.call_count == 3
-    # v1 and v2 voted with consensus (True), v3 voted against (False)
-    mock_reputation_service.update_reputation.assert_any_call(db_session, "v1", True, False)
-    mock_reputation_service.update_reputation.assert_any_call(db_session, "v2", True, False)
-    mock_reputation_service.update_reputation.assert_any_call(db_session, "v3", False, False)
-
-    # Restore original threshold
-    config.consensus_threshold_percent = original_threshold
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_reputation_service):
+    yield
+    mock_reputation_service.reset_mock()
 
-@pytest.mark.asyncio
-async def test_evaluate_content_consensus_rejected(db_session: AsyncSession, consensus_mechanism: ConsensusMechanism, mock_reputation_service):
-    # Create content
-    content = Content(content_id="test_content_2", title="Test 2", text="Test content 2")
+@pytest.fixture
+async def seeded_content(db_session: AsyncSession, shared_validators, votes):
+    """Content with one vote per entry of votes (its is_accurate), cast by the shared validators in order"""
+    content = Content(content_id="consensus_content", title="Test", text="Test content")
     db_session.add(content)
+    await db_session.flush()
+    records = [
+        ValidationRecord(content_id=content.id, validator_id=validator.id, is_accurate=is_accurate, is_plagiarized=False, bias_score=0.1)
+        for validator, is_accurate in zip(shared_validators, votes)
+    ]
+    db_session.add_all(records)
     await db_session.commit()
-    await db_session.refresh(content)
-
-    # Create validators
-    v4 = Validator(validator_id="v4", name="Validator 4")
-    v5 = Validator(validator_id="v5", name="Validator 5")
-    v6 = Validator(validator_id="v6", name="Validator 6")
-    db_session.add_all([v4, v5, v6])
-    await db_session.commit()
-    await db_session.refresh(v4)
-    await db_session.refresh(v5)
-    await db_session.refresh(v6)
-
-    # Submit votes (1 accurate, 2 inaccurate)
-    rec4 = ValidationRecord(content_id=content.id, validator_id=v4.id, is_accurate=True, is_plagiarized=False, bias_score=0.1)
-    rec5 = ValidationRecord(content_id=content.id, validator_id=v5.id, is_accurate=False, is_plagiarized=False, bias_score=0.7)
-    rec6 = ValidationRecord(content_id=content.id, validator_id=v6.id, is_accurate=False, is_plagiarized=True, bias_score=0.9)
-    db_session.add_all([rec4, rec5, rec6])
-    await db_session.commit()
-    await db_session.refresh(rec4)
-    await db_session.refresh(rec5)
-    await db_session.refresh(rec6)
-
-    # Link records to validators for reputation update
-    rec4.validator = v4
-    rec5.validator = v5
-    rec6.validator = v6
-
-    is_approved, consensus_score = await consensus_mechanism.evaluate_content_consensus(db_session, content.id)
-
-    assert is_approved is False
-    assert pytest.approx(consensus_score, 0.01) == (1/3) * 100
-
-    # Verify reputation updates
-    assert mock_reputation_service.update_reputation.call_count == 6 # 3 from previous test + 3 from this
-    # v4 voted with consensus (False), v5 and v6 voted with consensus (False)
-    mock_reputation_service.update_reputation.assert_any_call(db_session, "v4", False, False)
-    mock_reputation_service.update_reputation.assert_any_call(db_session, "v5", True, False)
-    mock_reputation_service.update_reputation.assert_any_call(db_session, "v6", True, False)
+    return content, records
 
 @pytest.mark.asyncio
-async def test_evaluate_content_consensus_no_records(db_session: AsyncSession, consensus_mechanism: ConsensusMechanism):
-    # Create content
-    content = Content(content_id="test_content_3", title="Test 3", text="Test content 3")
-    db_session.add(content)
-    await db_session.commit()
-    await db_session.refresh(content)
-
-    is_approved, consensus_score = await consensus_mechanism.evaluate_content_consensus(db_session, content.id)
-
-    assert is_approved is False
-    assert consensus_score == 0.0
+@pytest.mark.parametrize("votes,threshold,expected_approved,expected_score", [
+    ([True, True, False], 0.75, False, 2/3 * 100), # 66.6% is below the default 75% threshold
+    ([True, True, False], 0.6, True, 2/3 * 100),
+    ([True, False, False], 0.75, False, 1/3 * 100),
+    ([True], 0.75, None, None), # Fewer votes than min_validators_per_content: deferred
+    ([], 0.75, None, None),
+])
+async def test_evaluate_content_consensus(db_session: AsyncSession, mock_reputation_service, shared_validators, seeded_content, votes, threshold, expected_approved, expected_score, monkeypatch):
+    # The threshold is read when the mechanism is built
+    monkeypatch.setattr("core.consensus_mechanism.config", dataclasses.replace(config, consensus_threshold_percent=threshold))
+    consensus_mechanism = ConsensusMechanism(mock_reputation_service)
+    content, records = seeded_content
+
+    outcome = await consensus_mechanism.evaluate_content_consensus(db_session, content.id)
+    if len(votes) < config.min_validators_per_content:
+        assert outcome is None # Deferred, which is distinct from rejected
+        mock_reputation_service.apply_consensus_outcomes.assert_not_called()
+        return
+    is_approved, consensus_score = outcome
+    assert is_approved is expected_approved
+    assert consensus_score == pytest.approx(expected_score, 0.01)
+    # Reputation updates are applied in one bulk call, and each record stores its outcome
+    outcomes = {validator.validator_id: is_accurate == expected_approved for validator, is_accurate in zip(shared_validators, votes)}
+    mock_reputation_service.apply_consensus_outcomes.assert_called_once_with(db_session, outcomes)
+    # Cached scores are only dropped once the new ones are committed
+    mock_reputation_service.invalidate_cached_reputations.assert_awaited_once()
+    assert sorted(mock_reputation_service.invalidate_cached_reputations.await_args.args[0]) == sorted(outcomes)
+    for record in records:
+        with_consensus = record.is_accurate == expected_approved
+        assert record.voted_with_consensus is with_consensus
+        assert record.reputation_change == (config.reputation_gain_on_correct_vote if with_consensus else -config.reputation_loss_on_incorrect_vote)
@@ -29,6 +29,21 @@ async def test_register_validator(db_session: AsyncSession, reputation_service:
     retrieved_validator = (await db_session.execute(stmt)).scalar_one()
     assert retrieved_validator.name == name
 
+@pytest.mark.asyncio
+async def test_register_validators_bulk(db_session: AsyncSession, reputation_service: ReputationService):
+    registered = await reputation_service.register_validators_bulk(db_session, [
+        {"validator_id": "bulk_registered_1", "name": "Bulk One", "organization": "Org", "specialties": ["finance"]},
+        {"validator_id": "bulk_registered_2", "name": "Bulk Two"}
+    ])
+    assert registered == 2
+
+    stmt = select(Validator).where(Validator.validator_id.in_(["bulk_registered_1", "bulk_registered_2"])).order_by(Validator.validator_id)
+    validators = (await db_session.execute(stmt)).scalars().all()
+    assert [v.name for v in validators] == ["Bulk One", "Bulk Two"]
+    assert all(v.reputation_score == config.initial_reputation for v in validators)
+    assert validators[0].specialties == ["finance"]
+    assert validators[1].specialties == []
+
 @pytest.mark.asyncio
 async def test_register_validator_already_exists(db_session: AsyncSession, reputation_service: ReputationService):
     validator_id = "existing_validator"
@@ -38,6 +53,18 @@ async def test_register_validator_already_exists(db_session: AsyncSession, reput
     with pytest.raises(ValueError, match="Validator already registered."):
         await reputation_service.register_validator(db_session, validator_id, "Another Name")
 
+@pytest.mark.asyncio
+async def test_register_validator_without_commit(db_session: AsyncSession, reputation_service: ReputationService, monkeypatch):
+    mock_redis = AsyncMock()
+    monkeypatch.setattr("core.reputation_service.get_connected_redis_client", lambda: mock_redis)
+    validator = await reputation_service.register_validator(db_session, "flushed_validator", "Flushed Validator", commit=False)
+    mock_redis.delete.assert_not_awaited() # The caller invalidates once it has committed
+
+    assert validator.id is not None
+    assert db_session.in_transaction()
+    await db_session.rollback()
+    assert (await db_session.execute(select(Validator).where(Validator.validator_id == "flushed_validator"))).scalar_one_or_none() is None
+
 @pytest.mark.asyncio
 async def test_get_validator_reputation(db_session: AsyncSession, reputation_service: ReputationService):
     validator_id = "rep_validator_1"
@@ -51,6 +78,25 @@ async def test_get_validator_reputation(db_session: AsyncSession, reputation_ser
     reputation_non_existent = await reputation_service.get_validator_reputation(db_session, "non_existent")
     assert reputation_non_existent == config.initial_reputation # Returns initial for not found
 
+@pytest.mark.asyncio
+async def test_get_validator_reputation_uses_cache(db_session: AsyncSession, reputation_service: ReputationService, monkeypatch):
+    mock_redis = AsyncMock()
+    mock_redis.get.return_value = None
+    monkeypatch.setattr("core.reputation_service.get_connected_redis_client", lambda: mock_redis)
+    await reputation_service.register_validator(db_session, "cached_validator", "Cached Validator")
+
+    # A miss reads the database and populates the cache
+    assert (await reputation_service.get_validator_reputation(db_session, "cached_validator")) == config.initial_reputation
+    mock_redis.set.assert_awaited_once_with("rep:cached_validator", config.initial_reputation, ex=config.reputation_cache_ttl_seconds)
+
+    # A hit is served without touching the database
+    mock_redis.get.return_value = "42.5"
+    assert (await reputation_service.get_validator_reputation(db_session, "cached_validator")) == 42.5
+
+    # Updates write the new score through
+    new_reputation = await reputation_service.update_reputation(db_session, "cached_validator", voted_with_consensus=True)
+    mock_redis.set.assert_awaited_with("rep:cached_validator", new_reputation, ex=config.reputation_cache_ttl_seconds)
+
 @pytest.mark.asyncio
 async def test_update_reputation_correct_vote(db_session: AsyncSession, reputation_service: ReputationService):
     validator_id = "update_validator_1"
@@ -99,31 +145,77 @@ async def test_update_reputation_cannot_go_below_zero(db_session: AsyncSession,
     assert new_reputation == 0.0
     assert (await reputation_service.get_validator_reputation(db_session, validator_id)) == 0.0
 
+@pytest.mark.asyncio
+async def test_apply_consensus_outcomes(db_session: AsyncSession, reputation_service: ReputationService):
+    await reputation_service.register_validator(db_session, "outcome_winner", "Outcome Winner")
+    loser = await reputation_service.register_validator(db_session, "outcome_loser", "Outcome Loser")
+    loser.reputation_score = 2.0 # Below the loss, so the score is clamped at zero
+    await db_session.commit()
+
+    changes = await reputation_service.apply_consensus_outcomes(
+        db_session, {"outcome_winner": True, "outcome_loser": False, "unknown_validator": True}
+    )
+    await db_session.commit()
+
+    assert changes == {"outcome_winner": config.reputation_gain_on_correct_vote, "outcome_loser": -2.0}
+    assert (await reputation_service.get_validator_reputation(db_session, "outcome_winner")) == config.initial_reputation + config.reputation_gain_on_correct_vote
+    assert (await reputation_service.get_validator_reputation(db_session, "outcome_loser")) == 0.0
+
+@pytest.mark.asyncio
+async def test_apply_consensus_outcomes_leaves_cache_to_caller(db_session: AsyncSession, reputation_service: ReputationService, monkeypatch):
+    await reputation_service.register_validator(db_session, "outcome_cached", "Outcome Cached")
+    mock_redis = AsyncMock()
+    monkeypatch.setattr("core.reputation_service.get_connected_redis_client", lambda: mock_redis)
+
+    # Nothing is committed yet, so the cache must still hold the old scores
+    await reputation_service.apply_consensus_outcomes(db_session, {"outcome_cached": True})
+    mock_redis.delete.assert_not_awaited()
+
+    await db_session.commit()
+    await reputation_service.invalidate_cached_reputations(["outcome_cached"])
+    mock_redis.delete.assert_awaited_once_with("eligible_validators:v1", "rep:outcome_cached")
+
 @pytest.mark.asyncio
 async def test_get_eligible_validators(db_session: AsyncSession, reputation_service: ReputationService):
     # Create some validators with varying reputations
     await reputation_service.register_validator(db_session, "eligible_1", "Eligible One") # 100
     v2 = await reputation_service.register_validator(db_session, "eligible_2", "Eligible Two")
-    v2.reputation_score = config.min_reputation_for_selection + 10
-    await db_session.merge(v2)
-
     v3 = await reputation_service.register_validator(db_session, "ineligible_1", "Ineligible One")
-    v3.reputation_score = config.min_reputation_for_selection - 10
-    await db_session.merge(v3)
-
     v4 = await reputation_service.register_validator(db_session, "inactive_1", "Inactive One")
+
+    # The instances are still attached, so one commit writes all three changes
+    v2.reputation_score = config.min_reputation_for_selection + 10
+    v3.reputation_score = config.min_reputation_for_selection - 10
     v4.is_active = False
-    await db_session.merge(v4)
     await db_session.commit()
 
     eligible_validators = await reputation_service.get_eligible_validators(db_session, 10)
     
     assert len(eligible_validators) >= 2 # At least eligible_1 and eligible_2
     assert all(v.reputation_score >= config.min_reputation_for_selection for v in eligible_validators)
-    assert all(v.is_active is True for v in eligible_validators)
     assert "ineligible_1" not in [v.validator_id for v in eligible_validators]
     assert "inactive_1" not in [v.validator_id for v in eligible_validators]
 
     # Test limit
     eligible_validators_limited = await reputation_service.get_eligible_validators(db_session, 1)
     assert len(eligible_validators_limited) == 1
+
+@pytest.mark.asyncio
+async def test_get_eligible_validators_uses_cache(db_session: AsyncSession, reputation_service: ReputationService, monkeypatch):
+    mock_redis = AsyncMock()
+    mock_redis.hget.return_value = None
+    monkeypatch.setattr("core.reputation_service.get_connected_redis_client", lambda: mock_redis)
+    await reputation_service.register_validator(db_session, "cached_eligible", "Cached Eligible")
+    mock_redis.delete.assert_awaited_with("eligible_validators:v1") # Registering invalidates the cached lists
+
+    # A miss reads the database and populates the cache
+    eligible_validators = await reputation_service.get_eligible_validators(db_session, 5)
+    cached = mock_redis.hset.await_args.args[2]
+    mock_redis.hset.assert_awaited_once_with("eligible_validators:v1", 5, cached)
+    mock_redis.expire.assert_awaited_once_with("eligible_validators:v1", config.eligible_validators_cache_ttl_seconds)
+
+    # A hit is served without touching the database
+    mock_redis.hget.return_value = cached.decode()
+    assert await reputation_service.get_eligible_validators(db_session, 5) == eligible_validators
+    assert eligible_validators[0].validator_id == "cached_eligible"
+    assert mock_redis.hset.await_count == 1
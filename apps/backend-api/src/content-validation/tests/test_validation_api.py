@@ -0,0 +1,66 @@
+import pytest
+import httpx
+from unittest.mock import AsyncMock
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.validation_api import router
+from database.database import get_db
+from database.models import Content
+from core.reputation_service import ReputationService
+from core.consensus_mechanism import ConsensusMechanism
+from core.validation_service import ValidationService
+
+@pytest.fixture
+async def client(db_session: AsyncSession):
+    """HTTP client for the validation router, wired to the test database"""
+    app = FastAPI()
+    app.include_router(router)
+    app.state.reputation_service = AsyncMock(spec=ReputationService)
+    app.state.validation_service = ValidationService(app.state.reputation_service, AsyncMock(spec=ConsensusMechanism))
+    app.dependency_overrides[get_db] = lambda: db_session
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+@pytest.fixture
+async def content(db_session: AsyncSession) -> Content:
+    content = Content(content_id="api_content_1", title="API", text="API content")
+    db_session.add(content)
+    await db_session.commit()
+    return content
+
+@pytest.mark.asyncio
+async def test_submit_vote_and_list_records(client: httpx.AsyncClient, content: Content, shared_validators):
+    validator = shared_validators[0]
+    response = await client.post("/v1/validation/vote", json={
+        "content_id": content.content_id,
+        "validator_id": validator.validator_id,
+        "is_accurate": True,
+        "is_plagiarized": False,
+        "bias_score": 0.1
+    })
+    assert response.status_code == 201
+    # Records reference content and validators by their database IDs
+    record = response.json()
+    assert (record["content_id"], record["validator_id"]) == (content.id, validator.id)
+
+    response = await client.get(f"/v1/validation/records/{content.content_id}")
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()] == [record["id"]]
+
+@pytest.mark.asyncio
+async def test_submit_resolve_and_list_disputes(client: httpx.AsyncClient, content: Content):
+    response = await client.post("/v1/disputes/submit", json={
+        "content_id": content.content_id, "disputer_id": "api_disputer", "reason": "Inaccurate"
+    })
+    assert response.status_code == 201
+    dispute = response.json()
+    assert (dispute["content_id"], dispute["status"]) == (content.id, "OPEN")
+
+    response = await client.put(f"/v1/disputes/{dispute['id']}/resolve", params={"new_status": "RESOLVED", "resolved_by": "api_admin"})
+    assert response.status_code == 200
+    assert response.json()["resolved_by"] == "api_admin"
+
+    response = await client.get("/v1/disputes", params={"status": "RESOLVED"})
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()] == [dispute["id"]]
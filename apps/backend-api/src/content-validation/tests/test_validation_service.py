@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import dataclasses
 from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -8,9 +9,11 @@ from database.models import Content, Validator, ValidationRecord, ContentDispute
 from core.reputation_service import ReputationService
 from core.consensus_mechanism import ConsensusMechanism
 from core.validation_service import ValidationService
+from core.content_model import ValidationVote
 from config import config
 
-@pytest.fixture
+# The spec'd mocks are built once per module, since spec= introspects the class; calls are reset after each test
+@pytest.fixture(scope="module")
 def mock_reputation_service():
     mock = AsyncMock(spec=ReputationService)
     mock.get_eligible_validators.return_value = [
@@ -20,18 +23,26 @@ def mock_reputation_service():
     mock.register_validator.side_effect = lambda db, vid, name, org=None, spec=None: Validator(validator_id=vid, name=name)
     return mock
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_consensus_mechanism():
     mock = AsyncMock(spec=ConsensusMechanism)
     mock.evaluate_content_consensus.return_value = (True, 80.0) # Default to approved
     return mock
 
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_reputation_service, mock_consensus_mechanism):
+    yield
+    mock_reputation_service.reset_mock()
+    mock_consensus_mechanism.reset_mock()
+
 @pytest.fixture
 def validation_service(mock_reputation_service, mock_consensus_mechanism):
     return ValidationService(mock_reputation_service, mock_consensus_mechanism)
 
 @pytest.mark.asyncio
-async def test_submit_content_for_validation(db_session: AsyncSession, validation_service: ValidationService, mock_reputation_service):
+async def test_submit_content_for_validation(db_session: AsyncSession, validation_service: ValidationService, mock_reputation_service, monkeypatch):
+    mock_redis = AsyncMock()
+    monkeypatch.setattr("core.validation_service.get_connected_redis_client", lambda: mock_redis)
     title = "New Article"
     text = "This is the content of the new article."
     
@@ -42,27 +53,40 @@ async def test_submit_content_for_validation(db_session: AsyncSession, validatio
     assert content.content_id is not None
     assert content.validation_status == 'PENDING'
     
-    # Verify assign_content_to_validators was called
-    mock_reputation_service.get_eligible_validators.assert_called_once()
-    
-    # Verify content status updated to IN_REVIEW after assignment
+    # Submitting only announces the content; validator nodes claim it, so nothing is assigned yet
+    mock_redis.publish.assert_awaited_once_with("content:pending", content.content_id)
+    mock_reputation_service.get_eligible_validators.assert_not_called()
+
+    # Assignment moves the content into review once enough validators are eligible
+    await validation_service.assign_content_to_validators(db_session, content.id)
+    mock_reputation_service.get_eligible_validators.assert_called_once_with(db_session, config.min_validators_per_content)
     await db_session.refresh(content)
     assert content.validation_status == 'IN_REVIEW'
 
 @pytest.mark.asyncio
-async def test_submit_validation_vote(db_session: AsyncSession, validation_service: ValidationService, mock_consensus_mechanism):
-    # Create content and validator
+async def test_submit_content_for_validation_without_commit(db_session: AsyncSession, validation_service: ValidationService):
+    content = await validation_service.submit_content_for_validation(db_session, "Uncommitted", "Uncommitted content", commit=False)
+
+    content_uuid = content.content_id
+    assert content.id is not None
+    assert db_session.in_transaction()
+    await db_session.rollback()
+    assert await validation_service.get_content_details(db_session, content_uuid) is None
+
+@pytest.mark.asyncio
+async def test_submit_validation_vote(db_session: AsyncSession, validation_service: ValidationService, mock_consensus_mechanism, shared_validators, monkeypatch):
+    monkeypatch.setattr("core.validation_service.config", dataclasses.replace(config, min_validators_per_content=2))
+    evaluate = AsyncMock()
+    monkeypatch.setattr(validation_service, "evaluate_content_and_update_status", evaluate)
+    # Create content
     content = Content(content_id="vote_content_1", title="Vote Test", text="Vote content")
-    validator = Validator(validator_id="vote_validator_1", name="Vote Validator")
-    db_session.add_all([content, validator])
+    db_session.add(content)
     await db_session.commit()
-    await db_session.refresh(content)
-    await db_session.refresh(validator)
 
     # Submit first vote
     vote_data = {
-        "content_id": content.content_id,
-        "validator_id": validator.validator_id,
+        "content_uuid": content.content_id,
+        "validator_uuid": shared_validators[0].validator_id,
         "is_accurate": True,
         "is_plagiarized": False,
         "bias_score": 0.1
@@ -70,39 +94,51 @@ async def test_submit_validation_vote(db_session: AsyncSession, validation_servi
     record = await validation_service.submit_validation_vote(db_session, **vote_data)
     
     assert record.content_id == content.id
-    assert record.validator_id == validator.id
+    assert record.validator_id == shared_validators[0].id
     assert record.is_accurate is True
     
-    # Consensus should not be triggered yet if min_validators_per_content > 1
-    mock_consensus_mechanism.evaluate_content_consensus.assert_not_called()
+    # One vote is below min_validators_per_content, so consensus is not triggered yet
+    await validation_service.wait_for_consensus()
+    evaluate.assert_not_called()
 
-    # Simulate more validators and votes to trigger consensus
-    # Need to ensure min_validators_per_content is met
-    original_min_validators = config.min_validators_per_content
-    config.min_validators_per_content = 1 # Temporarily set to 1 for easy triggering
-    
-    # Submit another vote (if min_validators_per_content was > 1)
-    # For this test, with min_validators_per_content = 1, the first vote should trigger it.
-    # So, we need to re-run the submit_validation_vote or ensure the test setup reflects this.
-    
-    # Re-fetch content to ensure it's updated
+    # The second vote reaches the minimum and schedules consensus in the background
+    await validation_service.submit_validation_vote(db_session, **{**vote_data, "validator_uuid": shared_validators[1].validator_id})
+    await validation_service.wait_for_consensus()
+    evaluate.assert_awaited_once()
+    assert evaluate.await_args.args[1] == content.id
+
+    # The evaluation stores the consensus outcome on the content
+    await ValidationService.evaluate_content_and_update_status(validation_service, db_session, content.id)
     await db_session.refresh(content)
     assert content.validation_status == 'APPROVED' # Should be approved by default mock
     assert content.approved_by_consensus is True
     assert content.consensus_score == 80.0
     mock_consensus_mechanism.evaluate_content_consensus.assert_called_once_with(db_session, content.id)
 
-    config.min_validators_per_content = original_min_validators # Restore
+@pytest.mark.asyncio
+async def test_evaluate_content_deferred_keeps_status(db_session: AsyncSession, validation_service: ValidationService, mock_consensus_mechanism):
+    content = Content(content_id="deferred_content_1", title="Deferred", text="Deferred content", validation_status='IN_REVIEW')
+    db_session.add(content)
+    await db_session.commit()
+
+    # An over-counted vote total schedules evaluation before enough votes are committed
+    mock_consensus_mechanism.evaluate_content_consensus.return_value = None
+    try:
+        await validation_service.evaluate_content_and_update_status(db_session, content.id)
+    finally:
+        mock_consensus_mechanism.evaluate_content_consensus.return_value = (True, 80.0)
+
+    await db_session.refresh(content)
+    assert content.validation_status == 'IN_REVIEW' # Deferred, not rejected
+    assert content.validated_at is None
 
 @pytest.mark.asyncio
-async def test_submit_validation_vote_already_voted(db_session: AsyncSession, validation_service: ValidationService):
-    # Create content and validator
+async def test_submit_validation_vote_already_voted(db_session: AsyncSession, validation_service: ValidationService, shared_validators):
+    # Create content
     content = Content(content_id="vote_content_2", title="Vote Test 2", text="Vote content 2")
-    validator = Validator(validator_id="vote_validator_2", name="Vote Validator 2")
-    db_session.add_all([content, validator])
+    validator = shared_validators[0]
+    db_session.add(content)
     await db_session.commit()
-    await db_session.refresh(content)
-    await db_session.refresh(validator)
 
     # Submit first vote
     await validation_service.submit_validation_vote(
@@ -115,13 +151,96 @@ async def test_submit_validation_vote_already_voted(db_session: AsyncSession, va
             db_session, content.content_id, validator.validator_id, False, True, 0.9
         )
 
+@pytest.mark.asyncio
+async def test_submit_validation_votes_bulk(db_session: AsyncSession, validation_service: ValidationService, shared_validators, monkeypatch):
+    monkeypatch.setattr("core.validation_service.config", dataclasses.replace(config, min_validators_per_content=1))
+    first = Content(content_id="bulk_content_1", title="Bulk 1", text="Bulk content 1")
+    second = Content(content_id="bulk_content_2", title="Bulk 2", text="Bulk content 2")
+    db_session.add_all([first, second])
+    await db_session.commit()
+
+    votes = [
+        ValidationVote(content_id=content_uuid, validator_id=shared_validators[0].validator_id, is_accurate=True, is_plagiarized=False, bias_score=0.1)
+        for content_uuid in ["bulk_content_1", "bulk_content_2", "unknown_content"]
+    ]
+    evaluate = AsyncMock()
+    monkeypatch.setattr(validation_service, "evaluate_content_and_update_status", evaluate)
+    records = await validation_service.submit_validation_votes_bulk(db_session, votes)
+
+    assert sorted(record.content_id for record in records) == sorted([first.id, second.id])
+    # Consensus runs in the background, in its own session
+    await validation_service.wait_for_consensus()
+    assert sorted(call.args[1] for call in evaluate.await_args_list) == sorted([first.id, second.id])
+    assert all(call.args[0] is not db_session for call in evaluate.await_args_list)
+
+    # Repeat votes are skipped by the unique constraint
+    assert await validation_service.submit_validation_votes_bulk(db_session, votes[:1]) == []
+
+@pytest.mark.asyncio
+async def test_submit_validation_vote_counts_votes_in_redis(db_session: AsyncSession, validation_service: ValidationService, shared_validators, monkeypatch):
+    monkeypatch.setattr("core.validation_service.config", dataclasses.replace(config, min_validators_per_content=3))
+    content = Content(content_id="counted_content_1", title="Counted", text="Counted content")
+    db_session.add(content)
+    await db_session.commit()
+
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[1, 3, True]) # The counter already held two votes
+    pipe_context = MagicMock()
+    pipe_context.__aenter__ = AsyncMock(return_value=pipe)
+    pipe_context.__aexit__ = AsyncMock(return_value=False)
+    mock_redis = MagicMock()
+    mock_redis.pipeline = MagicMock(return_value=pipe_context)
+    monkeypatch.setattr("core.validation_service.get_connected_redis_client", lambda: mock_redis)
+    evaluate = AsyncMock()
+    monkeypatch.setattr(validation_service, "evaluate_content_and_update_status", evaluate)
+
+    await validation_service.submit_validation_vote(db_session, "counted_content_1", shared_validators[0].validator_id, True, False, 0.1)
+    pipe.hincrby.assert_called_once_with(f"content:{content.id}:votes", "total", 1)
+    assert pipe.execute.await_count == 1 # The counter was warm, so it was not seeded from the database
+
+    # The Redis total, not the single vote in the database, triggers consensus
+    await validation_service.wait_for_consensus()
+    assert evaluate.await_args.args[1] == content.id
+
+@pytest.mark.asyncio
+async def test_submit_validation_vote_seeds_cold_counter_by_increment(db_session: AsyncSession, validation_service: ValidationService, shared_validators, monkeypatch):
+    monkeypatch.setattr("core.validation_service.config", dataclasses.replace(config, min_validators_per_content=4))
+    content = Content(content_id="counted_content_2", title="Counted", text="Counted content")
+    db_session.add(content)
+    await db_session.flush()
+    db_session.add_all([
+        ValidationRecord(content_id=content.id, validator_id=validator.id, is_accurate=True, is_plagiarized=False, bias_score=0.1)
+        for validator in shared_validators[1:3]
+    ])
+    await db_session.commit()
+
+    pipe = MagicMock()
+    # The counter was cold; by the time it is seeded, another request has added one more vote to it
+    pipe.execute = AsyncMock(side_effect=[[0, 1, True], [4, True]])
+    pipe_context = MagicMock()
+    pipe_context.__aenter__ = AsyncMock(return_value=pipe)
+    pipe_context.__aexit__ = AsyncMock(return_value=False)
+    mock_redis = MagicMock()
+    mock_redis.pipeline = MagicMock(return_value=pipe_context)
+    monkeypatch.setattr("core.validation_service.get_connected_redis_client", lambda: mock_redis)
+    evaluate = AsyncMock()
+    monkeypatch.setattr(validation_service, "evaluate_content_and_update_status", evaluate)
+
+    await validation_service.submit_validation_vote(db_session, "counted_content_2", shared_validators[0].validator_id, True, False, 0.1)
+    # Three committed votes, one already counted by this request's increment
+    assert pipe.hincrby.call_args_list[-1].args == (f"content:{content.id}:votes", "total", 2)
+    pipe.hset.assert_not_called()
+
+    # The seeded total keeps the concurrent vote and reaches the minimum
+    await validation_service.wait_for_consensus()
+    assert evaluate.await_args.args[1] == content.id
+
 @pytest.mark.asyncio
 async def test_submit_content_dispute(db_session: AsyncSession, validation_service: ValidationService):
     # Create content
     content = Content(content_id="dispute_content_1", title="Dispute Test", text="Dispute content")
     db_session.add(content)
     await db_session.commit()
-    await db_session.refresh(content)
 
     disputer_id = "user_disputer_1"
     reason = "I believe this content is inaccurate."
@@ -142,13 +261,11 @@ async def test_resolve_content_dispute(db_session: AsyncSession, validation_serv
     # Create content and dispute
     content = Content(content_id="dispute_content_2", title="Dispute Test 2", text="Dispute content 2")
     db_session.add(content)
-    await db_session.commit()
-    await db_session.refresh(content)
+    await db_session.flush() # Assigns content.id for the dispute; both are committed together
 
     dispute = ContentDispute(content_id=content.id, disputer_id="user_disputer_2", reason="Incorrect info")
     db_session.add(dispute)
     await db_session.commit()
-    await db_session.refresh(dispute)
 
     new_status = "RESOLVED"
     resolved_by = "admin_user"
@@ -163,3 +280,30 @@ async def test_resolve_content_dispute(db_session: AsyncSession, validation_serv
     stmt = select(ContentDispute).where(ContentDispute.id == dispute.id)
     retrieved_dispute = (await db_session.execute(stmt)).scalar_one()
     assert retrieved_dispute.status == new_status
+
+@pytest.mark.asyncio
+async def test_get_content_by_status(db_session: AsyncSession, validation_service: ValidationService):
+    db_session.add_all([
+        Content(content_id="status_content_1", title="Pending", text="Pending content", validation_status='PENDING'),
+        Content(content_id="status_content_2", title="Approved", text="Approved content", validation_status='APPROVED')
+    ])
+    await db_session.commit()
+
+    rows = await validation_service.get_content_by_status(db_session, 'APPROVED')
+    assert [(row.content_id, row.title) for row in rows] == [("status_content_2", "Approved")]
+
+@pytest.mark.asyncio
+async def test_claim_pending_content(db_session: AsyncSession, validation_service: ValidationService, shared_validators):
+    validator = shared_validators[0]
+    pending = Content(content_id="claim_content_1", title="Pending", text="Pending content", validation_status='PENDING')
+    voted = Content(content_id="claim_content_2", title="Voted", text="Voted content", validation_status='PENDING')
+    approved = Content(content_id="claim_content_3", title="Approved", text="Approved content", validation_status='APPROVED')
+    in_review = Content(content_id="claim_content_4", title="In review", text="Disputed content", validation_status='IN_REVIEW')
+    db_session.add_all([pending, voted, approved, in_review])
+    await db_session.flush() # Assigns voted.id for the record; everything is committed together
+    db_session.add(ValidationRecord(content_id=voted.id, validator_id=validator.id, is_accurate=True, is_plagiarized=False, bias_score=0.1))
+    await db_session.commit()
+
+    # Content the validator already voted on and settled content are not claimed; disputed content reopens for votes
+    claimed = await validation_service.claim_pending_content(db_session, validator.validator_id, 10)
+    assert [content.content_id for content in claimed] == ["claim_content_1", "claim_content_4"]